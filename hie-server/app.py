@@ -3,19 +3,32 @@ import pymysql
 import logging
 import logging.handlers
 import socket
-from datetime import datetime
-from flask import Flask, request, jsonify
+import sys
+import random
+from datetime import datetime, timedelta, date
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from dotenv import load_dotenv
 from contextlib import contextmanager
 from typing import Dict, List, Optional, Any, Tuple
-import bleach
-from html import escape
 from dataclasses import dataclass
+from functools import wraps
+from marshmallow import Schema, ValidationError, EXCLUDE, fields as ma_fields, validate as ma_validate
 import threading
-from concurrent.futures import ThreadPoolExecutor
+import time
+import queue
+import json
+import base64
+import hmac
+import hashlib
+import click
+import csv
+import io
+import redis
+from collections import deque, OrderedDict
+from hie_common import setup_app_logging, sanitize_text, sanitize_input, LatencyHistogram, MetricsRegistry
 
 load_dotenv()
 
@@ -33,6 +46,56 @@ class Config:
     DB_PASS: str = os.environ.get('DB_PASS')
     DB_NAME: str = os.environ.get('DB_NAME')
     DB_AES_KEY: str = os.environ.get('DB_AES_KEY')
+    DB_BLIND_INDEX_KEY: str = os.environ.get('DB_BLIND_INDEX_KEY')
+    
+    DB_POOL_MIN_SIZE: int = int(os.environ.get('DB_POOL_MIN_SIZE', 2))
+    DB_POOL_MAX_SIZE: int = int(os.environ.get('DB_POOL_MAX_SIZE', 10))
+    DB_POOL_TIMEOUT: float = float(os.environ.get('DB_POOL_TIMEOUT', 3))
+    DB_POOL_MAX_LIFETIME: float = float(os.environ.get('DB_POOL_MAX_LIFETIME', 1800))
+    DB_POOL_IDLE_TIMEOUT: float = float(os.environ.get('DB_POOL_IDLE_TIMEOUT', 300))
+    DB_POOL_PRE_PING: bool = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_POOL_PING_INTERVAL: float = float(os.environ.get('DB_POOL_PING_INTERVAL', 5))
+    
+    AUDIT_QUEUE_SIZE: int = int(os.environ.get('AUDIT_QUEUE_SIZE', 10000))
+    AUDIT_BATCH_SIZE: int = int(os.environ.get('AUDIT_BATCH_SIZE', 200))
+    AUDIT_FLUSH_INTERVAL: float = float(os.environ.get('AUDIT_FLUSH_INTERVAL', 0.5))
+    AUDIT_ENQUEUE_TIMEOUT: float = float(os.environ.get('AUDIT_ENQUEUE_TIMEOUT', 0.05))
+    AUDIT_REJECTION_POLICY: str = os.environ.get('AUDIT_REJECTION_POLICY', 'drop_lowest')
+    AUDIT_DRAIN_TIMEOUT: float = float(os.environ.get('AUDIT_DRAIN_TIMEOUT', 10))
+    AUDIT_COUNT_RESYNC_INTERVAL: float = float(os.environ.get('AUDIT_COUNT_RESYNC_INTERVAL', 600))
+    AUDIT_COUNT_EXACT_THRESHOLD: int = int(os.environ.get('AUDIT_COUNT_EXACT_THRESHOLD', 10000))
+    # 감사 로그 검색 응답에 X-Audit-Query-Plan 디버그 헤더 포함
+    AUDIT_QUERY_PLAN_HEADER: bool = os.environ.get('AUDIT_QUERY_PLAN_HEADER', 'false').lower() == 'true'
+    
+    PATIENT_CACHE_SIZE: int = int(os.environ.get('PATIENT_CACHE_SIZE', 1000))
+    PATIENT_CACHE_TTL: float = float(os.environ.get('PATIENT_CACHE_TTL', 30))
+    # 세대 번호(무효화)를 워커 간에 공유할 Redis - 결과 행은 각 프로세스 메모리에만 보관
+    PATIENT_CACHE_REDIS_URL: str = os.environ.get('PATIENT_CACHE_REDIS_URL')
+    # gunicorn 등의 워커 수 - Redis 없이 2 이상이면 다른 워커의 무효화를 볼 수 없어 캐시를 끔
+    WEB_CONCURRENCY: int = int(os.environ.get('WEB_CONCURRENCY', 1))
+    PATIENT_STREAM_MAX_ROWS: int = int(os.environ.get('PATIENT_STREAM_MAX_ROWS', 5000))
+    PATIENT_STREAM_CHUNK_SIZE: int = int(os.environ.get('PATIENT_STREAM_CHUNK_SIZE', 200))
+    BULK_CHUNK_SIZE: int = int(os.environ.get('BULK_CHUNK_SIZE', 500))
+    BULK_MAX_ERRORS: int = int(os.environ.get('BULK_MAX_ERRORS', 1000))
+    UNMASK_BATCH_MAX: int = int(os.environ.get('UNMASK_BATCH_MAX', 100))
+    HIE_UPSTREAM_TOKEN: str = os.environ.get('HIE_UPSTREAM_TOKEN')
+    
+    LOG_FILE: str = os.environ.get('LOG_FILE', 'hie_server.log')
+    LOG_MAX_BYTES: int = int(os.environ.get('LOG_MAX_BYTES', 50 * 1024 * 1024))
+    LOG_ROTATE_INTERVAL: float = float(os.environ.get('LOG_ROTATE_INTERVAL', 86400))
+    LOG_BACKUP_COUNT: int = int(os.environ.get('LOG_BACKUP_COUNT', 14))
+    LOG_COMPRESS: bool = os.environ.get('LOG_COMPRESS', 'true').lower() == 'true'
+    LOG_JSON: bool = os.environ.get('LOG_JSON', 'false').lower() == 'true'
+    LOG_QUEUE_SIZE: int = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+    
+    ESM_PROTOCOL: str = os.environ.get('ESM_PROTOCOL', 'udp').lower()
+    ESM_QUEUE_SIZE: int = int(os.environ.get('ESM_QUEUE_SIZE', 10000))
+    ESM_BATCH_SIZE: int = int(os.environ.get('ESM_BATCH_SIZE', 100))
+    ESM_FLUSH_INTERVAL: float = float(os.environ.get('ESM_FLUSH_INTERVAL', 0.2))
+    ESM_MAX_RETRIES: int = int(os.environ.get('ESM_MAX_RETRIES', 5))
+    ESM_BACKOFF_BASE: float = float(os.environ.get('ESM_BACKOFF_BASE', 0.5))
+    ESM_BACKOFF_MAX: float = float(os.environ.get('ESM_BACKOFF_MAX', 30))
+    ESM_CONNECT_TIMEOUT: float = float(os.environ.get('ESM_CONNECT_TIMEOUT', 5))
     
     @classmethod
     def validate_config(cls):
@@ -49,21 +112,200 @@ class Config:
 config = Config()
 config.validate_config()
 
-# Rate Limiter 수정
+# Rate Limiter 수정 (부하 테스트 시 RATELIMIT_ENABLED=false)
+app.config['RATELIMIT_ENABLED'] = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
 limiter = Limiter(
     key_func=get_remote_address,
     app=app,
     default_limits=["2000 per day", "200 per hour"]
 )
 
+class EsmSyslogHandler(logging.handlers.SysLogHandler):
+    """감사 이벤트를 큐에 넣고 전용 스레드가 ESM으로 묶어서 전송하는 syslog 핸들러"""
+    
+    def __init__(self, host: str, port: int, protocol: str = 'udp', queue_size: int = 10000,
+                 batch_size: int = 100, flush_interval: float = 0.2, max_retries: int = 5,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0, connect_timeout: float = 5.0):
+        if protocol not in ('udp', 'tcp'):
+            raise ValueError(f"지원하지 않는 ESM 프로토콜입니다: {protocol}")
+        # 소켓은 전송 스레드에서 직접 관리하므로 부모 생성자를 거치지 않음
+        logging.Handler.__init__(self)
+        self.address = (host, port)
+        self.facility = self.LOG_USER
+        self.protocol = protocol
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.connect_timeout = connect_timeout
+        self._sock: Optional[socket.socket] = None
+        self._udp_target = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'sent': 0,
+            'dropped': 0,
+            'retried': 0,
+            'batches': 0,
+            'reconnects': 0,
+        }
+        self._stopping = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="hie-esm-forwarder", daemon=True)
+        self._thread.start()
+    
+    def _bump(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+    
+    def emit(self, record: logging.LogRecord):
+        if self._stopping.is_set():
+            self._bump('dropped')
+            return
+        try:
+            priority = self.encodePriority(self.facility, self.mapPriority(record.levelname))
+            payload = f"<{priority}>{self.format(record)}".encode('utf-8')
+        except Exception:
+            self.handleError(record)
+            return
+        try:
+            # 요청 스레드는 절대 기다리지 않음: 큐가 가득 차면 버리고 집계
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            self._bump('dropped')
+            return
+        self._bump('enqueued')
+    
+    def _connect(self) -> socket.socket:
+        if self.protocol == 'tcp':
+            sock = socket.create_connection(self.address, timeout=self.connect_timeout)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        else:
+            # 주소는 연결 시 한 번만 해석 (전송마다 DNS 조회하지 않음)
+            family, socktype, proto, _, self._udp_target = socket.getaddrinfo(*self.address, 0, socket.SOCK_DGRAM)[0]
+            sock = socket.socket(family, socktype, proto)
+        self._bump('reconnects')
+        return sock
+    
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+    
+    def _peer_closed(self) -> bool:
+        # ESM이 연결을 끊었는데 그대로 쓰면 첫 sendall은 성공한 것처럼 보이고 데이터만 사라짐
+        # select()는 fd 1024 이상에서 실패하므로 잠시 non-blocking 으로 바꿔 엿보기만 함
+        timeout = self._sock.gettimeout()
+        self._sock.setblocking(False)
+        try:
+            return self._sock.recv(1, socket.MSG_PEEK) == b''
+        except BlockingIOError:
+            return False
+        except OSError:
+            return True
+        finally:
+            self._sock.settimeout(timeout)
+    
+    def _send(self, batch: List[bytes]):
+        if self._sock is not None and self.protocol == 'tcp' and self._peer_closed():
+            self._disconnect()
+        if self._sock is None:
+            self._sock = self._connect()
+        if self.protocol == 'tcp':
+            # RFC 6587 octet-counting: "<길이> <메시지>"를 이어 붙여 한 번에 전송
+            self._sock.sendall(b''.join(b'%d %s' % (len(payload), payload) for payload in batch))
+        else:
+            # UDP는 데이터그램 하나에 메시지 하나 (SysLogHandler와 동일하게 NUL 종료)
+            for payload in batch:
+                self._sock.sendto(payload + b'\x00', self._udp_target)
+    
+    def _send_batch(self, batch: List[bytes]):
+        attempt = 0
+        while True:
+            try:
+                self._send(batch)
+                self._bump('sent', len(batch))
+                self._bump('batches')
+                return
+            except OSError as e:
+                self._disconnect()
+                if attempt >= self.max_retries or self._stopping.is_set():
+                    self._bump('dropped', len(batch))
+                    logging.getLogger(__name__).error(f"ESM 전송 실패로 {len(batch)}건 폐기: {e}")
+                    return
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                attempt += 1
+                self._bump('retried', len(batch))
+                logging.getLogger(__name__).warning(f"ESM 전송 실패, {delay:.1f}초 후 재시도 ({attempt}/{self.max_retries}): {e}")
+                # 종료 요청이 오면 대기를 끊고 마지막 시도로 넘어감
+                self._stopping.wait(delay)
+    
+    def _run(self):
+        batch = []
+        deadline = None
+        
+        while True:
+            try:
+                timeout = self.flush_interval if not batch else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+                
+                if item is None and self._stopping.is_set() and self._queue.empty():
+                    if batch:
+                        self._send_batch(batch)
+                    self._disconnect()
+                    return
+                
+                if item is not None:
+                    batch.append(item)
+                    if len(batch) == 1:
+                        deadline = time.monotonic() + self.flush_interval
+                
+                if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                    self._send_batch(batch)
+                    batch = []
+            except Exception as e:
+                # 전송 스레드가 죽으면 이후 이벤트가 모두 큐에 쌓였다 버려지므로 현재 배치만 폐기하고 계속
+                self._bump('dropped', len(batch))
+                batch = []
+                self._disconnect()
+                logging.getLogger(__name__).exception(f"ESM 전송 스레드 오류: {e}")
+    
+    def close(self, timeout: float = 5.0):
+        if not self._closed:
+            self._closed = True
+            self._stopping.set()
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logging.getLogger(__name__).error(f"ESM 전송 종료 대기 초과: {self.stats()}")
+        logging.Handler.close(self)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                **self._stats,
+                'protocol': self.protocol,
+                'connected': self._sock is not None,
+                'queue_depth': self._queue.qsize(),
+                'queue_capacity': self._queue.maxsize
+            }
+
 def setup_logging():
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler('hie_server.log')
-        ]
+    log_listener, log_queue_handler = setup_app_logging(
+        config.LOG_FILE,
+        max_bytes=config.LOG_MAX_BYTES,
+        rotate_interval=config.LOG_ROTATE_INTERVAL,
+        backup_count=config.LOG_BACKUP_COUNT,
+        compress=config.LOG_COMPRESS,
+        json_lines=config.LOG_JSON,
+        queue_size=config.LOG_QUEUE_SIZE
     )
     
     esm_logger = logging.getLogger('hie_esm_logger')
@@ -72,17 +314,25 @@ def setup_logging():
     for handler in esm_logger.handlers[:]:
         esm_logger.removeHandler(handler)
     
+    syslog_handler = None
     try:
-        syslog_handler = logging.handlers.SysLogHandler(
-            address=(config.ESM_SERVER_HOST, config.ESM_SERVER_PORT),
-            socktype=socket.SOCK_DGRAM
+        syslog_handler = EsmSyslogHandler(
+            config.ESM_SERVER_HOST, config.ESM_SERVER_PORT,
+            protocol=config.ESM_PROTOCOL,
+            queue_size=config.ESM_QUEUE_SIZE,
+            batch_size=config.ESM_BATCH_SIZE,
+            flush_interval=config.ESM_FLUSH_INTERVAL,
+            max_retries=config.ESM_MAX_RETRIES,
+            backoff_base=config.ESM_BACKOFF_BASE,
+            backoff_max=config.ESM_BACKOFF_MAX,
+            connect_timeout=config.ESM_CONNECT_TIMEOUT
         )
         
         formatter = logging.Formatter('HIE-SERVER: %(message)s')
         syslog_handler.setFormatter(formatter)
         esm_logger.addHandler(syslog_handler)
         
-        print(f"HIE ESM 로거 설정 완료: {config.ESM_SERVER_HOST}:{config.ESM_SERVER_PORT}")
+        print(f"HIE ESM 로거 설정 완료: {config.ESM_PROTOCOL}://{config.ESM_SERVER_HOST}:{config.ESM_SERVER_PORT}")
     except Exception as e:
         print(f"HIE ESM 로거 설정 실패: {e}")
         file_handler = logging.FileHandler('hie_audit.log')
@@ -90,12 +340,57 @@ def setup_logging():
         file_handler.setFormatter(formatter)
         esm_logger.addHandler(file_handler)
     
-    return esm_logger
+    return esm_logger, syslog_handler, log_listener, log_queue_handler
 
-esm_logger = setup_logging()
+esm_logger, esm_forwarder, log_listener, log_queue_handler = setup_logging()
 logger = logging.getLogger(__name__)
 
-executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hie-logger")
+metrics = MetricsRegistry('hie')
+metrics.counter('http_requests_total', 'HTTP 요청 수 (route, status별)')
+metrics.counter('http_request_errors_total', 'HTTP 5xx 응답 수')
+metrics.histogram('http_request_duration_seconds', 'HTTP 요청 처리 시간 (핸들러 반환까지)')
+metrics.histogram('db_checkout_seconds', 'DB 커넥션 풀 checkout 대기 시간')
+metrics.histogram('db_query_seconds', 'DB 쿼리 실행 시간 (execute/executemany)')
+
+def _statement_kind(query: str) -> str:
+    verb = query.lstrip()[:6].lower()
+    return verb if verb in ('select', 'insert', 'update', 'delete') else 'other'
+
+class _TimedCursorMixin:
+    _in_executemany = False
+    
+    def execute(self, query, args=None):
+        if self._in_executemany:
+            return super().execute(query, args)
+        started = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            metrics.observe('db_query_seconds', (('statement', _statement_kind(query)),), time.perf_counter() - started)
+    
+    def executemany(self, query, args):
+        # INSERT가 아니면 pymysql이 내부에서 execute를 반복 호출하므로 중복 집계하지 않음
+        started = time.perf_counter()
+        self._in_executemany = True
+        try:
+            return super().executemany(query, args)
+        finally:
+            self._in_executemany = False
+            metrics.observe('db_query_seconds', (('statement', _statement_kind(query)),), time.perf_counter() - started)
+
+class TimedDictCursor(_TimedCursorMixin, pymysql.cursors.DictCursor):
+    pass
+
+class PoolTimeoutError(pymysql.err.OperationalError):
+    pass
+
+class _PooledConnection:
+    __slots__ = ('conn', 'created_at', 'last_used')
+    
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
 
 class DatabaseManager:
     _instance = None
@@ -110,52 +405,241 @@ class DatabaseManager:
     
     def __init__(self):
         if not hasattr(self, 'initialized'):
-            self.pool_size = 10
+            self.min_size = max(0, config.DB_POOL_MIN_SIZE)
+            self.pool_size = max(1, config.DB_POOL_MAX_SIZE, self.min_size)
+            self.checkout_timeout = config.DB_POOL_TIMEOUT
+            self.max_lifetime = config.DB_POOL_MAX_LIFETIME
+            self.idle_timeout = config.DB_POOL_IDLE_TIMEOUT
+            self.pre_ping = config.DB_POOL_PRE_PING
+            self.ping_interval = config.DB_POOL_PING_INTERVAL
+            
+            self._idle = deque()
+            self._cond = threading.Condition(threading.Lock())
+            self._opened = 0
+            self._closed = False
+            self._stats = {
+                'checkouts': 0,
+                'waits': 0,
+                'wait_timeouts': 0,
+                'wait_time_total': 0.0,
+                'created': 0,
+                'reconnects': 0,
+                'discarded': 0,
+                'evicted_idle': 0,
+                'evicted_lifetime': 0,
+            }
             self.initialized = True
     
+    def _connect(self):
+        return pymysql.connect(
+            host=config.DB_HOST,
+            port=config.DB_PORT,
+            user=config.DB_USER,
+            password=config.DB_PASS,
+            db=config.DB_NAME,
+            charset='utf8mb4',
+            autocommit=False,
+            cursorclass=TimedDictCursor,
+            connect_timeout=5,
+            read_timeout=10,
+            write_timeout=10
+        )
+    
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+    
+    def _expired(self, pooled: _PooledConnection, now: float) -> bool:
+        return self.max_lifetime > 0 and now - pooled.created_at >= self.max_lifetime
+    
+    def _validate(self, pooled: _PooledConnection, now: float) -> bool:
+        if not pooled.conn.open:
+            return False
+        if self.pre_ping and now - pooled.last_used >= self.ping_interval:
+            try:
+                pooled.conn.ping(reconnect=False)
+            except Exception:
+                return False
+        return True
+    
+    def _evict_idle_locked(self, now: float) -> List[_PooledConnection]:
+        # 가장 오래 쉬고 있는 연결부터 min_size 까지만 정리
+        evicted = []
+        while self._idle and self._opened > self.min_size:
+            pooled = self._idle[0]
+            if self._expired(pooled, now):
+                self._stats['evicted_lifetime'] += 1
+            elif self.idle_timeout > 0 and now - pooled.last_used >= self.idle_timeout:
+                self._stats['evicted_idle'] += 1
+            else:
+                break
+            self._idle.popleft()
+            self._opened -= 1
+            evicted.append(pooled)
+        return evicted
+    
+    def _acquire(self) -> _PooledConnection:
+        deadline = time.monotonic() + self.checkout_timeout
+        waited = False
+        wait_started = None
+        
+        while True:
+            pooled = None
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeoutError(2013, "커넥션 풀이 종료되었습니다")
+                while not self._idle and self._opened >= self.pool_size:
+                    if not waited:
+                        waited = True
+                        wait_started = time.monotonic()
+                        self._stats['waits'] += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['wait_timeouts'] += 1
+                        raise PoolTimeoutError(
+                            2013, f"커넥션 풀 대기 시간 초과 ({self.checkout_timeout}s, max={self.pool_size})")
+                    self._cond.wait(remaining)
+                
+                if waited:
+                    self._stats['wait_time_total'] += time.monotonic() - wait_started
+                    waited = False
+                
+                if self._idle:
+                    # LIFO: 최근에 사용된 연결을 재사용해 오래된 연결은 자연스럽게 정리되도록 함
+                    pooled = self._idle.pop()
+                else:
+                    self._opened += 1
+            
+            if pooled is None:
+                try:
+                    pooled = _PooledConnection(self._connect())
+                except Exception:
+                    self._release_slot()
+                    raise
+                with self._cond:
+                    self._stats['created'] += 1
+                    self._stats['checkouts'] += 1
+                return pooled
+            
+            now = time.monotonic()
+            if not self._expired(pooled, now) and self._validate(pooled, now):
+                with self._cond:
+                    self._stats['checkouts'] += 1
+                return pooled
+            
+            # 만료되었거나 끊어진 연결은 버리고 같은 슬롯으로 새로 연결
+            self._close_quietly(pooled.conn)
+            try:
+                pooled = _PooledConnection(self._connect())
+            except Exception:
+                self._release_slot()
+                raise
+            with self._cond:
+                self._stats['reconnects'] += 1
+                self._stats['checkouts'] += 1
+            return pooled
+    
+    def _release_slot(self):
+        with self._cond:
+            self._opened -= 1
+            self._cond.notify()
+    
+    def _release(self, pooled: _PooledConnection, discard: bool = False):
+        now = time.monotonic()
+        discard = discard or self._closed or not pooled.conn.open or self._expired(pooled, now)
+        # 커밋되지 않은 트랜잭션/REPEATABLE READ 스냅샷이 다음 사용자에게 넘어가지 않도록 반환 전 항상 롤백
+        # (스트리밍 응답 중 연결 종료로 GeneratorExit 가 난 경우 등) - 롤백이 실패한 연결은 버림
+        if not discard:
+            discard = not self._rollback(pooled.conn)
+        if discard:
+            self._close_quietly(pooled.conn)
+            with self._cond:
+                self._stats['discarded'] += 1
+            self._release_slot()
+            return
+        
+        pooled.last_used = now
+        with self._cond:
+            self._idle.append(pooled)
+            evicted = self._evict_idle_locked(now)
+            self._cond.notify()
+        for item in evicted:
+            self._close_quietly(item.conn)
+    
     @contextmanager
     def get_connection(self):
-        conn = None
+        started = time.perf_counter()
+        try:
+            pooled = self._acquire()
+        except PoolTimeoutError:
+            metrics.observe('db_checkout_seconds', (('outcome', 'timeout'),), time.perf_counter() - started)
+            raise
+        metrics.observe('db_checkout_seconds', (('outcome', 'ok'),), time.perf_counter() - started)
+        conn = pooled.conn
+        discard = False
         try:
-            conn = pymysql.connect(
-                host=config.DB_HOST,
-                port=config.DB_PORT,
-                user=config.DB_USER,
-                password=config.DB_PASS,
-                db=config.DB_NAME,
-                charset='utf8mb4',
-                autocommit=False,
-                cursorclass=pymysql.cursors.DictCursor,
-                connect_timeout=5,
-                read_timeout=10,
-                write_timeout=10
-            )
             yield conn
         except pymysql.Error as e:
-            if conn:
-                conn.rollback()
+            discard = isinstance(e, (pymysql.err.OperationalError, pymysql.err.InterfaceError))
             logger.error(f"Database error: {e}")
             raise
         except Exception as e:
-            if conn:
-                conn.rollback()
             logger.error(f"Unexpected database error: {e}")
             raise
         finally:
-            if conn:
-                conn.close()
+            self._release(pooled, discard)
+    
+    @staticmethod
+    def _rollback(conn) -> bool:
+        try:
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+    
+    def warm_up(self):
+        created = []
+        with self._cond:
+            needed = max(0, self.min_size - self._opened)
+            self._opened += needed
+        try:
+            for _ in range(needed):
+                created.append(_PooledConnection(self._connect()))
+        finally:
+            with self._cond:
+                self._opened -= needed - len(created)
+                self._stats['created'] += len(created)
+                self._idle.extend(created)
+                self._cond.notify_all()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                **self._stats,
+                'wait_time_total': round(self._stats['wait_time_total'], 4),
+                'size': self._opened,
+                'idle': idle,
+                'in_use': self._opened - idle,
+                'min_size': self.min_size,
+                'max_size': self.pool_size,
+            }
+    
+    def close_all(self):
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._opened -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._close_quietly(pooled.conn)
 
 db_manager = DatabaseManager()
 
-def sanitize_input(data: Any) -> Any:
-    if isinstance(data, str):
-        return bleach.clean(escape(data.strip()))
-    elif isinstance(data, dict):
-        return {k: sanitize_input(v) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [sanitize_input(item) for item in data]
-    return data
-
 def validate_required_fields(data: Dict[str, Any], required_fields: List[str]) -> Tuple[bool, str]:
     missing_fields = [field for field in required_fields if not data.get(field)]
     if missing_fields:
@@ -176,44 +660,426 @@ class UserInfo:
             hospital=data.get('hospital', 'unknown')
         )
 
-def log_to_esm_async(action: str, user_info: UserInfo, additional_info: str = ""):
-    def _log():
-        try:
-            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            log_message = (f"[{action}] 입력자: {user_info.email}, "
-                         f"이름: {user_info.doctor_name}, "
-                         f"소속: {user_info.hospital}, "
-                         f"입력시각: {now}")
-            
-            if additional_info:
-                log_message += f", {additional_info}"
-            
-            esm_logger.info(log_message)
-            logger.info(f"[HIE ESM LOG] {log_message}")
+class SanitizedString(ma_fields.String):
+    def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        value = super()._deserialize(value, attr, data, **kwargs)
+        # 백엔드에서 이미 정제된 요청은 공백 제거만 수행
+        if self.context.get('trusted'):
+            return value.strip()
+        return sanitize_text(value)
+
+class RecordId(ma_fields.Field):
+    def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, bool) or not str(value).isdigit():
+            raise ValidationError('잘못된 레코드 ID입니다')
+        return value
+
+def _text(max_length: int, **kwargs) -> SanitizedString:
+    return SanitizedString(validate=ma_validate.Length(max=max_length), **kwargs)
+
+class RequestSchema(Schema):
+    class Meta:
+        unknown = EXCLUDE
+    
+    user_email = _text(255)
+    doctor_name = _text(100)
+    hospital = _text(100)
+
+class PatientSearchSchema(RequestSchema):
+    includeExternal = ma_fields.Boolean()
+    name = _text(100)
+    patient_id = _text(100)
+    birth6 = _text(6)
+    ssn = _text(20)
+    start_date = _text(30)
+    end_date = _text(30)
+    department = _text(100)
+    doctor_name_search = _text(100)
+    max_rows = ma_fields.Integer(validate=ma_validate.Range(min=1))
+    continuation = ma_fields.String(validate=ma_validate.Length(max=1000))
+
+class MedicalRecordSchema(RequestSchema):
+    patient_no = _text(100)
+    name = _text(100)
+    gender = _text(10)
+    ssn = _text(20)
+    address = _text(500)
+    department = _text(100)
+    disease_code = _text(50)
+    diagnosis = _text(500)
+    visit_start = _text(30)
+    visit_end = _text(30)
+    description = _text(5000)
+    note = _text(5000)
+    hospital_address = _text(500)
+    issue_date = _text(30)
+
+class UnmaskSchema(RequestSchema):
+    record_id = RecordId()
+    fields = ma_fields.List(_text(50), validate=ma_validate.Length(max=20))
+
+class UnmaskBatchItemSchema(Schema):
+    class Meta:
+        unknown = EXCLUDE
+    
+    record_id = RecordId(required=True)
+    fields = ma_fields.List(_text(50), validate=ma_validate.Length(max=20))
+
+class UnmaskBatchSchema(RequestSchema):
+    requests = ma_fields.List(ma_fields.Nested(UnmaskBatchItemSchema))
+    record_ids = ma_fields.List(RecordId())
+    fields = ma_fields.List(_text(50), validate=ma_validate.Length(max=20))
+
+class AuditLogSearchSchema(RequestSchema):
+    action = _text(100)
+    start_date = _text(30)
+    end_date = _text(30)
+    page = ma_fields.Integer()
+    limit = ma_fields.Integer()
+    cursor = ma_fields.String(validate=ma_validate.Length(max=1000))
+    user_email_match = _text(10)
+    hospital_match = _text(10)
+
+class ProfileStartSchema(Schema):
+    class Meta:
+        unknown = EXCLUDE
+    
+    duration = ma_fields.Float(validate=ma_validate.Range(min=0.1, max=300))
+    sample_percent = ma_fields.Float(validate=ma_validate.Range(min=0, max=100, min_inclusive=False))
+    interval_ms = ma_fields.Float(validate=ma_validate.Range(min=1, max=1000))
+
+def _is_trusted_upstream() -> bool:
+    token = request.headers.get('X-HIE-Upstream-Token')
+    return bool(config.HIE_UPSTREAM_TOKEN and token and
+                hmac.compare_digest(token, config.HIE_UPSTREAM_TOKEN))
+
+def validate_json(schema_cls):
+    # 스키마는 엔드포인트마다 한 번만 생성해 재사용
+    schema = schema_cls()
+    trusted_schema = schema_cls(context={'trusted': True})
+    
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            data = request.get_json(silent=True)
+            if data is None:
+                request.validated_json = None
+                return f(*args, **kwargs)
             
+            try:
+                loader = trusted_schema if _is_trusted_upstream() else schema
+                request.validated_json = loader.load(data)
+            except ValidationError as e:
+                logger.warning(f"요청 검증 실패 ({request.path}): {e.messages}")
+                return jsonify({'result': 'fail', 'msg': '잘못된 요청 형식입니다', 'errors': e.messages}), 400
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
+
+def _estimate_table_rows(cur, table: str) -> int:
+    cur.execute(
+        "SELECT TABLE_ROWS AS estimate FROM information_schema.TABLES "
+        "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+        (config.DB_NAME, table)
+    )
+    row = cur.fetchone()
+    return int(row['estimate'] or 0) if row else 0
+
+class AuditLogCounter:
+    """audit_logs 전체 건수 근사값
+
+    프로세스별로 유지되므로 다른 워커가 기록한 행은 다음 동기화 때 반영되고,
+    동기화 중 기록된 행은 COUNT 스냅샷과 중복 집계될 수 있다 - 정확한 값으로 보고하지 않는다.
+    """
+    
+    def __init__(self, resync_interval: float):
+        self.resync_interval = resync_interval
+        self._lock = threading.Lock()
+        self._total = None
+        self._synced_at = 0.0
+        self._syncing = False
+        self._pending = 0
+    
+    def add(self, amount: int):
+        with self._lock:
+            if self._total is not None:
+                self._total += amount
+            if self._syncing:
+                self._pending += amount
+    
+    def _resync(self):
+        try:
+            with db_manager.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT COUNT(*) AS total FROM audit_logs")
+                    row = cur.fetchone()
+                conn.commit()
+            total = row['total'] if row else 0
+            with self._lock:
+                # COUNT 실행 중 기록된 행은 스냅샷에 포함되지 않았을 수 있으므로 다시 더함
+                self._total = total + self._pending
+                self._synced_at = time.monotonic()
+            logger.info(f"감사 로그 총건수 동기화: {self._total}")
+        except Exception as e:
+            logger.error(f"감사 로그 총건수 동기화 실패: {e}")
+        finally:
+            with self._lock:
+                self._syncing = False
+                self._pending = 0
+    
+    def _schedule_resync_locked(self):
+        if self._syncing:
+            return
+        self._syncing = True
+        self._pending = 0
+        threading.Thread(target=self._resync, name="hie-audit-count", daemon=True).start()
+    
+    def get(self) -> Optional[int]:
+        with self._lock:
+            stale = time.monotonic() - self._synced_at >= self.resync_interval
+            if self._total is None or stale:
+                self._schedule_resync_locked()
+            return self._total
+
+audit_log_counter = AuditLogCounter(config.AUDIT_COUNT_RESYNC_INTERVAL)
+
+class _AuditStopRequest:
+    __slots__ = ('event',)
+    
+    def __init__(self):
+        self.event = threading.Event()
+
+class AuditPriorityQueue(queue.Queue):
+    """(priority, enqueued_at, item) 를 우선순위별 FIFO 로 보관하는 bounded 큐 - 높은 우선순위부터 꺼냄"""
+    HIGH, NORMAL, LOW = 0, 1, 2
+    PRIORITY_NAMES = ('high', 'normal', 'low')
+    # 종료 요청 전용 슬롯 - 모든 우선순위의 항목 뒤에 꺼내지며 밀어내기 대상이 아님
+    STOP = len(PRIORITY_NAMES)
+    
+    def _init(self, maxsize):
+        self.queue = [deque() for _ in range(self.STOP + 1)]
+    
+    def _qsize(self):
+        return sum(len(items) for items in self.queue)
+    
+    def _put(self, item):
+        self.queue[item[0]].append(item)
+    
+    def _get(self):
+        for items in self.queue:
+            if items:
+                return items.popleft()
+    
+    def put_evicting(self, item, timeout: float):
+        # 가득 차 있으면 자신보다 우선순위가 낮은 가장 오래된 항목을 밀어내고, 없으면 timeout 동안 대기
+        deadline = time.monotonic() + timeout
+        with self.not_full:
+            while self._qsize() >= self.maxsize > 0:
+                for lower in range(self.STOP - 1, item[0], -1):
+                    if self.queue[lower]:
+                        evicted = self.queue[lower].popleft()
+                        self._put(item)
+                        self.not_empty.notify()
+                        return evicted
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise queue.Full
+                self.not_full.wait(remaining)
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+            return None
+    
+    def depth(self) -> Dict[str, int]:
+        with self.mutex:
+            return {name: len(items) for name, items in zip(self.PRIORITY_NAMES, self.queue)}
+
+class AuditLogWriter:
+    INSERT_SQL = """
+    INSERT INTO audit_logs (action, user_email, user_name, hospital, additional_info, created_at)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    """
+    
+    REJECTION_POLICIES = ('drop_new', 'drop_lowest', 'block')
+    
+    def __init__(self, queue_size: int, batch_size: int, flush_interval: float, enqueue_timeout: float,
+                 rejection_policy: str = 'drop_lowest'):
+        if rejection_policy not in self.REJECTION_POLICIES:
+            raise ValueError(f"지원하지 않는 감사 로그 거부 정책입니다: {rejection_policy}")
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.rejection_policy = rejection_policy
+        self._queue = AuditPriorityQueue(maxsize=queue_size)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'evicted': 0,
+            'failed': 0,
+            'batches': 0,
+            'max_queue_depth': 0,
+        }
+        self._queue_wait = [LatencyHistogram() for _ in AuditPriorityQueue.PRIORITY_NAMES]
+        self._write_time = LatencyHistogram()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="hie-audit-writer", daemon=True)
+        self._thread.start()
+    
+    def _bump(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+    
+    def enqueue(self, action: str, user_info: 'UserInfo', additional_info: str, created_at: datetime,
+                priority: int = AuditPriorityQueue.NORMAL) -> bool:
+        if self._stopped:
+            self._bump('dropped')
+            return False
+        
+        item = (priority, time.monotonic(), (action, user_info.email, user_info.doctor_name, user_info.hospital, additional_info, created_at))
+        evicted = None
+        try:
+            # 큐가 가득 차면 정책에 따라 낮은 우선순위를 밀어내거나 enqueue_timeout 동안만 기다린 뒤 버림
+            if self.rejection_policy == 'drop_lowest':
+                evicted = self._queue.put_evicting(item, self.enqueue_timeout)
+            elif self.rejection_policy == 'block':
+                self._queue.put(item, timeout=self.enqueue_timeout)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            self._bump('dropped')
+            logger.warning(f"감사 로그 큐 포화로 이벤트 폐기: {action}")
+            return False
+        if evicted is not None:
+            self._bump('evicted')
+            logger.warning(f"감사 로그 큐 포화로 낮은 우선순위 이벤트 폐기: {evicted[2][0]}")
+        
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            self._stats['enqueued'] += 1
+            if depth > self._stats['max_queue_depth']:
+                self._stats['max_queue_depth'] = depth
+        return True
+    
+    def _write_batch(self, batch: List[tuple]):
+        started = time.monotonic()
+        try:
+            self._write_batch_with_retry(batch)
+        finally:
+            self._write_time.observe(time.monotonic() - started)
+    
+    def _write_batch_with_retry(self, batch: List[tuple]):
+        for attempt in range(2):
             try:
                 with db_manager.get_connection() as conn:
                     with conn.cursor() as cur:
-                        sql = """
-                        INSERT INTO audit_logs (action, user_email, user_name, hospital, additional_info)
-                        VALUES (%s, %s, %s, %s, %s)
-                        """
-                        cur.execute(sql, (
-                            action,
-                            user_info.email,
-                            user_info.doctor_name,
-                            user_info.hospital,
-                            additional_info
-                        ))
-                        conn.commit()
-                        logger.debug(f"[DB LOG] 로그 저장 완료: {action}")
-            except Exception as db_e:
-                logger.error(f"DB 로그 저장 실패: {db_e}")
-                
-        except Exception as e:
-            logger.error(f"로그 전송 실패: {e}")
+                        cur.executemany(self.INSERT_SQL, batch)
+                    conn.commit()
+                self._bump('written', len(batch))
+                self._bump('batches')
+                audit_log_counter.add(len(batch))
+                logger.debug(f"[DB LOG] 감사 로그 {len(batch)}건 저장 완료")
+                return
+            except Exception as e:
+                logger.error(f"DB 로그 저장 실패 ({len(batch)}건, 시도 {attempt + 1}): {e}")
+        self._bump('failed', len(batch))
+    
+    def _run(self):
+        batch = []
+        deadline = None
+        
+        while True:
+            timeout = self.flush_interval if not batch else max(0.0, deadline - time.monotonic())
+            try:
+                priority, enqueued_at, item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            
+            if isinstance(item, _AuditStopRequest):
+                # 종료 요청 앞에 쌓인 이벤트는 이미 모두 꺼냈으므로 남은 배치만 쓰고 종료
+                if batch:
+                    self._write_batch(batch)
+                item.event.set()
+                return
+            
+            if item is not None:
+                self._queue_wait[priority].observe(time.monotonic() - enqueued_at)
+                batch.append(item)
+                if len(batch) == 1:
+                    deadline = time.monotonic() + self.flush_interval
+            
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write_batch(batch)
+                batch = []
     
-    executor.submit(_log)
+    def stop(self, timeout: float = 10.0) -> bool:
+        self._stopped = True
+        if not self._thread.is_alive():
+            return True
+        request_ = _AuditStopRequest()
+        try:
+            # 전용 슬롯에 넣어 앞서 쌓인 이벤트를 모두 쓴 다음 종료 (HIGH 이벤트가 밀어내지 못함)
+            self._queue.put((AuditPriorityQueue.STOP, time.monotonic(), request_), timeout=timeout)
+        except queue.Full:
+            logger.error("감사 로그 큐 종료 요청 실패: 큐 포화")
+            return False
+        done = request_.event.wait(timeout)
+        self._thread.join(timeout)
+        return done
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        return {
+            **stats,
+            'rejection_policy': self.rejection_policy,
+            'queue_depth': self._queue.qsize(),
+            'queue_depth_by_priority': self._queue.depth(),
+            'queue_capacity': self._queue.maxsize,
+            'queue_wait_seconds': {name: hist.snapshot()
+                                   for name, hist in zip(AuditPriorityQueue.PRIORITY_NAMES, self._queue_wait)},
+            'write_seconds': self._write_time.snapshot()
+        }
+
+audit_writer = AuditLogWriter(
+    queue_size=config.AUDIT_QUEUE_SIZE,
+    batch_size=config.AUDIT_BATCH_SIZE,
+    flush_interval=config.AUDIT_FLUSH_INTERVAL,
+    enqueue_timeout=config.AUDIT_ENQUEUE_TIMEOUT,
+    rejection_policy=config.AUDIT_REJECTION_POLICY
+)
+
+def _audit_priority(action: str) -> int:
+    # 마스킹 해제/진료기록 입력 이벤트가 조회 시작 이벤트보다 먼저 처리되도록 함
+    if action.startswith(('개인정보', '진료')):
+        return AuditPriorityQueue.HIGH
+    if action.endswith('시작'):
+        return AuditPriorityQueue.LOW
+    return AuditPriorityQueue.NORMAL
+
+def format_audit_message(action: str, user_info: UserInfo, additional_info: str, created_at: datetime) -> str:
+    now = created_at.strftime('%Y-%m-%d %H:%M:%S')
+    log_message = (f"[{action}] 입력자: {user_info.email}, "
+                 f"이름: {user_info.doctor_name}, "
+                 f"소속: {user_info.hospital}, "
+                 f"입력시각: {now}")
+    
+    if additional_info:
+        log_message += f", {additional_info}"
+    return log_message
+
+def log_to_esm_async(action: str, user_info: UserInfo, additional_info: str = ""):
+    created_at = datetime.now()
+    audit_writer.enqueue(action, user_info, additional_info, created_at, priority=_audit_priority(action))
+    
+    # ESM 핸들러는 큐에 넣기만 하고 전송은 forwarder 스레드가 하므로 요청 스레드에서 바로 기록
+    try:
+        esm_logger.info(format_audit_message(action, user_info, additional_info, created_at))
+    except Exception as e:
+        logger.error(f"로그 전송 실패: {e}")
 
 class MaskingService:
     @staticmethod
@@ -247,14 +1113,379 @@ class MaskingService:
     def mask_description(description: Optional[str]) -> str:
         return "[마스킹됨]" if description else ""
 
+    @staticmethod
+    def mask_ssn(ssn: Optional[str]) -> Optional[str]:
+        return ssn[:6] + "-******" if ssn else ssn
+
+    def masked_columns(self, data: Dict[str, Any]) -> Tuple[str, str, Optional[str], str, str]:
+        # 저장 시점에 한 번만 계산하는 *_masked 컬럼 값 (INSERT 컬럼 순서와 동일)
+        return (
+            self.mask_name(data.get('name', '')),
+            self.mask_address(data.get('address', '')),
+            self.mask_ssn(data.get('ssn', '')),
+            self.mask_diagnosis(data.get('diagnosis', '')),
+            self.mask_description(data.get('description', ''))
+        )
+
+    def mask_pending_rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # *_masked 컬럼이 아직 채워지지 않은 행만 컬럼 단위로 모아서 마스킹
+        pending = [r for r in rows if r.get('mask_pending')]
+        if pending:
+            for column, masker in (('name', self.mask_name),
+                                   ('address', self.mask_address),
+                                   ('ssn', self.mask_ssn),
+                                   ('diagnosis', self.mask_diagnosis),
+                                   ('description', self.mask_description)):
+                raw_key = f'raw_{column}'
+                masked = list(map(masker, [r[raw_key] for r in pending]))
+                for r, value in zip(pending, masked):
+                    r[column] = value
+        
+        for r in rows:
+            for key in PENDING_MASK_KEYS:
+                r.pop(key, None)
+        return rows
+
+PENDING_MASK_KEYS = ('mask_pending', 'raw_name', 'raw_address', 'raw_ssn', 'raw_diagnosis', 'raw_description')
+
 masking_service = MaskingService()
 
+class PatientSearchCache:
+    """검색 결과 프로세스 내 LRU 캐시
+
+    결과 행은 *_masked 컬럼 값이며, 백필 전 행도 mask_pending_rows 로 마스킹한 뒤 저장한다.
+    Redis 는 범위별 세대 번호만 공유해 다른 워커에서 입력된 레코드도 즉시 무효화되도록 하고,
+    Redis 오류 시에는 로컬 번호로 대신하지 않고 캐시를 건너뛴다 (무효화 INCR 실패분은 TTL 안에 만료).
+    """
+    
+    GLOBAL_SCOPE = '*'
+    
+    def __init__(self, max_size: int, ttl: float, redis_url: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[float, int, List[Dict[str, Any]]]]' = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'redis_errors': 0, 'invalidations': 0, 'evictions': 0}
+        self._redis = None
+        if redis_url:
+            try:
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.2, socket_connect_timeout=0.2)
+            except Exception as e:
+                logger.error(f"환자 검색 캐시 Redis 설정 실패: {e}")
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+    
+    def make_key(self, include_external: bool, hospital: str, conditions: Tuple[str, ...]) -> Tuple[str, str]:
+        scope = self.GLOBAL_SCOPE if include_external or not hospital else hospital
+        digest = hashlib.sha256(json.dumps(conditions, ensure_ascii=False).encode()).hexdigest()
+        return scope, digest
+    
+    def _redis_error(self, e: Exception):
+        with self._lock:
+            self._stats['redis_errors'] += 1
+        logger.warning(f"환자 검색 캐시 Redis 오류: {e}")
+    
+    def _generation(self, scope: str) -> Optional[int]:
+        if self._redis is None:
+            with self._lock:
+                return self._generations.get(scope, 0)
+        try:
+            return int(self._redis.get(f"hie:pscache:gen:{scope}") or 0)
+        except Exception as e:
+            # 로컬 번호와 Redis 번호는 서로 다른 값이므로 섞지 않고 이번 조회는 캐시를 건너뜀
+            self._redis_error(e)
+            return None
+    
+    def get(self, key: Tuple[str, str]) -> Tuple[Optional[List[Dict[str, Any]]], Optional[int]]:
+        # 조회 시점의 세대 번호를 함께 반환해, DB 조회 중 무효화된 결과가 새 세대로 저장되지 않도록 함
+        if not self.enabled:
+            return None, None
+        
+        generation = self._generation(key[0])
+        if generation is None:
+            return None, None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, entry_generation, rows = entry
+                if expires_at > now and entry_generation == generation:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return [dict(r) for r in rows], generation
+                del self._entries[key]
+            self._stats['misses'] += 1
+        return None, generation
+    
+    def set(self, key: Tuple[str, str], generation: Optional[int], rows: List[Dict[str, Any]]):
+        if not self.enabled or generation is None:
+            return
+        
+        snapshot = [dict(r) for r in rows]
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, generation, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+    
+    def invalidate_hospital(self, hospital: str):
+        # 해당 병원 범위와 전체 병원 범위의 세대 번호만 올려 나머지 병원 캐시는 유지
+        scopes = [self.GLOBAL_SCOPE] + ([hospital] if hospital else [])
+        with self._lock:
+            self._stats['invalidations'] += 1
+            if self._redis is None:
+                for scope in scopes:
+                    self._generations[scope] = self._generations.get(scope, 0) + 1
+                return
+        
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for scope in scopes:
+                pipe.incr(f"hie:pscache:gen:{scope}")
+            pipe.execute()
+        except Exception as e:
+            self._redis_error(e)
+            # 다른 워커에는 알릴 수 없으므로 최소한 이 프로세스의 해당 범위 결과는 버림
+            with self._lock:
+                for key in [k for k in self._entries if k[0] in scopes]:
+                    del self._entries[key]
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, 'size': len(self._entries), 'redis': self._redis is not None}
+
+if config.WEB_CONCURRENCY > 1 and not config.PATIENT_CACHE_REDIS_URL and config.PATIENT_CACHE_SIZE > 0:
+    logger.warning(f"워커 {config.WEB_CONCURRENCY}개에서 PATIENT_CACHE_REDIS_URL 없이는 무효화를 공유할 수 없어 환자 검색 캐시를 끕니다")
+    config.PATIENT_CACHE_SIZE = 0
+
+patient_search_cache = PatientSearchCache(
+    max_size=config.PATIENT_CACHE_SIZE,
+    ttl=config.PATIENT_CACHE_TTL,
+    redis_url=config.PATIENT_CACHE_REDIS_URL
+)
+
+class BlindIndexService:
+    def __init__(self, key: Optional[str]):
+        self._key = key.encode() if key else None
+    
+    @property
+    def enabled(self) -> bool:
+        return self._key is not None
+    
+    @staticmethod
+    def normalize_ssn(ssn: Optional[str]) -> str:
+        return ''.join(ch for ch in (ssn or '') if ch.isdigit())
+    
+    def _digest(self, domain: str, value: str) -> Optional[bytes]:
+        if not self._key or not value:
+            return None
+        return hmac.new(self._key, f"{domain}:{value}".encode(), hashlib.sha256).digest()
+    
+    def birth6(self, value: Optional[str]) -> Optional[bytes]:
+        digits = self.normalize_ssn(value)
+        return self._digest('birth6', digits[:6]) if len(digits) >= 6 else None
+    
+    def ssn(self, value: Optional[str]) -> Optional[bytes]:
+        return self._digest('ssn', self.normalize_ssn(value))
+
+blind_index_service = BlindIndexService(config.DB_BLIND_INDEX_KEY)
+
+AUDIT_LOG_COLUMNS = "id, action, user_email, user_name, hospital, additional_info, created_at"
+
+AUDIT_ACTIONS = (
+    "진료입력시작", "진료입력완료", "진료입력실패",
+    "진료일괄입력", "진료일괄입력실패",
+    "내병원조회시작", "내병원조회완료", "내병원조회실패",
+    "전체병원조회시작", "전체병원조회완료", "전체병원조회실패",
+    "내병원조회중단", "전체병원조회중단",
+    "조회실패",
+    "개인정보마스킹해제", "개인정보마스킹해제실패",
+    "개인정보일괄마스킹해제", "개인정보일괄마스킹해제실패",
+)
+
+class AuditLogQueryBuilder:
+    MATCH_MODES = ('exact', 'prefix', 'contains')
+    NGRAM_TOKEN_SIZE = 2
+    
+    def __init__(self):
+        self.conditions: List[str] = []
+        self.params: List[Any] = []
+        self.plan: List[str] = []
+    
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    
+    def add_action(self, action: str):
+        if not action:
+            return
+        if action in AUDIT_ACTIONS:
+            # 알려진 action 이름이면 그 이름을 포함하는 action 집합의 IN 조회로 (action, created_at) 인덱스 사용
+            matched = [a for a in AUDIT_ACTIONS if action in a]
+            self.conditions.append(f"action IN ({', '.join(['%s'] * len(matched))})")
+            self.params.extend(matched)
+            self.plan.append(f"action=in({len(matched)})")
+        else:
+            # 그 밖의 부분 입력은 목록에 없는(과거) action 도 놓치지 않도록 LIKE 로 처리
+            self.conditions.append("action LIKE %s")
+            self.params.append(f"%{self._escape_like(action)}%")
+            self.plan.append("action=like")
+    
+    def add_text(self, column: str, value: str, mode: str):
+        if not value:
+            return
+        if mode not in self.MATCH_MODES:
+            raise ValueError(f"{column} 검색 방식이 올바르지 않습니다: {mode}")
+        
+        if mode == 'exact':
+            self.conditions.append(f"{column} = %s")
+            self.params.append(value)
+        elif mode == 'prefix':
+            self.conditions.append(f"{column} LIKE %s")
+            self.params.append(f"{self._escape_like(value)}%")
+        elif len(value) >= self.NGRAM_TOKEN_SIZE:
+            # ngram FULLTEXT 인덱스로 후보를 좁히고 LIKE 로 정확히 재확인
+            phrase = value.replace('"', ' ')
+            self.conditions.append(f"MATCH({column}) AGAINST (%s IN BOOLEAN MODE) AND {column} LIKE %s")
+            self.params.extend([f'"{phrase}"', f"%{self._escape_like(value)}%"])
+            mode = 'fulltext'
+        else:
+            self.conditions.append(f"{column} LIKE %s")
+            self.params.append(f"%{self._escape_like(value)}%")
+            mode = 'like'
+        self.plan.append(f"{column}={mode}")
+    
+    def add_date_range(self, start_date: str, end_date: str):
+        # DATE(created_at) 대신 원본 컬럼에 대한 반열린 구간 [start, end + 1일)
+        if start_date:
+            self.conditions.append("created_at >= %s")
+            self.params.append(datetime.strptime(start_date, '%Y-%m-%d'))
+        if end_date:
+            self.conditions.append("created_at < %s")
+            self.params.append(datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1))
+        if start_date or end_date:
+            self.plan.append("created_at=range")
+    
+    @property
+    def where_clause(self) -> str:
+        return " AND ".join(self.conditions) if self.conditions else "1=1"
+    
+    @property
+    def plan_description(self) -> str:
+        return ",".join(self.plan) if self.plan else "full"
+
+def _encode_token(payload: Dict[str, Any]) -> str:
+    raw = json.dumps(payload, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def _decode_token(token: str) -> Dict[str, Any]:
+    padded = token + '=' * (-len(token) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if not isinstance(payload, dict):
+        raise ValueError("token payload")
+    return payload
+
+def _encode_log_cursor(row: Dict[str, Any], direction: str) -> str:
+    return _encode_token({'t': row['created_at'].isoformat(), 'i': row['id'], 'd': direction})
+
+def _decode_log_cursor(cursor: str) -> Tuple[datetime, int, str]:
+    try:
+        payload = _decode_token(cursor)
+        direction = payload.get('d', 'next')
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        return datetime.fromisoformat(payload['t']), int(payload['i']), direction
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"잘못된 커서입니다: {e}")
+
+def _format_log_rows(logs: List[Dict[str, Any]]):
+    for log in logs:
+        if log['created_at']:
+            log['created_at'] = log['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+
+def _count_audit_logs(cur, where_clause: str, params: List[Any]) -> Tuple[int, bool]:
+    # 정확(True)으로 보고하는 값은 같은 트랜잭션의 COUNT(*) 결과뿐
+    threshold = config.AUDIT_COUNT_EXACT_THRESHOLD
+    if where_clause == "1=1":
+        approx = audit_log_counter.get()
+        if approx is None:
+            # 최초 동기화가 끝나기 전에는 테이블 통계로 대신함
+            approx = _estimate_table_rows(cur, 'audit_logs')
+        if approx > threshold:
+            return approx, False
+    
+    # threshold 까지만 세어보고 넘으면 옵티마이저 추정치를 사용
+    cur.execute(
+        f"SELECT COUNT(*) AS total FROM (SELECT 1 FROM audit_logs WHERE {where_clause} LIMIT %s) AS bounded",
+        list(params) + [threshold + 1]
+    )
+    row = cur.fetchone()
+    total = row['total'] if row else 0
+    if total <= threshold:
+        return total, True
+    
+    cur.execute(f"EXPLAIN SELECT 1 FROM audit_logs WHERE {where_clause}", params)
+    plan = cur.fetchone() or {}
+    estimate = int((plan.get('rows') or 0) * float(plan.get('filtered') or 100) / 100)
+    return max(estimate, total), False
+
+def _fetch_logs_keyset(cur, where_clause: str, params: List[Any], cursor: str, limit: int) -> Dict[str, Any]:
+    # (created_at, id) 기준 seek 페이지네이션: OFFSET 없이 커서 위치부터 limit+1 건만 읽음
+    conds = [where_clause]
+    seek_params = []
+    direction = 'next'
+    
+    if cursor:
+        created_at, log_id, direction = _decode_log_cursor(cursor)
+        op = '<' if direction == 'next' else '>'
+        conds.append(f"(created_at {op} %s OR (created_at = %s AND id {op} %s))")
+        seek_params = [created_at, created_at, log_id]
+    
+    order = "DESC" if direction == 'next' else "ASC"
+    sql = f"""
+    SELECT {AUDIT_LOG_COLUMNS}
+    FROM audit_logs
+    WHERE {' AND '.join(conds)}
+    ORDER BY created_at {order}, id {order}
+    LIMIT %s
+    """
+    cur.execute(sql, list(params) + seek_params + [limit + 1])
+    logs = list(cur.fetchall())
+    
+    has_more = len(logs) > limit
+    logs = logs[:limit]
+    if direction == 'prev':
+        logs.reverse()
+    
+    next_cursor = None
+    prev_cursor = None
+    if logs:
+        if direction == 'next':
+            next_cursor = _encode_log_cursor(logs[-1], 'next') if has_more else None
+            prev_cursor = _encode_log_cursor(logs[0], 'prev') if cursor else None
+        else:
+            next_cursor = _encode_log_cursor(logs[-1], 'next')
+            prev_cursor = _encode_log_cursor(logs[0], 'prev') if has_more else None
+    
+    _format_log_rows(logs)
+    return {
+        'logs': logs,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+        'has_more': has_more
+    }
+
 @app.route('/api/admin/logs', methods=['GET'])
 @limiter.limit("100 per minute")
 def get_audit_logs():
     try:
         page = int(request.args.get('page', 1))
         limit = int(request.args.get('limit', 20))
+        cursor = request.args.get('cursor')
         
         if page < 1:
             page = 1
@@ -265,24 +1496,22 @@ def get_audit_logs():
         
         with db_manager.get_connection() as conn:
             with conn.cursor() as cur:
-                count_sql = "SELECT COUNT(*) as total FROM audit_logs"
-                cur.execute(count_sql)
-                total_result = cur.fetchone()
-                total = total_result['total'] if total_result else 0
+                if cursor is not None:
+                    result = _fetch_logs_keyset(cur, "1=1", [], cursor, limit)
+                    conn.commit()
+                    return jsonify({'result': 'success', **result, 'limit': limit})
                 
-                sql = """
-                SELECT id, action, user_email, user_name, hospital, 
-                       additional_info, created_at
+                total, total_exact = _count_audit_logs(cur, "1=1", [])
+                
+                sql = f"""
+                SELECT {AUDIT_LOG_COLUMNS}
                 FROM audit_logs 
-                ORDER BY created_at DESC 
+                ORDER BY created_at DESC, id DESC 
                 LIMIT %s OFFSET %s
                 """
                 cur.execute(sql, (limit, offset))
                 logs = cur.fetchall()
-                
-                for log in logs:
-                    if log['created_at']:
-                        log['created_at'] = log['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+                _format_log_rows(logs)
                 
                 conn.commit()
                 
@@ -290,6 +1519,7 @@ def get_audit_logs():
                     'result': 'success',
                     'logs': logs,
                     'total': total,
+                    'total_exact': total_exact,
                     'page': page,
                     'limit': limit
                 })
@@ -303,9 +1533,10 @@ def get_audit_logs():
 
 @app.route('/api/admin/logs/search', methods=['POST'])
 @limiter.limit("50 per minute")
+@validate_json(AuditLogSearchSchema)
 def search_audit_logs():
     try:
-        data = sanitize_input(request.get_json() or {})
+        data = request.validated_json or {}
         
         action = data.get('action', '').strip()
         user_email = data.get('user_email', '').strip()
@@ -314,6 +1545,7 @@ def search_audit_logs():
         end_date = data.get('end_date', '').strip()
         page = int(data.get('page', 1))
         limit = int(data.get('limit', 20))
+        cursor = data.get('cursor')
         
         if page < 1:
             page = 1
@@ -322,48 +1554,34 @@ def search_audit_logs():
             
         offset = (page - 1) * limit
         
+        query = AuditLogQueryBuilder()
+        query.add_action(action)
+        query.add_text('user_email', user_email, data.get('user_email_match', 'contains'))
+        query.add_text('hospital', hospital, data.get('hospital_match', 'contains'))
+        query.add_date_range(start_date, end_date)
+        where_clause = query.where_clause
+        params = query.params
+        plan_header = {'X-Audit-Query-Plan': query.plan_description} if config.AUDIT_QUERY_PLAN_HEADER else {}
+        
         with db_manager.get_connection() as conn:
             with conn.cursor() as cur:
-                where_conditions = []
-                params = []
-                
-                if action:
-                    where_conditions.append("action LIKE %s")
-                    params.append(f"%{action}%")
-                if user_email:
-                    where_conditions.append("user_email LIKE %s")
-                    params.append(f"%{user_email}%")
-                if hospital:
-                    where_conditions.append("hospital LIKE %s")
-                    params.append(f"%{hospital}%")
-                if start_date:
-                    where_conditions.append("DATE(created_at) >= %s")
-                    params.append(start_date)
-                if end_date:
-                    where_conditions.append("DATE(created_at) <= %s")
-                    params.append(end_date)
+                if cursor is not None:
+                    result = _fetch_logs_keyset(cur, where_clause, params, str(cursor), limit)
+                    conn.commit()
+                    return jsonify({'result': 'success', **result, 'limit': limit}), 200, plan_header
                 
-                where_clause = " AND ".join(where_conditions) if where_conditions else "1=1"
-                
-                count_sql = f"SELECT COUNT(*) as total FROM audit_logs WHERE {where_clause}"
-                cur.execute(count_sql, params)
-                total_result = cur.fetchone()
-                total = total_result['total'] if total_result else 0
+                total, total_exact = _count_audit_logs(cur, where_clause, params)
                 
                 sql = f"""
-                SELECT id, action, user_email, user_name, hospital, 
-                       additional_info, created_at
+                SELECT {AUDIT_LOG_COLUMNS}
                 FROM audit_logs 
                 WHERE {where_clause}
-                ORDER BY created_at DESC 
+                ORDER BY created_at DESC, id DESC 
                 LIMIT %s OFFSET %s
                 """
                 cur.execute(sql, params + [limit, offset])
                 logs = cur.fetchall()
-                
-                for log in logs:
-                    if log['created_at']:
-                        log['created_at'] = log['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+                _format_log_rows(logs)
                 
                 conn.commit()
                 
@@ -371,9 +1589,10 @@ def search_audit_logs():
                     'result': 'success',
                     'logs': logs,
                     'total': total,
+                    'total_exact': total_exact,
                     'page': page,
                     'limit': limit
-                })
+                }), 200, plan_header
                 
     except ValueError as e:
         logger.warning(f"Invalid parameter in logs search: {e}")
@@ -382,11 +1601,70 @@ def search_audit_logs():
         logger.error(f"로그 검색 실패: {e}")
         return jsonify({'result': 'fail', 'msg': '로그 검색 중 오류가 발생했습니다'}), 500
 
+MEDICAL_RECORD_INSERT_PREFIX = """
+INSERT INTO medical_records (
+    patient_no, name, gender, ssn, address,
+    department, disease_code, diagnosis,
+    visit_start, visit_end,
+    description, note,
+    doctor_name, hospital, hospital_address,
+    issue_date, ssn_birth6_bidx, ssn_bidx,
+    name_masked, address_masked, ssn_masked, diagnosis_masked, description_masked,
+    created_at
+) VALUES """
+
+MEDICAL_RECORD_VALUES_ROW = """(
+    %s, %s, %s, AES_ENCRYPT(%s, %s), %s,
+    %s, %s, %s,
+    %s, %s,
+    %s, %s,
+    %s, %s, %s,
+    %s, %s, %s,
+    %s, %s, %s, %s, %s,
+    NOW()
+)"""
+
+MEDICAL_RECORD_INSERT_SQL = MEDICAL_RECORD_INSERT_PREFIX + MEDICAL_RECORD_VALUES_ROW
+
+def insert_medical_records(cur, rows: List[tuple]) -> int:
+    """_medical_record_params 결과들을 한 번의 다중 행 INSERT 로 입력하고 첫 레코드 ID를 반환
+
+    VALUES 에 AES_ENCRYPT/NOW() 가 있으면 pymysql executemany 가 다중 행으로 묶지 못하고
+    행마다 execute 하므로 (...),(...) 문장을 직접 만든다.
+    """
+    sql = MEDICAL_RECORD_INSERT_PREFIX + ",".join([MEDICAL_RECORD_VALUES_ROW] * len(rows))
+    cur.execute(sql, [value for row in rows for value in row])
+    return cur.lastrowid
+
+def _medical_record_params(data: Dict[str, Any]) -> tuple:
+    ssn = data.get('ssn', '')
+    return (
+        data.get('patient_no', ''),
+        data.get('name', ''),
+        data.get('gender', ''),
+        ssn, config.DB_AES_KEY,
+        data.get('address', ''),
+        data.get('department', ''),
+        data.get('disease_code', ''),
+        data.get('diagnosis', ''),
+        data.get('visit_start', ''),
+        data.get('visit_end', ''),
+        data.get('description', ''),
+        data.get('note', ''),
+        data.get('doctor_name', ''),
+        data.get('hospital', ''),
+        data.get('hospital_address', ''),
+        data.get('issue_date', ''),
+        blind_index_service.birth6(ssn),
+        blind_index_service.ssn(ssn)
+    ) + masking_service.masked_columns(data)
+
 @app.route('/api/medical-record', methods=['POST'])
 @limiter.limit("50 per minute")
+@validate_json(MedicalRecordSchema)
 def register_record():
     try:
-        data = sanitize_input(request.get_json())
+        data = request.validated_json
         if not data:
             return jsonify({'result': 'fail', 'msg': '요청 데이터가 없습니다'}), 400
         
@@ -405,44 +1683,11 @@ def register_record():
         
         with db_manager.get_connection() as conn:
             with conn.cursor() as cur:
-                sql = """
-                INSERT INTO medical_records (
-                    patient_no, name, gender, ssn, address,
-                    department, disease_code, diagnosis,
-                    visit_start, visit_end,
-                    description, note,
-                    doctor_name, hospital, hospital_address,
-                    issue_date, created_at
-                ) VALUES (
-                    %s, %s, %s, AES_ENCRYPT(%s, %s), %s,
-                    %s, %s, %s,
-                    %s, %s,
-                    %s, %s,
-                    %s, %s, %s,
-                    %s, NOW()
-                )
-                """
-                cur.execute(sql, (
-                    data.get('patient_no', ''),
-                    data.get('name', ''),
-                    data.get('gender', ''),
-                    data.get('ssn', ''), config.DB_AES_KEY,
-                    data.get('address', ''),
-                    data.get('department', ''),
-                    data.get('disease_code', ''),
-                    data.get('diagnosis', ''),
-                    data.get('visit_start', ''),
-                    data.get('visit_end', ''),
-                    data.get('description', ''),
-                    data.get('note', ''),
-                    data.get('doctor_name', ''),
-                    data.get('hospital', ''),
-                    data.get('hospital_address', ''),
-                    data.get('issue_date', '')
-                ))
+                cur.execute(MEDICAL_RECORD_INSERT_SQL, _medical_record_params(data))
                 
                 record_id = cur.lastrowid
                 conn.commit()
+                patient_search_cache.invalidate_hospital(data.get('hospital', ''))
                 
                 log_to_esm_async("진료입력완료", user_info, 
                                f"환자번호: {data.get('patient_no', 'N/A')}, 레코드ID: {record_id}, 결과: 성공")
@@ -462,22 +1707,175 @@ def register_record():
                        f"환자번호: {data.get('patient_no', 'N/A') if 'data' in locals() else 'N/A'}, 오류: {str(e)}")
         return jsonify({'result': 'fail', 'msg': '진료기록 등록 중 오류가 발생했습니다'}), 500
 
-@app.route('/api/patient/search', methods=['POST'])
-@limiter.limit("100 per minute")
-def patient_search():
+def _iter_bulk_rows(content_type: str):
+    if 'csv' in content_type:
+        reader = csv.DictReader(io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline=''))
+        for line_no, row in enumerate(reader, start=2):
+            yield line_no, row, None
+        return
+    
+    for line_no, raw in enumerate(request.stream, start=1):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError as e:
+            yield line_no, None, f"JSON 파싱 오류: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "레코드는 JSON 객체여야 합니다"
+            continue
+        yield line_no, row, None
+
+medical_record_schema = MedicalRecordSchema()
+
+def _insert_bulk_chunk(chunk: List[Tuple[int, Dict[str, Any]]]) -> Tuple[List[Tuple[int, int]], List[Tuple[int, Dict[str, Any], str]]]:
+    """청크를 한 트랜잭션으로 입력하고 ([(행 번호, 레코드 ID)], [(행 번호, 행, 오류)]) 반환"""
     try:
-        data = sanitize_input(request.get_json())
-        if not data:
-            return jsonify({'result': 'fail', 'msg': '요청 데이터가 없습니다'}), 400
-        
-        user_info = UserInfo.from_dict(data)
-        
+        with db_manager.get_connection() as conn:
+            with conn.cursor() as cur:
+                first_id = insert_medical_records(cur, [_medical_record_params(row) for _, row in chunk])
+            conn.commit()
+        # 단일 다중 행 INSERT 의 AUTO_INCREMENT 값은 연속 할당됨 (auto_increment_increment=1)
+        return [(line_no, first_id + i) for i, (line_no, _) in enumerate(chunk)], []
+    except pymysql.Error as e:
+        if len(chunk) == 1:
+            return [], [(chunk[0][0], chunk[0][1], f"DB오류: {e}")]
+        logger.warning(f"일괄 입력 청크 실패 ({len(chunk)}건), 나눠서 재시도: {e}")
+    
+    # 청크 전체가 롤백되었으므로 반씩 나눠 다시 입력해 문제 행만 골라냄
+    middle = len(chunk) // 2
+    inserted, failures = _insert_bulk_chunk(chunk[:middle])
+    more_inserted, more_failures = _insert_bulk_chunk(chunk[middle:])
+    return inserted + more_inserted, failures + more_failures
+
+@app.route('/api/medical-record/bulk', methods=['POST'])
+@limiter.limit("10 per minute")
+def register_records_bulk():
+    user_info = UserInfo(
+        email=sanitize_input(request.args.get('user_email', 'unknown')),
+        doctor_name=sanitize_input(request.args.get('doctor_name', 'unknown')),
+        hospital=sanitize_input(request.args.get('hospital', 'unknown'))
+    )
+    content_type = request.content_type or ''
+    if 'csv' not in content_type and 'ndjson' not in content_type:
+        return jsonify({'result': 'fail', 'msg': 'NDJSON 또는 CSV 형식만 지원합니다'}), 415
+    if user_info.hospital == 'unknown' or user_info.email == 'unknown':
+        return jsonify({'result': 'fail', 'msg': '입력자 정보가 필요합니다'}), 400
+    
+    chunk_size = config.BULK_CHUNK_SIZE
+    required_fields = ['patient_no', 'name']
+    total = inserted = chunks = 0
+    errors: List[Dict[str, Any]] = []
+    # 행 번호별 처리 결과 (성공 시 record_id, 실패 시 msg) - errors 와 달리 개수 제한 없음
+    results: List[Dict[str, Any]] = []
+    failed = 0
+    
+    def record_error(line_no: int, row: Optional[Dict[str, Any]], msg: str):
+        nonlocal failed
+        failed += 1
+        results.append({'line': line_no, 'status': 'failed', 'msg': msg})
+        if len(errors) < config.BULK_MAX_ERRORS:
+            errors.append({'line': line_no, 'patient_no': (row or {}).get('patient_no'), 'msg': msg})
+    
+    def flush(chunk: List[Tuple[int, Dict[str, Any]]]):
+        nonlocal inserted, chunks
+        inserted_rows, failures = _insert_bulk_chunk(chunk)
+        for line_no, row, msg in failures:
+            record_error(line_no, row, msg)
+        for line_no, record_id in inserted_rows:
+            results.append({'line': line_no, 'status': 'inserted', 'record_id': record_id})
+        chunks += 1
+        inserted += len(inserted_rows)
+        patient_search_cache.invalidate_hospital(user_info.hospital)
+        log_to_esm_async("진료일괄입력", user_info,
+                         f"청크: {chunks}, 행: {chunk[0][0]}-{chunk[-1][0]}, "
+                         f"성공: {len(inserted_rows)}건, 실패: {len(failures)}건")
+    
+    try:
+        chunk = []
+        for line_no, raw_row, parse_error in _iter_bulk_rows(content_type):
+            total += 1
+            if parse_error:
+                record_error(line_no, None, parse_error)
+                continue
+            
+            try:
+                row = medical_record_schema.load(raw_row)
+            except ValidationError as e:
+                record_error(line_no, None, f"형식 오류: {e.messages}")
+                continue
+            is_valid, error_msg = validate_required_fields(row, required_fields)
+            if not is_valid:
+                record_error(line_no, row, error_msg)
+                continue
+            
+            row['hospital'] = user_info.hospital
+            row.setdefault('doctor_name', user_info.doctor_name)
+            chunk.append((line_no, row))
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+    except Exception as e:
+        logger.error(f"Bulk medical record registration error: {e}")
+        log_to_esm_async("진료일괄입력실패", user_info, f"처리행: {total}건, 성공: {inserted}건, 오류: {str(e)}")
+        return jsonify({
+            'result': 'fail',
+            'msg': '진료기록 일괄 등록 중 오류가 발생했습니다',
+            'total': total,
+            'inserted': inserted,
+            'failed': failed,
+            'results': sorted(results, key=lambda r: r['line']),
+            'errors': errors
+        }), 500
+    
+    return jsonify({
+        'result': 'success' if failed == 0 else 'partial',
+        'total': total,
+        'inserted': inserted,
+        'failed': failed,
+        'chunks': chunks,
+        'results': sorted(results, key=lambda r: r['line']),
+        'errors': errors,
+        'errors_truncated': failed > len(errors)
+    })
+
+# 마스킹 컬럼만 읽고, backfill 전 행(name_masked IS NULL)에 대해서만 원본을 함께 읽어 mask_pending_rows 로 처리
+PATIENT_SEARCH_COLUMNS = """id, name_masked AS name, gender, address_masked AS address, ssn_masked AS ssn,
+            patient_no, hospital, department, '***' AS disease_code, diagnosis_masked AS diagnosis,
+            visit_start, visit_end, doctor_name, issue_date, description_masked AS description,
+            name_masked IS NULL AS mask_pending,
+            IF(name_masked IS NULL, CAST(AES_DECRYPT(ssn, %s) AS CHAR), NULL) AS raw_ssn,
+            IF(name_masked IS NULL, name, NULL) AS raw_name,
+            IF(name_masked IS NULL, address, NULL) AS raw_address,
+            IF(name_masked IS NULL, diagnosis, NULL) AS raw_diagnosis,
+            IF(name_masked IS NULL, description, NULL) AS raw_description"""
+
+@dataclass
+class PatientSearchQuery:
+    include_external: bool
+    search_type: str
+    search_info: str
+    cache_conditions: Tuple[str, ...]
+    conditions: List[str]
+    params: List[Any]
+    
+    @property
+    def where_clause(self) -> str:
+        return " AND ".join(self.conditions) if self.conditions else "1"
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], user_info: UserInfo) -> 'PatientSearchQuery':
         include_external = data.get('includeExternal', False)
         search_type = "전체병원조회" if include_external else "내병원조회"
         
         name = data.get('name', '').strip()
         patient_no = data.get('patient_id', '').strip()
         birth6 = data.get('birth6', '').strip()
+        ssn = data.get('ssn', '').strip()
         start_date = data.get('start_date', '').strip()
         end_date = data.get('end_date', '').strip()
         department = data.get('department', '').strip()
@@ -487,13 +1885,13 @@ def patient_search():
         if name: search_conditions.append(f"환자명:{name}")
         if patient_no: search_conditions.append(f"환자번호:{patient_no}")
         if birth6: search_conditions.append(f"생년월일:{birth6}")
+        if ssn: search_conditions.append("주민번호:******")
         if start_date: search_conditions.append(f"시작일:{start_date}")
         if end_date: search_conditions.append(f"종료일:{end_date}")
         if department: search_conditions.append(f"진료과:{department}")
         if doctor_name_search: search_conditions.append(f"담당의:{doctor_name_search}")
         
         search_info = f"검색조건: {', '.join(search_conditions) if search_conditions else '전체'}"
-        log_to_esm_async(f"{search_type}시작", user_info, search_info)
 
         conds = []
         params = []
@@ -512,9 +1910,21 @@ def patient_search():
             conds.append('patient_no=%s')
             params.append(patient_no)
         if birth6:
-            conds.append('LEFT(CAST(AES_DECRYPT(ssn, %s) AS CHAR),6)=%s')
-            params.append(config.DB_AES_KEY)
-            params.append(birth6)
+            if blind_index_service.enabled:
+                conds.append('ssn_birth6_bidx=%s')
+                params.append(blind_index_service.birth6(birth6))
+            else:
+                conds.append('LEFT(CAST(AES_DECRYPT(ssn, %s) AS CHAR),6)=%s')
+                params.append(config.DB_AES_KEY)
+                params.append(birth6)
+        if ssn:
+            if blind_index_service.enabled:
+                conds.append('ssn_bidx=%s')
+                params.append(blind_index_service.ssn(ssn))
+            else:
+                conds.append("REPLACE(CAST(AES_DECRYPT(ssn, %s) AS CHAR), '-', '')=%s")
+                params.append(config.DB_AES_KEY)
+                params.append(blind_index_service.normalize_ssn(ssn))
         if department:
             conds.append('department=%s')
             params.append(department)
@@ -527,37 +1937,73 @@ def patient_search():
         if end_date:
             conds.append('visit_end <= %s')
             params.append(end_date)
+        
+        return cls(
+            include_external=bool(include_external),
+            search_type=search_type,
+            search_info=search_info,
+            cache_conditions=(name, patient_no, birth6, ssn, start_date, end_date, department, doctor_name_search),
+            conditions=conds,
+            params=params
+        )
 
-        sql = """
-        SELECT id, name, gender, address, CAST(AES_DECRYPT(ssn, %s) AS CHAR) AS ssn,
-            patient_no, hospital, department, disease_code, diagnosis,
-            visit_start, visit_end, doctor_name, issue_date, description
-        FROM medical_records WHERE 
-        """
-        sql += " AND ".join(conds) if conds else "1"
-        sql += " ORDER BY visit_start DESC LIMIT 100"
+def _encode_search_continuation(visit_start: Optional[date], record_id: int) -> str:
+    # DATETIME 컬럼이면 시각까지 그대로 넣어야 같은 날짜의 나머지 행을 건너뛰지 않음
+    return _encode_token({'v': visit_start.isoformat() if visit_start else None, 'i': record_id})
+
+def _decode_search_continuation(token: str) -> Tuple[Optional[date], int]:
+    try:
+        payload = _decode_token(token)
+        value = payload.get('v')
+        if not value:
+            visit_start = None
+        elif len(value) > 10:
+            visit_start = datetime.fromisoformat(value)
+        else:
+            visit_start = date.fromisoformat(value)
+        return visit_start, int(payload['i'])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"잘못된 continuation 토큰입니다: {e}")
+
+def _search_seek_condition(visit_start: Optional[date], record_id: int) -> Tuple[str, List[Any]]:
+    # ORDER BY visit_start DESC 에서 NULL 은 맨 뒤에 오므로 NULL 구간을 따로 처리
+    if visit_start is None:
+        return '(visit_start IS NULL AND id < %s)', [record_id]
+    return ('(visit_start < %s OR (visit_start = %s AND id < %s) OR visit_start IS NULL)',
+            [visit_start, visit_start, record_id])
+
+@app.route('/api/patient/search', methods=['POST'])
+@limiter.limit("100 per minute")
+@validate_json(PatientSearchSchema)
+def patient_search():
+    try:
+        data = request.validated_json
+        if not data:
+            return jsonify({'result': 'fail', 'msg': '요청 데이터가 없습니다'}), 400
         
-        with db_manager.get_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(sql, [config.DB_AES_KEY] + params)
-                result = cur.fetchall()
-                conn.commit()
+        user_info = UserInfo.from_dict(data)
         
-        for r in result:
-            if r['ssn']:
-                r['ssn'] = r['ssn'][:6] + "-******"
-            
-            r['original_name'] = r['name']
-            r['original_address'] = r['address']
-            r['original_disease_code'] = r['disease_code']
-            r['original_diagnosis'] = r['diagnosis']
-            r['original_description'] = r['description']
-            
-            r['name'] = masking_service.mask_name(r['name'])
-            r['address'] = masking_service.mask_address(r['address'])
-            r['disease_code'] = "***"
-            r['diagnosis'] = masking_service.mask_diagnosis(r['diagnosis'])
-            r['description'] = masking_service.mask_description(r['description'])
+        query = PatientSearchQuery.from_dict(data, user_info)
+        include_external = query.include_external
+        search_type = query.search_type
+        search_info = query.search_info
+        log_to_esm_async(f"{search_type}시작", user_info, search_info)
+
+        sql = f"""
+        SELECT {PATIENT_SEARCH_COLUMNS}
+        FROM medical_records WHERE {query.where_clause}
+        ORDER BY visit_start DESC LIMIT 100
+        """
+        
+        cache_key = patient_search_cache.make_key(include_external, user_info.hospital, query.cache_conditions)
+        result, cache_generation = patient_search_cache.get(cache_key)
+        if result is None:
+            with db_manager.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(sql, [config.DB_AES_KEY] + query.params)
+                    result = masking_service.mask_pending_rows(cur.fetchall())
+                    conn.commit()
+            patient_search_cache.set(cache_key, cache_generation, result)
         
         record_count = len(result)
         log_to_esm_async(f"{search_type}완료", user_info, 
@@ -583,11 +2029,120 @@ def patient_search():
         log_to_esm_async(f"{locals().get('search_type', '조회')}실패", user_info, f"오류: {str(e)}, {search_info}")
         return jsonify({'records': [], 'from': 'error', 'msg': '환자 검색 중 오류가 발생했습니다'}), 500
 
+@app.route('/api/patient/search/stream', methods=['POST'])
+@limiter.limit("30 per minute")
+@validate_json(PatientSearchSchema)
+def patient_search_stream():
+    try:
+        data = request.validated_json
+        if not data:
+            return jsonify({'result': 'fail', 'msg': '요청 데이터가 없습니다'}), 400
+        
+        user_info = UserInfo.from_dict(data)
+        query = PatientSearchQuery.from_dict(data, user_info)
+        max_rows = int(data.get('max_rows', config.PATIENT_STREAM_MAX_ROWS))
+        if max_rows < 1 or max_rows > config.PATIENT_STREAM_MAX_ROWS:
+            max_rows = config.PATIENT_STREAM_MAX_ROWS
+        
+        continuation = data.get('continuation')
+        start_after = _decode_search_continuation(str(continuation)) if continuation else None
+    except ValueError as e:
+        logger.warning(f"Invalid parameter in patient search stream: {e}")
+        return jsonify({'result': 'fail', 'msg': '잘못된 검색 매개변수입니다'}), 400
+    
+    search_type = query.search_type
+    search_info = f"{query.search_info}, 스트리밍"
+    log_to_esm_async(f"{search_type}시작", user_info, search_info)
+    
+    search_type_display = "전체 병원" if query.include_external else f"{user_info.hospital}"
+    
+    def fetch_page(last, limit):
+        conds = list(query.conditions)
+        params = list(query.params)
+        if last:
+            cond, seek_params = _search_seek_condition(*last)
+            conds.append(cond)
+            params.extend(seek_params)
+        sql = f"""
+        SELECT {PATIENT_SEARCH_COLUMNS}
+        FROM medical_records WHERE {" AND ".join(conds) if conds else "1"}
+        ORDER BY visit_start DESC, id DESC LIMIT %s
+        """
+        with db_manager.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, [config.DB_AES_KEY] + params + [limit + 1])
+                rows = cur.fetchall()
+            conn.commit()
+        return rows
+    
+    def generate():
+        count = 0
+        last = start_after
+        has_more = False
+        try:
+            # 페이지마다 커넥션을 반납한 뒤 전송: 느린 클라이언트가 풀 커넥션을 잡고 있지 않도록 함
+            while True:
+                limit = min(config.PATIENT_STREAM_CHUNK_SIZE, max_rows - count)
+                rows = fetch_page(last, limit)
+                more = len(rows) > limit
+                rows = rows[:limit]
+                if rows:
+                    masking_service.mask_pending_rows(rows)
+                    count += len(rows)
+                    last = (rows[-1]['visit_start'], rows[-1]['id'])
+                    yield "\n".join(app.json.dumps(r) for r in rows) + "\n"
+                if not more:
+                    break
+                if count >= max_rows:
+                    has_more = True
+                    break
+            
+            next_token = _encode_search_continuation(*last) if has_more and last else None
+            yield app.json.dumps({
+                'type': 'end',
+                'from': search_type_display,
+                'count': count,
+                'continuation': next_token
+            }) + "\n"
+            log_to_esm_async(f"{search_type}완료", user_info, f"조회결과: {count}건, {search_info}")
+        except GeneratorExit:
+            log_to_esm_async(f"{search_type}중단", user_info, f"전송건수: {count}건, {search_info}")
+            raise
+        except Exception as e:
+            logger.error(f"Patient search stream error: {e}")
+            log_to_esm_async(f"{search_type}실패", user_info, f"오류: {str(e)}, {search_info}")
+            resume = _encode_search_continuation(*last) if last else None
+            yield app.json.dumps({
+                'type': 'error',
+                'msg': '환자 검색 중 오류가 발생했습니다',
+                'count': count,
+                'continuation': resume
+            }) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+# 해제 가능한 필드 (필드명 = 원본 컬럼명)
+UNMASK_FIELD_COLUMNS = ('name', 'address', 'disease_code', 'diagnosis', 'description')
+
+def _fetch_unmask_records(cur, record_ids: List[Any], fields) -> Dict[int, Dict[str, Any]]:
+    columns = [f for f in UNMASK_FIELD_COLUMNS if f in fields]
+    ids = [int(r) for r in record_ids if str(r).isdigit()]
+    if not ids:
+        return {}
+    
+    sql = f"""
+    SELECT {', '.join(['id'] + columns)}
+    FROM medical_records WHERE id IN ({', '.join(['%s'] * len(ids))})
+    """
+    cur.execute(sql, ids)
+    return {row['id']: row for row in cur.fetchall()}
+
 @app.route('/api/patient/unmask', methods=['POST'])
 @limiter.limit("20 per minute")
+@validate_json(UnmaskSchema)
 def unmask_patient_data():
     try:
-        data = sanitize_input(request.get_json())
+        data = request.validated_json
         if not data:
             return jsonify({'result': 'fail', 'msg': '요청 데이터가 없습니다'}), 400
         
@@ -604,14 +2159,9 @@ def unmask_patient_data():
         
         with db_manager.get_connection() as conn:
             with conn.cursor() as cur:
-                sql = """
-                SELECT id, name, gender, address, CAST(AES_DECRYPT(ssn, %s) AS CHAR) AS ssn,
-                    patient_no, hospital, department, disease_code, diagnosis,
-                    visit_start, visit_end, doctor_name, issue_date, description
-                FROM medical_records WHERE id = %s
-                """
-                cur.execute(sql, (config.DB_AES_KEY, record_id))
-                record = cur.fetchone()
+                # 감사 로그용 환자명 + 요청된 필드만 조회 (ssn 복호화 불필요)
+                records = _fetch_unmask_records(cur, [record_id], set(fields) | {'name'})
+                record = records.get(int(record_id)) if str(record_id).isdigit() else None
                 conn.commit()
                 
                 if not record:
@@ -621,10 +2171,9 @@ def unmask_patient_data():
                                f"레코드ID: {record_id}, 환자명: {masking_service.mask_name(record['name'])}, 해제필드: {', '.join(fields)}")
                 
                 unmasked_data = {}
-                valid_fields = ['name', 'address', 'disease_code', 'diagnosis', 'description']
                 
                 for field in fields:
-                    if field in valid_fields and field in record:
+                    if field in UNMASK_FIELD_COLUMNS and field in record:
                         unmasked_data[field] = record[field]
                 
                 return jsonify({
@@ -646,6 +2195,145 @@ def unmask_patient_data():
         log_to_esm_async("개인정보마스킹해제실패", user_info, f"레코드ID: {record_id}, 오류: {str(e)}")
         return jsonify({'result': 'fail', 'msg': '마스킹 해제 중 오류가 발생했습니다'}), 500
 
+@app.route('/api/patient/unmask/batch', methods=['POST'])
+@limiter.limit("20 per minute")
+@validate_json(UnmaskBatchSchema)
+def unmask_patient_data_batch():
+    try:
+        data = request.validated_json
+        if not data:
+            return jsonify({'result': 'fail', 'msg': '요청 데이터가 없습니다'}), 400
+        
+        user_info = UserInfo.from_dict(data)
+        
+        # {"requests": [{"record_id": 1, "fields": [...]}, ...]} 또는 {"record_ids": [...], "fields": [...]}
+        requested = data.get('requests')
+        if requested is None:
+            common_fields = data.get('fields', [])
+            requested = [{'record_id': r, 'fields': common_fields} for r in data.get('record_ids', [])]
+        
+        if not isinstance(requested, list) or not requested:
+            return jsonify({'result': 'fail', 'msg': '레코드 ID가 필요합니다'}), 400
+        if len(requested) > config.UNMASK_BATCH_MAX:
+            return jsonify({'result': 'fail', 'msg': f'한 번에 최대 {config.UNMASK_BATCH_MAX}건까지 해제할 수 있습니다'}), 400
+        
+        field_map: Dict[str, List[str]] = {}
+        for item in requested:
+            if not isinstance(item, dict):
+                return jsonify({'result': 'fail', 'msg': '잘못된 요청 형식입니다'}), 400
+            record_id = str(item.get('record_id', ''))
+            fields = [f for f in item.get('fields', []) if f in UNMASK_FIELD_COLUMNS]
+            if not record_id.isdigit():
+                return jsonify({'result': 'fail', 'msg': f'잘못된 레코드 ID입니다: {record_id}'}), 400
+            if not fields:
+                return jsonify({'result': 'fail', 'msg': '해제할 필드를 선택해주세요'}), 400
+            field_map.setdefault(record_id, [])
+            field_map[record_id].extend(f for f in fields if f not in field_map[record_id])
+        
+        all_fields = {f for fields in field_map.values() for f in fields}
+        
+        with db_manager.get_connection() as conn:
+            with conn.cursor() as cur:
+                records = _fetch_unmask_records(cur, list(field_map), all_fields)
+                conn.commit()
+        
+        unmasked = {}
+        not_found = []
+        for record_id, fields in field_map.items():
+            record = records.get(int(record_id))
+            if not record:
+                not_found.append(record_id)
+                continue
+            unmasked[record_id] = {f: record[f] for f in fields}
+        
+        log_to_esm_async("개인정보일괄마스킹해제", user_info,
+                         f"레코드: {len(unmasked)}건, 레코드ID: {', '.join(unmasked)}, "
+                         f"해제필드: {', '.join(sorted(all_fields))}")
+        
+        return jsonify({
+            'result': 'success',
+            'unmasked': unmasked,
+            'not_found': not_found
+        })
+        
+    except pymysql.Error as e:
+        logger.error(f"Database error in batch unmask: {e}")
+        user_info = UserInfo.from_dict(data) if 'data' in locals() else UserInfo("unknown", "unknown", "unknown")
+        record_ids = ', '.join(locals().get('field_map', {})) or 'N/A'
+        log_to_esm_async("개인정보일괄마스킹해제실패", user_info, f"레코드ID: {record_ids}, DB오류: {str(e)}")
+        return jsonify({'result': 'fail', 'msg': '데이터베이스 오류가 발생했습니다'}), 500
+    except Exception as e:
+        logger.error(f"Batch unmask error: {e}")
+        user_info = UserInfo.from_dict(data) if 'data' in locals() else UserInfo("unknown", "unknown", "unknown")
+        record_ids = ', '.join(locals().get('field_map', {})) or 'N/A'
+        log_to_esm_async("개인정보일괄마스킹해제실패", user_info, f"레코드ID: {record_ids}, 오류: {str(e)}")
+        return jsonify({'result': 'fail', 'msg': '마스킹 해제 중 오류가 발생했습니다'}), 500
+
+def _backfill_in_chunks(label: str, select_sql: str, select_params: tuple, update_sql: str,
+                        to_params, chunk_size: int) -> int:
+    last_id = 0
+    updated = 0
+    while True:
+        with db_manager.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(select_sql, select_params + (last_id, chunk_size))
+                rows = cur.fetchall()
+                if not rows:
+                    break
+                
+                cur.executemany(update_sql, [to_params(r) for r in rows])
+                conn.commit()
+        
+        last_id = rows[-1]['id']
+        updated += len(rows)
+        logger.info(f"{label} backfill: {updated}건 처리 (마지막 ID {last_id})")
+    return updated
+
+@app.cli.command('backfill-blind-index')
+@click.option('--chunk-size', default=1000, show_default=True, type=int)
+def backfill_blind_index(chunk_size: int):
+    if not blind_index_service.enabled:
+        raise click.ClickException("DB_BLIND_INDEX_KEY 환경변수가 설정되지 않았습니다")
+    
+    updated = _backfill_in_chunks(
+        'blind index',
+        """
+        SELECT id, CAST(AES_DECRYPT(ssn, %s) AS CHAR) AS ssn
+        FROM medical_records
+        WHERE ssn_birth6_bidx IS NULL AND id > %s
+        ORDER BY id
+        LIMIT %s
+        """,
+        (config.DB_AES_KEY,),
+        "UPDATE medical_records SET ssn_birth6_bidx=%s, ssn_bidx=%s WHERE id=%s",
+        lambda r: (blind_index_service.birth6(r['ssn']), blind_index_service.ssn(r['ssn']), r['id']),
+        chunk_size
+    )
+    click.echo(f"blind index backfill 완료: {updated}건")
+
+@app.cli.command('backfill-masked-columns')
+@click.option('--chunk-size', default=1000, show_default=True, type=int)
+def backfill_masked_columns(chunk_size: int):
+    updated = _backfill_in_chunks(
+        'masked columns',
+        """
+        SELECT id, name, address, CAST(AES_DECRYPT(ssn, %s) AS CHAR) AS ssn, diagnosis, description
+        FROM medical_records
+        WHERE name_masked IS NULL AND id > %s
+        ORDER BY id
+        LIMIT %s
+        """,
+        (config.DB_AES_KEY,),
+        """
+        UPDATE medical_records
+        SET name_masked=%s, address_masked=%s, ssn_masked=%s, diagnosis_masked=%s, description_masked=%s
+        WHERE id=%s
+        """,
+        lambda r: masking_service.masked_columns({k: v or '' for k, v in r.items()}) + (r['id'],),
+        chunk_size
+    )
+    click.echo(f"masked columns backfill 완료: {updated}건")
+
 @app.route('/')
 def index():
     return jsonify({
@@ -655,6 +2343,225 @@ def index():
         "timestamp": datetime.now().isoformat()
     })
 
+class _RequestTimer:
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+    
+    def __call__(self, environ, start_response):
+        # rate limiter 등 before_request에서 끝난 요청도 측정되도록 WSGI 단계에서 시작 시각 기록
+        environ['hie.request_started'] = time.perf_counter()
+        return self.wsgi_app(environ, start_response)
+
+app.wsgi_app = _RequestTimer(app.wsgi_app)
+
+@app.after_request
+def record_request_metrics(response):
+    started = request.environ.get('hie.request_started')
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        labels = (('method', request.method), ('route', route), ('status', str(response.status_code)))
+        metrics.inc('http_requests_total', labels)
+        if response.status_code >= 500:
+            metrics.inc('http_request_errors_total', labels)
+        metrics.observe('http_request_duration_seconds', labels, time.perf_counter() - started)
+    return response
+
+metrics.gauge('audit_queue_depth', '감사 로그 DB 저장 대기 건수', lambda: audit_writer.stats()['queue_depth'])
+metrics.gauge('esm_queue_depth', 'ESM 전송 대기 건수', lambda: esm_forwarder.stats()['queue_depth'] if esm_forwarder else 0)
+metrics.gauge('audit_queue_depth_by_priority', '감사 로그 DB 저장 대기 건수 (우선순위별)',
+              lambda: {(('priority', name),): depth for name, depth in audit_writer.stats()['queue_depth_by_priority'].items()})
+metrics.gauge('db_pool_connections', 'DB 커넥션 풀 상태별 커넥션 수',
+              lambda: {(('state', state),): db_manager.stats()[state] for state in ('idle', 'in_use')})
+
+@app.route('/metrics')
+@limiter.exempt
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+class SamplingProfiler:
+    """관리자 요청 시에만 켜지는 스택 샘플링 프로파일러 (비활성 시 요청당 속성 조회 1회)"""
+    
+    MAX_DURATION = 300.0
+    
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._tracked: Dict[int, str] = {}
+        self._stacks: Dict[Tuple[str, ...], int] = {}
+        self._sample_rate = 1.0
+        self._interval = 0.005
+        self._deadline = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._session: Dict[str, Any] = {}
+    
+    def start(self, duration: float, sample_rate: float, interval: float) -> Dict[str, Any]:
+        with self._lock:
+            if self.enabled:
+                raise RuntimeError("이미 프로파일링이 진행 중입니다")
+            self._stacks = {}
+            # 이전 세션에서 teardown 없이 남은 스레드가 새 세션에 섞이지 않도록 초기화
+            self._tracked = {}
+            self._sample_rate = sample_rate
+            self._interval = interval
+            self._deadline = time.monotonic() + min(duration, self.MAX_DURATION)
+            self._session = {
+                'started_at': datetime.now().isoformat(),
+                'duration': min(duration, self.MAX_DURATION),
+                'sample_rate': sample_rate,
+                'interval': interval,
+                'samples': 0,
+                'profiled_requests': 0
+            }
+            self.enabled = True
+            self._thread = threading.Thread(target=self._run, name="hie-profiler", daemon=True)
+            self._thread.start()
+        return self.status()
+    
+    def stop(self):
+        with self._lock:
+            self._deadline = 0.0
+        if self._thread:
+            self._thread.join(1.0)
+    
+    def begin_request(self, route: str):
+        if random.random() >= self._sample_rate:
+            return
+        with self._lock:
+            # 세션 종료(_tracked 정리)와 경합하면 종료 후에 등록되어 남을 수 있으므로 잠금 안에서 재확인
+            if not self.enabled:
+                return
+            self._tracked[threading.get_ident()] = route
+            self._session['profiled_requests'] += 1
+    
+    def end_request(self):
+        with self._lock:
+            self._tracked.pop(threading.get_ident(), None)
+    
+    @staticmethod
+    def _frame_stack(frame) -> Tuple[str, ...]:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        names.reverse()
+        return tuple(names)
+    
+    def _run(self):
+        while time.monotonic() < self._deadline:
+            with self._lock:
+                tracked = dict(self._tracked)
+            if tracked:
+                frames = sys._current_frames()
+                samples = [(route,) + self._frame_stack(frames[ident])
+                           for ident, route in tracked.items() if ident in frames]
+                with self._lock:
+                    for stack in samples:
+                        self._stacks[stack] = self._stacks.get(stack, 0) + 1
+                    self._session['samples'] += len(samples)
+            time.sleep(self._interval)
+        
+        with self._lock:
+            self.enabled = False
+            self._tracked.clear()
+            self._session['finished_at'] = datetime.now().isoformat()
+    
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'remaining': round(max(0.0, self._deadline - time.monotonic()), 1) if self.enabled else 0,
+                **self._session
+            }
+    
+    def collapsed(self, route: Optional[str] = None) -> str:
+        # flamegraph.pl / speedscope에서 바로 읽을 수 있는 "frame;frame;... count" 형식
+        with self._lock:
+            stacks = list(self._stacks.items())
+        lines = [f"{';'.join(stack)} {count}" for stack, count in stacks if route is None or stack[0] == route]
+        return '\n'.join(sorted(lines)) + '\n'
+    
+    def flamegraph(self, route: Optional[str] = None) -> Dict[str, Any]:
+        # d3-flame-graph 형식의 중첩 트리
+        with self._lock:
+            stacks = list(self._stacks.items())
+        root = {'name': 'all', 'value': 0, 'children': {}}
+        for stack, count in stacks:
+            if route is not None and stack[0] != route:
+                continue
+            node = root
+            node['value'] += count
+            for name in stack:
+                node = node['children'].setdefault(name, {'name': name, 'value': 0, 'children': {}})
+                node['value'] += count
+        
+        def _finish(node):
+            return {'name': node['name'], 'value': node['value'],
+                    'children': [_finish(child) for child in node['children'].values()]}
+        return _finish(root)
+
+profiler = SamplingProfiler()
+PROFILER_ENDPOINTS = ('start_profile', 'stop_profile', 'get_profile')
+
+@app.before_request
+def profile_request_start():
+    if profiler.enabled and request.url_rule is not None and request.endpoint not in PROFILER_ENDPOINTS:
+        profiler.begin_request(request.url_rule.rule)
+
+@app.teardown_request
+def profile_request_end(exc):
+    if profiler.enabled:
+        profiler.end_request()
+
+def require_trusted_upstream(f):
+    # HIE_UPSTREAM_TOKEN이 설정된 경우 백엔드(관리자 인증 완료)를 거친 요청만 허용
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if config.HIE_UPSTREAM_TOKEN and not _is_trusted_upstream():
+            return jsonify({'result': 'fail', 'msg': '권한이 없습니다'}), 403
+        return f(*args, **kwargs)
+    return decorated
+
+@app.route('/api/admin/profile', methods=['POST'])
+@limiter.limit("10 per minute")
+@require_trusted_upstream
+@validate_json(ProfileStartSchema)
+def start_profile():
+    data = request.validated_json or {}
+    try:
+        status = profiler.start(
+            duration=data.get('duration', 30),
+            sample_rate=data.get('sample_percent', 100) / 100,
+            interval=data.get('interval_ms', 5) / 1000
+        )
+    except RuntimeError as e:
+        return jsonify({'result': 'fail', 'msg': str(e)}), 409
+    
+    logger.info(f"프로파일링 시작: {status}")
+    return jsonify({'result': 'success', 'profile': status})
+
+@app.route('/api/admin/profile', methods=['DELETE'])
+@require_trusted_upstream
+def stop_profile():
+    profiler.stop()
+    logger.info(f"프로파일링 중지: {profiler.status()}")
+    return jsonify({'result': 'success', 'profile': profiler.status()})
+
+@app.route('/api/admin/profile', methods=['GET'])
+@limiter.limit("60 per minute")
+@require_trusted_upstream
+def get_profile():
+    output_format = request.args.get('format', 'collapsed')
+    route = request.args.get('route') or None
+    
+    if output_format == 'collapsed':
+        return Response(profiler.collapsed(route), mimetype='text/plain')
+    if output_format == 'flamegraph':
+        return jsonify({'result': 'success', 'profile': profiler.status(), 'flamegraph': profiler.flamegraph(route)})
+    if output_format == 'status':
+        return jsonify({'result': 'success', 'profile': profiler.status()})
+    return jsonify({'result': 'fail', 'msg': 'format은 collapsed, flamegraph, status 중 하나여야 합니다'}), 400
+
 @app.route('/health')
 def health_check():
     try:
@@ -669,6 +2576,11 @@ def health_check():
     return jsonify({
         "status": "healthy" if db_status == "healthy" else "unhealthy",
         "database": db_status,
+        "db_pool": db_manager.stats(),
+        "audit_writer": audit_writer.stats(),
+        "patient_search_cache": patient_search_cache.stats(),
+        "esm_forwarder": esm_forwarder.stats() if esm_forwarder else None,
+        "app_log": {"queue_depth": log_listener.queue.qsize(), "dropped": log_queue_handler.dropped},
         "timestamp": datetime.now().isoformat()
     }), 200 if db_status == "healthy" else 503
 
@@ -689,19 +2601,28 @@ import atexit
 
 def cleanup():
     logger.info("HIE 서버 종료 중...")
-    executor.shutdown(wait=True)
+    if not audit_writer.stop(timeout=config.AUDIT_DRAIN_TIMEOUT):
+        logger.error(f"감사 로그 flush 미완료: {audit_writer.stats()}")
+    if esm_forwarder:
+        esm_forwarder.close()
+    db_manager.close_all()
     logger.info("HIE 서버 종료 완료")
+    log_listener.stop()
 
 atexit.register(cleanup)
 
 if __name__ == "__main__":
     logger.info("HIE 서버 시작 중...")
     logger.info(f"데이터베이스: {config.DB_HOST}:{config.DB_PORT}")
-    logger.info(f"ESM 서버: {config.ESM_SERVER_HOST}:{config.ESM_SERVER_PORT}")
+    logger.info(f"ESM 서버: {config.ESM_PROTOCOL}://{config.ESM_SERVER_HOST}:{config.ESM_SERVER_PORT}")
     
     try:
         with db_manager.get_connection() as conn:
             logger.info("데이터베이스 연결 성공")
+        db_manager.warm_up()
+        if not blind_index_service.enabled:
+            logger.warning("DB_BLIND_INDEX_KEY 미설정: 생년월일 검색이 전체 복호화로 동작합니다")
+        logger.info(f"커넥션 풀 준비 완료: {db_manager.stats()}")
     except Exception as e:
         logger.error(f"데이터베이스 연결 실패: {e}")
         exit(1)
@@ -1,5 +1,7 @@
 import os
-from flask import Flask, request, jsonify, redirect, url_for, session, render_template_string
+from flask import Flask, request, jsonify, redirect, url_for, session, render_template_string, Response
+from flask.sessions import SessionInterface, SecureCookieSession, session_json_serializer
+from itsdangerous import Signer, BadSignature
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from authlib.integrations.flask_client import OAuth
 from flask_cors import CORS
@@ -10,12 +12,29 @@ from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import urllib.parse
 import logging
+import logging.handlers
+import queue
+import time
+import threading
+import atexit
+import sys
 from functools import wraps
-from typing import Dict, Optional, Any
-import bleach
-from html import escape
+from typing import Dict, List, Optional, Any, Tuple
 import jwt
 import uuid
+import random
+import http.cookiejar
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from collections import deque, OrderedDict
+import hashlib
+import secrets
+import zlib
+import redis
+
+# 공용 모듈(hie_common)은 HIE 서버와 같은 상위 디렉터리에 있음
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hie_common import setup_app_logging, sanitize_text, sanitize_input, LatencyHistogram, MetricsRegistry
 
 load_dotenv()
 
@@ -27,19 +46,89 @@ KEYCLOAK_BASE_URL = os.environ.get('KEYCLOAK_BASE_URL')
 KEYCLOAK_REALM = os.environ.get('KEYCLOAK_REALM')
 KEYCLOAK_CLIENT_ID = os.environ.get('KEYCLOAK_CLIENT_ID')
 KEYCLOAK_CLIENT_SECRET = os.environ.get('KEYCLOAK_CLIENT_SECRET')
+# 토큰 iss 검증값 (Keycloak frontend URL 이 다르면 KEYCLOAK_ISSUER 로 지정)
+KEYCLOAK_ISSUER = os.environ.get('KEYCLOAK_ISSUER', f"{KEYCLOAK_BASE_URL}/realms/{KEYCLOAK_REALM}")
+JWKS_CACHE_TTL = float(os.environ.get('JWKS_CACHE_TTL', 3600))
+JWKS_REFRESH_AHEAD = float(os.environ.get('JWKS_REFRESH_AHEAD', 300))
+# 모르는 kid 로 인한 JWKS 재조회 최소 간격 (위조 토큰으로 Keycloak 을 두드리지 않도록)
+JWKS_MIN_REFRESH_INTERVAL = float(os.environ.get('JWKS_MIN_REFRESH_INTERVAL', 10))
+MFA_TOKEN_AUDIENCE = os.environ.get('MFA_TOKEN_AUDIENCE')
+# MFA 인증 요청 시 보내는 acr_values 와 맞춤 - 비워 두면 모든 MFA 토큰을 거부 (fail closed)
+MFA_ACCEPTED_ACR = [v.strip() for v in os.environ.get('MFA_ACCEPTED_ACR', 'mfa').split(',') if v.strip()]
+MFA_MAX_AGE = int(os.environ.get('MFA_MAX_AGE', 600))
+MFA_TOKEN_LEEWAY = int(os.environ.get('MFA_TOKEN_LEEWAY', 30))
+MFA_TOKEN_CACHE_SIZE = int(os.environ.get('MFA_TOKEN_CACHE_SIZE', 10000))
+MFA_TOKEN_CACHE_TTL = float(os.environ.get('MFA_TOKEN_CACHE_TTL', 60))
 FRONTEND_MAIN_URL = os.environ.get('FRONTEND_MAIN_URL')
 FRONTEND_LOGIN_URL = os.environ.get('FRONTEND_LOGIN_URL')
 HIE_SERVER_URL = os.environ.get("HIE_SERVER_URL")
+HIE_UPSTREAM_TOKEN = os.environ.get("HIE_UPSTREAM_TOKEN")
+HIE_POOL_SIZE = int(os.environ.get("HIE_POOL_SIZE", 32))
+HIE_POOL_BLOCK = os.environ.get("HIE_POOL_BLOCK", "false").lower() == "true"
+HIE_CONNECT_TIMEOUT = float(os.environ.get("HIE_CONNECT_TIMEOUT", 3))
+HIE_READ_TIMEOUT = float(os.environ.get("HIE_READ_TIMEOUT", 10))
+# 엔드포인트별 read timeout (초), HIE_ENDPOINT_TIMEOUTS="/api/patient/search=20,..." 로 덮어씀
+HIE_ENDPOINT_TIMEOUTS = {
+    '/api/patient/search': 15.0,
+    '/api/patient/search/stream': 30.0,
+    '/api/medical-record/bulk': 600.0,
+    '/health': 5.0,
+}
+for _item in filter(None, os.environ.get("HIE_ENDPOINT_TIMEOUTS", "").split(',')):
+    _endpoint, _, _seconds = _item.partition('=')
+    HIE_ENDPOINT_TIMEOUTS[_endpoint.strip()] = float(_seconds)
+HIE_RETRY_ATTEMPTS = int(os.environ.get("HIE_RETRY_ATTEMPTS", 2))
+HIE_RETRY_BACKOFF = float(os.environ.get("HIE_RETRY_BACKOFF", 0.1))
+HIE_RETRY_BACKOFF_MAX = float(os.environ.get("HIE_RETRY_BACKOFF_MAX", 1.0))
+# 수평 확장 시 HIE_SERVER_URLS="http://hie1:8000,http://hie2:8000" (없으면 HIE_SERVER_URL 하나)
+HIE_SERVER_URLS = [u.strip() for u in os.environ.get("HIE_SERVER_URLS", HIE_SERVER_URL or "").split(',') if u.strip()]
+HIE_BREAKER_WINDOW = int(os.environ.get("HIE_BREAKER_WINDOW", 20))
+HIE_BREAKER_MIN_CALLS = int(os.environ.get("HIE_BREAKER_MIN_CALLS", 10))
+HIE_BREAKER_ERROR_RATE = float(os.environ.get("HIE_BREAKER_ERROR_RATE", 0.5))
+HIE_BREAKER_SLOW_RATE = float(os.environ.get("HIE_BREAKER_SLOW_RATE", 0.5))
+HIE_BREAKER_SLOW_RATIO = float(os.environ.get("HIE_BREAKER_SLOW_RATIO", 0.5))
+HIE_BREAKER_OPEN_SECONDS = float(os.environ.get("HIE_BREAKER_OPEN_SECONDS", 10))
+HIE_BREAKER_HALF_OPEN_PROBES = int(os.environ.get("HIE_BREAKER_HALF_OPEN_PROBES", 3))
+HIE_EJECT_CONSECUTIVE = int(os.environ.get("HIE_EJECT_CONSECUTIVE", 5))
+HIE_EJECT_BASE_SECONDS = float(os.environ.get("HIE_EJECT_BASE_SECONDS", 30))
+HIE_EJECT_MAX_SECONDS = float(os.environ.get("HIE_EJECT_MAX_SECONDS", 300))
+HIE_EJECT_MAX_PERCENT = float(os.environ.get("HIE_EJECT_MAX_PERCENT", 50))
+# 세션/사용자 저장소: 여러 워커/재시작 간 공유하려면 SESSION_REDIS_URL 지정 (없으면 프로세스 내 저장소)
+SESSION_REDIS_URL = os.environ.get("SESSION_REDIS_URL")
+SESSION_REDIS_TIMEOUT = float(os.environ.get("SESSION_REDIS_TIMEOUT", 0.5))
+# 세션 데이터를 저장소에 두고 쿠키에는 세션 ID만 (Redis 사용 시 기본값)
+SESSION_SERVER_SIDE = os.environ.get("SESSION_SERVER_SIDE", "true" if SESSION_REDIS_URL else "false").lower() == "true"
+SESSION_LOCAL_SIZE = int(os.environ.get("SESSION_LOCAL_SIZE", 10000))
+USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", 60))
+MFA_STATE_TTL = int(os.environ.get("MFA_STATE_TTL", 600))
+# 공유 저장소가 없어 MFA state 를 세션 쿠키에 둘 때 동시에 유지하는 최대 개수
+MFA_STATE_MAX = int(os.environ.get("MFA_STATE_MAX", 5))
+# gunicorn 등의 워커 수 - 2 이상이면 공유 저장소(Redis) 없이 서버 측 세션을 쓰지 않음
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", 1))
+# HTTPS 가 아닌 개발 환경에서만 APP_ENV=development 또는 SESSION_COOKIE_SECURE=false 로 끔
+APP_ENV = os.environ.get("APP_ENV", "production").lower()
+SESSION_COOKIE_SECURE = os.environ.get("SESSION_COOKIE_SECURE", "false" if APP_ENV == "development" else "true").lower() == "true"
+
+LOG_FILE = os.environ.get("LOG_FILE", "web_server.log")
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", 50 * 1024 * 1024))
+LOG_ROTATE_INTERVAL = float(os.environ.get("LOG_ROTATE_INTERVAL", 86400))
+LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", 14))
+LOG_COMPRESS = os.environ.get("LOG_COMPRESS", "true").lower() == "true"
+LOG_JSON = os.environ.get("LOG_JSON", "false").lower() == "true"
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
 
 REALM = KEYCLOAK_REALM
 CLIENT_ID = KEYCLOAK_CLIENT_ID
 CLIENT_SECRET = KEYCLOAK_CLIENT_SECRET
 
 app.config.update(
-    SESSION_COOKIE_SECURE=False,
+    SESSION_COOKIE_SECURE=SESSION_COOKIE_SECURE,
+    REMEMBER_COOKIE_SECURE=SESSION_COOKIE_SECURE,
     SESSION_COOKIE_HTTPONLY=True,
     SESSION_COOKIE_SAMESITE='Lax',
-    PERMANENT_SESSION_LIFETIME=timedelta(hours=8)
+    PERMANENT_SESSION_LIFETIME=timedelta(hours=8),
+    # 부하 테스트 시 RATELIMIT_ENABLED=false
+    RATELIMIT_ENABLED=os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
 )
 
 limiter = Limiter(
@@ -48,24 +137,52 @@ limiter = Limiter(
     default_limits=["1000 per day", "100 per hour"]
 )
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('web_server.log')
-    ]
+log_listener, log_queue_handler = setup_app_logging(
+    LOG_FILE,
+    max_bytes=LOG_MAX_BYTES,
+    rotate_interval=LOG_ROTATE_INTERVAL,
+    backup_count=LOG_BACKUP_COUNT,
+    compress=LOG_COMPRESS,
+    json_lines=LOG_JSON,
+    queue_size=LOG_QUEUE_SIZE
 )
+atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
+metrics = MetricsRegistry('hie_web')
+metrics.counter('http_requests_total', 'HTTP 요청 수 (route, status별)')
+metrics.counter('http_request_errors_total', 'HTTP 5xx 응답 수')
+metrics.histogram('http_request_duration_seconds', 'HTTP 요청 처리 시간 (핸들러 반환까지)')
+metrics.histogram('upstream_request_duration_seconds', 'HIE 서버 호출 시간 (스트리밍은 응답 헤더 수신까지)')
+
+class _RequestTimer:
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+    
+    def __call__(self, environ, start_response):
+        # rate limiter 등 before_request에서 끝난 요청도 측정되도록 WSGI 단계에서 시작 시각 기록
+        environ['hie.request_started'] = time.perf_counter()
+        return self.wsgi_app(environ, start_response)
+
+app.wsgi_app = _RequestTimer(app.wsgi_app)
+
+@app.after_request
+def record_request_metrics(response):
+    started = request.environ.get('hie.request_started')
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        labels = (('method', request.method), ('route', route), ('status', str(response.status_code)))
+        metrics.inc('http_requests_total', labels)
+        if response.status_code >= 500:
+            metrics.inc('http_request_errors_total', labels)
+        metrics.observe('http_request_duration_seconds', labels, time.perf_counter() - started)
+    return response
+
+
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
-# ===== MFA 관련 변수 =====
-_jwks_cache = None
-_jwks_cache_time = None
-
 class User(UserMixin):
     def __init__(self, id: str, email: Optional[str] = None, password: Optional[str] = None, 
                  is_keycloak: bool = False, doctorname: Optional[str] = None, 
@@ -83,9 +200,310 @@ users = {
                        is_keycloak=False, doctorname='시스템관리자', hospital='시스템')
 }
 
+def _pack(value: Any) -> bytes:
+    # Flask 세션과 같은 tagged JSON (공백 없음, datetime/bytes 보존)
+    # 짧은 값은 그대로, 긴 값(id_token 포함 세션 등)은 zlib 압축 - 첫 바이트로 구분
+    data = session_json_serializer.dumps(value).encode()
+    if len(data) > 512:
+        return b'z' + zlib.compress(data)
+    return b'j' + data
+
+def _unpack(data: Optional[bytes]) -> Any:
+    if not data:
+        return None
+    if data[:1] == b'z':
+        return session_json_serializer.loads(zlib.decompress(data[1:]).decode())
+    return session_json_serializer.loads(data[1:].decode())
+
+class MemoryStore:
+    """프로세스 내 TTL + LRU 저장소 (Redis 미설정 시 기본 저장소, 공유 저장소 앞단 캐시로도 사용)
+
+    serialize=True 이면 직렬화본을 보관해 요청 간에 같은 객체를 공유하지 않음 (세션/MFA state 용)
+    """
+    
+    shared = False
+    
+    def __init__(self, max_size: int, serialize: bool = False):
+        self.max_size = max_size
+        self.serialize = serialize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+        return _unpack(entry[1]) if self.serialize else entry[1]
+    
+    def set(self, key: str, value: Any, ttl: float):
+        if self.serialize:
+            value = _pack(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+    
+    def touch(self, key: str, ttl: float):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (time.monotonic() + ttl, entry[1])
+    
+    def pop(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return _unpack(entry[1]) if self.serialize else entry[1]
+    
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'backend': 'memory', **self._stats, 'size': len(self._entries), 'max_size': self.max_size}
+
+class RedisStore:
+    """Redis 공유 저장소 - 값은 _pack 으로 직렬화, 오류는 기록 후 없는 값으로 처리 (요청은 실패시키지 않음)"""
+    
+    shared = True
+    
+    def __init__(self, url: str, timeout: float, prefix: str = 'hie:web:'):
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._lock = threading.Lock()
+        self._stats = {'errors': 0}
+    
+    def _error(self, e: Exception):
+        with self._lock:
+            self._stats['errors'] += 1
+        logger.warning(f"세션 저장소 Redis 오류: {e}")
+    
+    def get(self, key: str) -> Any:
+        try:
+            return _unpack(self._redis.get(self.prefix + key))
+        except Exception as e:
+            self._error(e)
+            return None
+    
+    def set(self, key: str, value: Any, ttl: float):
+        try:
+            self._redis.set(self.prefix + key, _pack(value), ex=max(1, int(ttl)))
+        except Exception as e:
+            self._error(e)
+    
+    def touch(self, key: str, ttl: float):
+        try:
+            self._redis.expire(self.prefix + key, max(1, int(ttl)))
+        except Exception as e:
+            self._error(e)
+    
+    def pop(self, key: str) -> Any:
+        try:
+            pipe = self._redis.pipeline(transaction=True)
+            pipe.get(self.prefix + key)
+            pipe.delete(self.prefix + key)
+            return _unpack(pipe.execute()[0])
+        except Exception as e:
+            self._error(e)
+            return None
+    
+    def delete(self, key: str):
+        try:
+            self._redis.delete(self.prefix + key)
+        except Exception as e:
+            self._error(e)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'backend': 'redis', **self._stats}
+
+def create_store(redis_url: Optional[str]):
+    if redis_url:
+        try:
+            return RedisStore(redis_url, SESSION_REDIS_TIMEOUT)
+        except Exception as e:
+            logger.error(f"세션 저장소 Redis 설정 실패, 프로세스 내 저장소 사용: {e}")
+    return MemoryStore(SESSION_LOCAL_SIZE, serialize=True)
+
+class UserStore:
+    """Keycloak 로그인 사용자 저장소 - 공유 저장소 + 프로세스 내 LRU read-through (비밀번호는 저장하지 않음)"""
+    
+    def __init__(self, store, ttl: float, local_size: int, local_ttl: float):
+        self.store = store
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        # store 자체가 프로세스 내 저장소이면 앞단 캐시는 두지 않음
+        self.local = MemoryStore(local_size) if store.shared else None
+    
+    def get(self, user_id: str) -> Optional[User]:
+        if self.local is not None:
+            user = self.local.get(user_id)
+            if user is not None:
+                return user
+        fields = self.store.get(f"user:{user_id}")
+        if fields is None:
+            return None
+        email, doctorname, hospital, is_keycloak = fields
+        user = User(id=user_id, email=email, is_keycloak=bool(is_keycloak), doctorname=doctorname, hospital=hospital)
+        if self.local is not None:
+            self.local.set(user_id, user, self.local_ttl)
+        return user
+    
+    def put(self, user: User):
+        self.store.set(f"user:{user.id}", [user.email, user.doctorname, user.hospital, int(user.is_keycloak)], self.ttl)
+        if self.local is not None:
+            self.local.set(user.id, user, self.local_ttl)
+    
+    def delete(self, user_id: str):
+        self.store.delete(f"user:{user_id}")
+        if self.local is not None:
+            self.local.delete(user_id)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {'store': self.store.stats(), 'local': self.local.stats() if self.local else None}
+
+class ServerSideSession(SecureCookieSession):
+    def __init__(self, initial: Optional[Dict[str, Any]] = None, sid: Optional[str] = None):
+        super().__init__(initial)
+        self.sid = sid or secrets.token_urlsafe(32)
+
+class StoreSessionInterface(SessionInterface):
+    """세션 데이터는 저장소에 두고 쿠키에는 서명된 세션 ID만 저장 (TTL = PERMANENT_SESSION_LIFETIME)"""
+    
+    session_class = ServerSideSession
+    
+    def __init__(self, store):
+        self.store = store
+    
+    def _signer(self, app: Flask) -> Optional[Signer]:
+        if not app.secret_key:
+            return None
+        return Signer(app.secret_key, salt='hie-server-session')
+    
+    def _ttl(self, app: Flask) -> float:
+        return app.permanent_session_lifetime.total_seconds()
+    
+    def open_session(self, app: Flask, request) -> Optional[ServerSideSession]:
+        signer = self._signer(app)
+        if signer is None:
+            return None
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = signer.unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            if sid:
+                data = self.store.get(f"session:{sid}")
+                if data is not None:
+                    return self.session_class(data, sid=sid)
+        return self.session_class()
+    
+    def save_session(self, app: Flask, session: ServerSideSession, response: Response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+        
+        if session.accessed:
+            response.vary.add('Cookie')
+        
+        if not session:
+            if session.modified:
+                self.store.delete(f"session:{session.sid}")
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+                response.vary.add('Cookie')
+            return
+        
+        ttl = self._ttl(app)
+        if session.modified:
+            self.store.set(f"session:{session.sid}", dict(session), ttl)
+        elif self.should_set_cookie(app, session):
+            self.store.touch(f"session:{session.sid}", ttl)
+        
+        if not self.should_set_cookie(app, session):
+            return
+        response.set_cookie(name, self._signer(app).sign(session.sid).decode(),
+                            expires=self.get_expiration_time(app, session), httponly=httponly,
+                            domain=domain, path=path, secure=secure, samesite=samesite)
+        response.vary.add('Cookie')
+    
+    def regenerate(self, session: ServerSideSession):
+        # 데이터는 유지하고 세션 ID만 새로 발급, 이전 ID로 저장된 세션은 바로 삭제
+        self.store.delete(f"session:{session.sid}")
+        session.sid = secrets.token_urlsafe(32)
+        session.modified = True
+
+session_store = create_store(SESSION_REDIS_URL)
+user_store = UserStore(session_store, ttl=app.permanent_session_lifetime.total_seconds(),
+                       local_size=SESSION_LOCAL_SIZE, local_ttl=USER_CACHE_TTL)
+if SESSION_SERVER_SIDE and WEB_CONCURRENCY > 1 and not session_store.shared:
+    logger.warning(f"워커 {WEB_CONCURRENCY}개에서 공유 세션 저장소가 없어 서버 측 세션 대신 쿠키 세션을 사용합니다")
+    SESSION_SERVER_SIDE = False
+if SESSION_SERVER_SIDE:
+    app.session_interface = StoreSessionInterface(session_store)
+
+def regenerate_session():
+    """로그인 직후 세션 고정 방지 - 로그인 전에 발급된 세션 ID를 계속 쓰지 않도록 교체"""
+    if isinstance(app.session_interface, StoreSessionInterface):
+        app.session_interface.regenerate(session)
+
+def prune_mfa_states(keep: int):
+    """세션 쿠키의 mfa_state_* 중 만료된 것을 지우고 최근 keep 개만 남김"""
+    now = time.time()
+    states = sorted(((key, value) for key, value in session.items() if key.startswith('mfa_state_')),
+                    key=lambda item: item[1].get('expires_at', 0) if isinstance(item[1], dict) else 0,
+                    reverse=True)
+    for index, (key, value) in enumerate(states):
+        if index >= keep or not isinstance(value, dict) or value.get('expires_at', 0) <= now:
+            session.pop(key, None)
+
+def save_mfa_state(state: str, data: Dict[str, Any]):
+    if not session_store.shared:
+        # 프로세스 내 저장소는 다른 워커가 콜백을 받으면 보이지 않으므로 세션에 보관
+        # (완료되지 않은 시도가 쿠키에 계속 쌓이지 않도록 새 state 를 넣기 전에 정리)
+        prune_mfa_states(max(MFA_STATE_MAX - 1, 0))
+        session[f'mfa_state_{state}'] = dict(data, expires_at=time.time() + MFA_STATE_TTL)
+        return
+    # 세션 쿠키에 쌓이지 않도록 저장소에 두고 MFA_STATE_TTL 후 자동 만료
+    value = dict(data, binding=session.setdefault('mfa_binding', secrets.token_urlsafe(16)))
+    session_store.set(f"mfa_state:{state}", value, MFA_STATE_TTL)
+
+def pop_mfa_state(state: str) -> Optional[Dict[str, Any]]:
+    """1회용 - 인증을 요청한 세션에서 온 콜백만 허용"""
+    if not session_store.shared:
+        value = session.pop(f'mfa_state_{state}', None)
+        if not value or value.get('expires_at', 0) <= time.time():
+            return None
+        return value
+    
+    key = f"mfa_state:{state}"
+    value = session_store.get(key)
+    # 다른 세션에서 온 콜백이 원래 요청자의 state 를 지우지 못하도록 binding 을 먼저 확인
+    if not value or value.get('binding') != session.get('mfa_binding'):
+        return None
+    # 같은 state 로 동시에 들어온 콜백은 하나만 통과
+    if session_store.pop(key) is None:
+        return None
+    return value
+
 @login_manager.user_loader
 def load_user(user_id: str) -> Optional[User]:
-    return users.get(user_id)
+    return users.get(user_id) or user_store.get(user_id)
 
 oauth = OAuth(app)
 keycloak = oauth.register(
@@ -97,55 +515,232 @@ keycloak = oauth.register(
 )
 
 # ===== MFA 관련 함수들 =====
-def get_keycloak_public_keys():
-    """Keycloak JWK Set 조회 (캐싱 적용)"""
-    global _jwks_cache, _jwks_cache_time
+class JwksKeyCache:
+    """Keycloak JWK Set 을 kid별로 파싱해 보관
+
+    - 만료 JWKS_REFRESH_AHEAD 초 전부터는 (만료 후에도) 기존 키로 응답하고 백그라운드에서 갱신
+    - 요청 스레드가 기다리는 경우는 키가 하나도 없을 때와 모르는 kid (키 교체 직후) 뿐이며,
+      재조회 간격은 min_refresh_interval 로 제한
+    - 조회 실패 시 기존 키를 계속 사용
+    """
     
-    # 1시간 캐시
-    if _jwks_cache and _jwks_cache_time and \
-       (datetime.now() - _jwks_cache_time).seconds < 3600:
-        return _jwks_cache
+    ALGORITHMS = frozenset(('RS256', 'RS384', 'RS512', 'PS256', 'PS384', 'PS512', 'ES256', 'ES384', 'ES512'))
     
-    try:
-        url = f"{KEYCLOAK_BASE_URL}/realms/{KEYCLOAK_REALM}/protocol/openid-connect/certs"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        _jwks_cache = response.json()
-        _jwks_cache_time = datetime.now()
-        
-        logger.info(f"JWK Set 갱신됨: {len(_jwks_cache.get('keys', []))}개 키")
-        return _jwks_cache
-        
-    except Exception as e:
-        logger.error(f"JWK Set 조회 실패: {str(e)}")
-        return None
+    def __init__(self, url: str, ttl: float, refresh_ahead: float, min_refresh_interval: float, timeout: float = 10):
+        self.url = url
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self.jwks: Optional[Dict[str, Any]] = None
+        self.loaded_at: Optional[datetime] = None
+        self.refreshes = 0
+        self.failures = 0
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._expires_at = 0.0
+        self._last_attempt = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+    
+    def load(self, jwks: Dict[str, Any]):
+        keys = {}
+        for item in jwks.get('keys', []):
+            if item.get('use', 'sig') != 'sig' or not item.get('kid'):
+                continue
+            try:
+                key = jwt.PyJWK(item)
+            except jwt.PyJWKError as e:
+                logger.warning(f"JWK 파싱 실패 (kid={item.get('kid')}): {e}")
+                continue
+            if key.algorithm_name in self.ALGORITHMS:
+                keys[item['kid']] = key
+        # 딕셔너리 교체는 원자적이므로 조회 쪽은 락 없이 읽음
+        self._keys = keys
+        self.jwks = jwks
+        self.loaded_at = datetime.now()
+        self._expires_at = time.monotonic() + self.ttl
+    
+    def refresh(self, force: bool = False) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_attempt < self.min_refresh_interval:
+                return False
+            self._last_attempt = now
+            try:
+                response = requests.get(self.url, timeout=self.timeout)
+                response.raise_for_status()
+                self.load(response.json())
+                self.refreshes += 1
+                logger.info(f"JWK Set 갱신됨: {len(self._keys)}개 키")
+                return True
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"JWK Set 조회 실패: {str(e)}")
+                return False
+    
+    def _refresh_in_background(self):
+        if self._refreshing or time.monotonic() - self._last_attempt < self.min_refresh_interval:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+        
+        threading.Thread(target=run, name='jwks-refresh', daemon=True).start()
+    
+    def _ensure_fresh(self, loaded: bool):
+        if not loaded:
+            self.refresh(force=self._last_attempt == 0)
+        elif self._expires_at - time.monotonic() <= self.refresh_ahead:
+            self._refresh_in_background()
+    
+    def get(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        self._ensure_fresh(bool(self._keys))
+        key = self._keys.get(kid)
+        if key is None and kid:
+            # 동시에 들어온 요청은 진행 중인 조회가 끝나기를 기다린 뒤 그 결과를 다시 확인
+            self.refresh()
+            key = self._keys.get(kid)
+        return key
+    
+    def document(self) -> Optional[Dict[str, Any]]:
+        self._ensure_fresh(self.jwks is not None)
+        return self.jwks
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'keys': sorted(self._keys),
+            'loaded_at': self.loaded_at.isoformat() if self.loaded_at else None,
+            'expires_in': round(max(0.0, self._expires_at - time.monotonic()), 1),
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+        }
 
-def get_public_key_by_kid(kid):
-    """Key ID로 공개키 조회"""
-    jwks = get_keycloak_public_keys()
-    if not jwks:
-        return None
+class VerifiedTokenCache:
+    """검증을 통과한 토큰의 claims 를 토큰 해시로 보관하는 LRU (유효기간은 exp 와 MFA 인증 만료 이내)"""
     
-    for key in jwks.get('keys', []):
-        if key.get('kid') == kid and key.get('use') == 'sig':
-            return jwt.algorithms.RSAAlgorithm.from_jwk(key)
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
     
-    return None
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+    
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+    
+    def put(self, token: str, claims: Dict[str, Any], expires_at: float):
+        expires_at = min(expires_at, time.time() + self.ttl)
+        if self.max_size <= 0 or expires_at <= time.time():
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
 
-def verify_mfa_token(token):
-    """MFA 토큰 검증"""
-    try:
+jwks_cache = JwksKeyCache(
+    f"{KEYCLOAK_BASE_URL}/realms/{KEYCLOAK_REALM}/protocol/openid-connect/certs",
+    ttl=JWKS_CACHE_TTL, refresh_ahead=JWKS_REFRESH_AHEAD, min_refresh_interval=JWKS_MIN_REFRESH_INTERVAL
+)
+verified_tokens = VerifiedTokenCache(MFA_TOKEN_CACHE_SIZE, MFA_TOKEN_CACHE_TTL)
 
-        if token and len(token) > 10:
-            return True, {
-                'preferred_username': 'test_user',
-                'auth_time': datetime.now().timestamp(),
-                'acr': 'mfa'
-            }
+metrics.counter('mfa_token_verifications_total', 'MFA 토큰 검증 수 (result별, cached=검증 캐시 적중)')
+metrics.gauge('mfa_verified_token_cache_size', '검증 캐시에 보관 중인 토큰 수', lambda: len(verified_tokens))
+metrics.gauge('jwks_keys', '캐시된 JWKS 서명 키 수', lambda: len(jwks_cache.stats()['keys']))
+
+def get_keycloak_public_keys():
+    """Keycloak JWK Set 조회 (캐싱 적용)"""
+    return jwks_cache.document()
+
+def get_public_key_by_kid(kid):
+    """Key ID로 공개키 조회"""
+    key = jwks_cache.get(kid)
+    return key.key if key else None
+
+def verify_mfa_token(token):
+    """MFA 토큰 검증 (서명, exp/iss/aud, acr, 인증 후 경과시간)"""
+    if not token:
         return False, "Invalid token"
+    
+    claims = verified_tokens.get(token)
+    if claims is not None:
+        metrics.inc('mfa_token_verifications_total', (('result', 'cached'),))
+        return True, claims
+    
+    try:
+        kid = jwt.get_unverified_header(token).get('kid')
+        signing_key = jwks_cache.get(kid)
+        if signing_key is None:
+            metrics.inc('mfa_token_verifications_total', (('result', 'unknown_key'),))
+            return False, "Unknown signing key"
+        
+        claims = jwt.decode(
+            token, signing_key.key,
+            algorithms=[signing_key.algorithm_name],
+            audience=MFA_TOKEN_AUDIENCE,
+            issuer=KEYCLOAK_ISSUER,
+            leeway=MFA_TOKEN_LEEWAY,
+            options={'require': ['exp', 'iat'], 'verify_aud': bool(MFA_TOKEN_AUDIENCE)}
+        )
         
+        # aud 를 지정하지 않은 경우 토큰을 발급받은 클라이언트(azp)로 확인
+        if not MFA_TOKEN_AUDIENCE and claims.get('azp') not in (None, KEYCLOAK_CLIENT_ID):
+            raise jwt.InvalidAudienceError(f"Unexpected azp: {claims.get('azp')}")
+        if str(claims.get('acr')) not in MFA_ACCEPTED_ACR:
+            raise jwt.InvalidTokenError(f"Insufficient acr: {claims.get('acr')}")
+        
+        expires_at = claims['exp'] + MFA_TOKEN_LEEWAY
+        if claims.get('auth_time'):
+            mfa_expires_at = claims['auth_time'] + MFA_MAX_AGE
+            if mfa_expires_at <= time.time():
+                raise jwt.ExpiredSignatureError("MFA authentication expired")
+            expires_at = min(expires_at, mfa_expires_at)
+        
+        verified_tokens.put(token, claims, expires_at)
+        metrics.inc('mfa_token_verifications_total', (('result', 'verified'),))
+        return True, claims
+        
+    except jwt.ExpiredSignatureError as e:
+        metrics.inc('mfa_token_verifications_total', (('result', 'expired'),))
+        return False, f"Token expired: {str(e)}"
+    except jwt.InvalidTokenError as e:
+        metrics.inc('mfa_token_verifications_total', (('result', 'invalid'),))
+        return False, f"Invalid token: {str(e)}"
     except Exception as e:
+        metrics.inc('mfa_token_verifications_total', (('result', 'error'),))
         logger.error(f"토큰 검증 오류: {str(e)}")
         return False, f"Token verification error: {str(e)}"
 
@@ -190,15 +785,6 @@ def require_mfa(f):
     return decorated
 
 
-def sanitize_input(data: Any) -> Any:
-    if isinstance(data, str):
-        return bleach.clean(escape(data.strip()))
-    elif isinstance(data, dict):
-        return {k: sanitize_input(v) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [sanitize_input(item) for item in data]
-    return data
-
 def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -235,10 +821,11 @@ def _get_user_context() -> Dict[str, str]:
         }
         hospital = hospital_mapping.get(domain, "기타")
     
+    # HIE 서버로 전달되는 값이므로 요청 본문과 같이 정제 (HIE 서버는 재정제하지 않음)
     return {
-        "email": email,
-        "doctorname": doctorname,
-        "hospital": hospital,
+        "email": sanitize_text(email or ''),
+        "doctorname": sanitize_text(doctorname or ''),
+        "hospital": sanitize_text(hospital or ''),
         "id": getattr(current_user, 'id', '')
     }
 
@@ -250,30 +837,408 @@ def is_admin() -> bool:
             current_user.id == 'superadmin' or 
             current_user.doctorname == '시스템관리자')
 
-def make_hie_request(endpoint: str, data: Dict[str, Any], method: str = 'POST', timeout: int = 10) -> tuple:
+def hie_json_headers() -> Dict[str, str]:
+    """sanitize_input을 거친 JSON 요청용 헤더 (HIE 서버의 재정제 생략)"""
+    headers = {"Content-Type": "application/json"}
+    if HIE_UPSTREAM_TOKEN:
+        headers["X-HIE-Upstream-Token"] = HIE_UPSTREAM_TOKEN
+    return headers
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """회로가 열린 엔드포인트 호출 - 기존 연결 실패(502) 처리 경로로 즉시 실패"""
+
+class CircuitBreaker:
+    """최근 호출의 오류/지연 비율로 열리고, 대기 후 제한된 수의 probe로 복구를 확인"""
+    
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+    
+    def __init__(self, window: int, min_calls: int, error_rate: float, slow_rate: float,
+                 open_seconds: float, half_open_probes: int):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.state = self.CLOSED
+        self.opened = 0
+        self.rejected = 0
+        self._results = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._probes = self._probe_successes = 0
+            if self.state == self.HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    self.rejected += 1
+                    return False
+                self._probes += 1
+            return True
+    
+    def record(self, failed: bool, slow: bool):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                if failed or slow:
+                    self._trip()
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self.state = self.CLOSED
+                    self._results.clear()
+                return
+            if self.state == self.OPEN:
+                # 회로가 열리기 전에 시작된 호출의 늦은 결과
+                return
+            self._results.append((failed, slow))
+            calls = len(self._results)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for f, _ in self._results if f)
+            slows = sum(1 for _, sl in self._results if sl)
+            if failures / calls >= self.error_rate or slows / calls >= self.slow_rate:
+                self._trip()
+    
+    def _trip(self):
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self.opened += 1
+        self._results.clear()
+
+class UpstreamTarget:
+    def __init__(self, url: str):
+        self.url = url.rstrip('/')
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+class HieUpstreamClient:
+    """HIE 서버 전용 keep-alive 연결 풀
+
+    - 엔드포인트별 timeout, 멱등 요청만 지터 재시도 (연결 수립 실패는 요청이 전송되지 않았으므로 POST도 다른 서버로 재시도)
+    - 여러 HIE 서버 중 진행 중 요청이 가장 적은 서버 선택, 연속 실패 서버는 일정 시간 제외(outlier ejection)
+    - 엔드포인트별 circuit breaker
+    """
+    
+    IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+    RETRY_STATUSES = frozenset((502, 503, 504))
+    
+    def __init__(self, base_urls: List[str], pool_size: int, pool_block: bool, connect_timeout: float,
+                 read_timeout: float, endpoint_timeouts: Dict[str, float], retry_attempts: int,
+                 backoff_base: float, backoff_max: float, breaker_settings: Dict[str, Any],
+                 slow_ratio: float, eject_consecutive: int, eject_base: float, eject_max: float,
+                 eject_max_percent: float):
+        self.targets = [UpstreamTarget(url) for url in base_urls]
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.endpoint_timeouts = endpoint_timeouts
+        self.retry_attempts = retry_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_settings = breaker_settings
+        self.slow_ratio = slow_ratio
+        self.eject_consecutive = eject_consecutive
+        self.eject_base = eject_base
+        self.eject_max = eject_max
+        self.max_ejected = int(len(self.targets) * eject_max_percent / 100)
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        
+        self.session = requests.Session()
+        # 여러 스레드가 세션을 공유하므로 upstream 쿠키는 저장하지 않음
+        self.session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        # 풀은 호스트별로 생성되므로 pool_maxsize 는 HIE 서버 1대당 연결 수
+        self.adapter = HTTPAdapter(pool_connections=max(4, len(self.targets)), pool_maxsize=pool_size,
+                                   pool_block=pool_block, max_retries=0)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+        
+        self._lock = threading.Lock()
+        self.inflight = 0
+        self.saturated = 0
+        self.retried = 0
+    
+    def timeout_for(self, endpoint: str) -> Tuple[float, float]:
+        return self.connect_timeout, self.endpoint_timeouts.get(endpoint, self.read_timeout)
+    
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            with self._lock:
+                breaker = self.breakers.setdefault(endpoint, CircuitBreaker(**self.breaker_settings))
+        return breaker
+    
+    def _backoff(self, attempt: int) -> float:
+        # full jitter - 여러 워커가 동시에 재시도해 HIE 서버를 다시 몰아치지 않도록 함
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+    
+    @staticmethod
+    def _not_sent(exc: Exception) -> bool:
+        if isinstance(exc, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(exc.args[0], 'reason', None) if exc.args else None
+        return isinstance(reason, NewConnectionError)
+    
+    def _acquire(self, tried: List[UpstreamTarget]) -> UpstreamTarget:
+        with self._lock:
+            now = time.monotonic()
+            candidates = ([t for t in self.targets if t not in tried and t.ejected_until <= now]
+                          or [t for t in self.targets if t not in tried]
+                          or self.targets)
+            target = min(candidates, key=lambda t: (t.outstanding, random.random()))
+            target.outstanding += 1
+            target.requests += 1
+            self.inflight += 1
+            if target.outstanding > self.pool_size:
+                self.saturated += 1
+            return target
+    
+    def _release(self, target: UpstreamTarget, failed: bool):
+        with self._lock:
+            target.outstanding -= 1
+            self.inflight -= 1
+            now = time.monotonic()
+            if not failed:
+                target.consecutive_failures = 0
+                if target.ejections and now > target.ejected_until + self.eject_max:
+                    target.ejections = 0
+                return
+            target.failures += 1
+            target.consecutive_failures += 1
+            if target.consecutive_failures < self.eject_consecutive or target.ejected_until > now:
+                return
+            ejected = sum(1 for t in self.targets if t.ejected_until > now)
+            if ejected >= self.max_ejected:
+                return
+            target.ejections += 1
+            target.consecutive_failures = 0
+            duration = min(self.eject_max, self.eject_base * target.ejections)
+            target.ejected_until = now + duration
+        metrics.inc('upstream_ejections_total', (('target', target.url),))
+        logger.warning(f"HIE 서버 제외: {target.url} ({duration:.0f}초, 연속 실패 {self.eject_consecutive}회)")
+    
+    def _release_on_close(self, response: requests.Response, target: UpstreamTarget):
+        # 스트리밍 응답은 본문을 다 읽고 닫을 때까지 해당 서버의 진행 중 요청으로 계산
+        original_close = response.close
+        released = []
+        
+        def close():
+            try:
+                original_close()
+            finally:
+                if not released:
+                    released.append(True)
+                    self._release(target, failed=False)
+        response.close = close
+    
+    def request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            metrics.inc('upstream_circuit_rejected_total', (('endpoint', endpoint),))
+            raise CircuitOpenError(f"HIE 서버 회로 차단 중: {endpoint}")
+        
+        kwargs.setdefault('timeout', self.timeout_for(endpoint))
+        timeout = kwargs['timeout']
+        slow_after = (timeout[1] if isinstance(timeout, tuple) else timeout) * self.slow_ratio
+        idempotent = method.upper() in self.IDEMPOTENT_METHODS
+        tried: List[UpstreamTarget] = []
+        started = time.monotonic()
+        failed = True
+        try:
+            for attempt in range(1 + self.retry_attempts):
+                last = attempt == self.retry_attempts
+                target = self._acquire(tried)
+                tried.append(target)
+                try:
+                    response = self.session.request(method, f"{target.url}{endpoint}", **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    self._release(target, failed=True)
+                    if last or not (idempotent or self._not_sent(e)):
+                        raise
+                else:
+                    target_failed = response.status_code in self.RETRY_STATUSES
+                    if last or not (target_failed and idempotent):
+                        failed = response.status_code >= 500
+                        if kwargs.get('stream') and not target_failed:
+                            self._release_on_close(response, target)
+                        else:
+                            self._release(target, failed=target_failed)
+                        return response
+                    response.close()
+                    self._release(target, failed=True)
+                with self._lock:
+                    self.retried += 1
+                metrics.inc('upstream_retries_total', (('endpoint', endpoint),))
+                time.sleep(self._backoff(attempt))
+        finally:
+            breaker.record(failed, time.monotonic() - started >= slow_after)
+    
+    def pool_stats(self) -> Dict[str, int]:
+        idle = created = 0
+        for key in list(self.adapter.poolmanager.pools.keys()):
+            pool = self.adapter.poolmanager.pools.get(key)
+            if pool is None or pool.pool is None:
+                continue
+            idle += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+            created += pool.num_connections
+        return {'inflight': self.inflight, 'idle': idle, 'connections_created': created,
+                'pool_size': self.pool_size, 'saturated': self.saturated, 'retried': self.retried}
+    
+    def target_stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return [{'url': t.url, 'outstanding': t.outstanding, 'requests': t.requests, 'failures': t.failures,
+                     'ejected': t.ejected_until > now, 'ejections': t.ejections} for t in self.targets]
+    
+    def breaker_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {endpoint: {'state': b.state, 'opened': b.opened, 'rejected': b.rejected}
+                for endpoint, b in list(self.breakers.items())}
+
+hie_client = HieUpstreamClient(
+    HIE_SERVER_URLS,
+    pool_size=HIE_POOL_SIZE,
+    pool_block=HIE_POOL_BLOCK,
+    connect_timeout=HIE_CONNECT_TIMEOUT,
+    read_timeout=HIE_READ_TIMEOUT,
+    endpoint_timeouts=HIE_ENDPOINT_TIMEOUTS,
+    retry_attempts=HIE_RETRY_ATTEMPTS,
+    backoff_base=HIE_RETRY_BACKOFF,
+    backoff_max=HIE_RETRY_BACKOFF_MAX,
+    breaker_settings={
+        'window': HIE_BREAKER_WINDOW,
+        'min_calls': HIE_BREAKER_MIN_CALLS,
+        'error_rate': HIE_BREAKER_ERROR_RATE,
+        'slow_rate': HIE_BREAKER_SLOW_RATE,
+        'open_seconds': HIE_BREAKER_OPEN_SECONDS,
+        'half_open_probes': HIE_BREAKER_HALF_OPEN_PROBES,
+    },
+    slow_ratio=HIE_BREAKER_SLOW_RATIO,
+    eject_consecutive=HIE_EJECT_CONSECUTIVE,
+    eject_base=HIE_EJECT_BASE_SECONDS,
+    eject_max=HIE_EJECT_MAX_SECONDS,
+    eject_max_percent=HIE_EJECT_MAX_PERCENT
+)
+metrics.counter('upstream_retries_total', 'HIE 서버 재시도 횟수')
+metrics.counter('upstream_circuit_rejected_total', '회로 차단으로 즉시 실패한 호출 수')
+metrics.counter('upstream_ejections_total', '연속 실패로 HIE 서버가 제외된 횟수')
+metrics.gauge('upstream_inflight_requests', 'HIE 서버로 진행 중인 요청 수', lambda: hie_client.inflight)
+metrics.gauge('upstream_pool_idle_connections', 'HIE 연결 풀의 유휴 keep-alive 연결 수',
+              lambda: hie_client.pool_stats()['idle'])
+metrics.gauge('upstream_pool_size', 'HIE 서버 1대당 연결 풀 최대 크기', lambda: hie_client.pool_size)
+metrics.gauge('upstream_pool_connections_created', 'HIE 연결 풀이 생성한 누적 연결 수',
+              lambda: hie_client.pool_stats()['connections_created'])
+metrics.gauge('upstream_pool_saturated', '풀 크기를 넘는 동시 요청이 발생한 누적 횟수', lambda: hie_client.saturated)
+metrics.gauge('upstream_target_outstanding', 'HIE 서버별 진행 중 요청 수',
+              lambda: {(('target', t['url']),): t['outstanding'] for t in hie_client.target_stats()})
+metrics.gauge('upstream_target_ejected', 'HIE 서버 제외 여부 (1=제외)',
+              lambda: {(('target', t['url']),): int(t['ejected']) for t in hie_client.target_stats()})
+metrics.gauge('upstream_circuit_open', '엔드포인트별 회로 상태 (0=closed, 1=open, 2=half_open)',
+              lambda: {(('endpoint', e),): {'closed': 0, 'open': 1, 'half_open': 2}[b['state']]
+                       for e, b in hie_client.breaker_stats().items()})
+
+def hie_call(method: str, endpoint: str, **kwargs) -> requests.Response:
+    """HIE 서버 호출 (upstream 지연시간 메트릭 기록)"""
+    started = time.perf_counter()
+    outcome = 'error'
     try:
-        url = f"{HIE_SERVER_URL}{endpoint}"
-        headers = {"Content-Type": "application/json"}
-        
-        if method == 'POST':
-            response = requests.post(url, json=data, headers=headers, timeout=timeout)
-        else:
-            response = requests.get(url, params=data, headers=headers, timeout=timeout)
-        
-        return response.json(), response.status_code
-        
+        response = hie_client.request(method, endpoint, **kwargs)
+        outcome = str(response.status_code)
+        return response
+    except CircuitOpenError:
+        outcome = 'circuit_open'
+        raise
     except requests.exceptions.Timeout:
+        outcome = 'timeout'
+        raise
+    except requests.exceptions.ConnectionError:
+        outcome = 'connection_error'
+        raise
+    finally:
+        metrics.observe('upstream_request_duration_seconds',
+                        (('endpoint', endpoint), ('outcome', outcome)), time.perf_counter() - started)
+
+# 클라이언트로 그대로 전달하는 HIE 응답 헤더 (본문 형식, 압축, 캐시 검증자, 감사 로그 실행계획)
+HIE_PASSTHROUGH_HEADERS = ('Content-Type', 'Content-Encoding', 'Content-Length',
+                           'Cache-Control', 'Expires', 'Vary', 'X-Audit-Query-Plan')
+
+def hie_forward_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """클라이언트가 받을 수 있는 인코딩을 HIE 서버로 전달"""
+    headers = dict(headers)
+    # requests 기본값(gzip, deflate) 대신 클라이언트가 받을 수 있는 인코딩만 요청해 압축 본문도 그대로 전달
+    headers['Accept-Encoding'] = request.headers.get('Accept-Encoding', 'identity')
+    return headers
+
+def passthrough_response(upstream: requests.Response) -> Response:
+    """HIE 응답 본문을 디코딩/재직렬화 없이 그대로 스트리밍 (chunked/NDJSON 포함)"""
+    headers = [(name, upstream.headers[name]) for name in HIE_PASSTHROUGH_HEADERS if name in upstream.headers]
+    
+    def generate():
+        try:
+            for chunk in upstream.raw.stream(64 * 1024, decode_content=False):
+                yield chunk
+        finally:
+            upstream.close()
+    
+    response = Response(generate(), status=upstream.status_code, headers=headers)
+    # HEAD/204 이거나 클라이언트가 먼저 끊으면 generate()가 시작되지 않으므로 응답 종료 시에도 반납 (close는 중복 호출 가능)
+    response.call_on_close(upstream.close)
+    return response
+
+def _hie_error(endpoint: str, e: Exception) -> tuple:
+    if isinstance(e, requests.exceptions.Timeout):
         logger.error(f"HIE server timeout: {endpoint}")
         return {'result': 'fail', 'msg': 'HIE 서버 응답 시간 초과'}, 504
-    except requests.exceptions.ConnectionError:
+    if isinstance(e, requests.exceptions.ConnectionError):
         logger.error(f"HIE server connection error: {endpoint}")
         return {'result': 'fail', 'msg': 'HIE 서버 연결 실패'}, 502
-    except requests.exceptions.RequestException as e:
+    if isinstance(e, requests.exceptions.RequestException):
         logger.error(f"HIE server request error: {e}")
         return {'result': 'fail', 'msg': f'HIE 서버 요청 오류: {str(e)}'}, 500
+    logger.error(f"Unexpected error in HIE request: {e}")
+    return {'result': 'fail', 'msg': '서버 내부 오류'}, 500
+
+def make_hie_request(endpoint: str, data: Dict[str, Any], method: str = 'POST') -> tuple:
+    """응답 본문을 확인해야 하는 호출용 (JSON 파싱)"""
+    try:
+        headers = hie_json_headers()
+        
+        if method == 'POST':
+            response = hie_call('POST', endpoint, json=data, headers=headers)
+        else:
+            response = hie_call('GET', endpoint, params=data, headers=headers)
+        
+        return response.json(), response.status_code
+        
+    except Exception as e:
+        return _hie_error(endpoint, e)
+
+def hie_proxy(endpoint: str, data: Dict[str, Any], method: str = 'POST') -> Response:
+    """make_hie_request 와 같은 호출이지만 응답을 파싱하지 않고 그대로 전달"""
+    try:
+        headers = hie_forward_headers(hie_json_headers())
+        
+        if method == 'POST':
+            upstream = hie_call('POST', endpoint, json=data, headers=headers, stream=True)
+        else:
+            upstream = hie_call('GET', endpoint, params=data, headers=headers, stream=True)
+        
+        return passthrough_response(upstream)
+        
     except Exception as e:
-        logger.error(f"Unexpected error in HIE request: {e}")
-        return {'result': 'fail', 'msg': '서버 내부 오류'}, 500
+        body, status_code = _hie_error(endpoint, e)
+        response = jsonify(body)
+        response.status_code = status_code
+        return response
 
 
 @app.route('/api/login', methods=['POST'])
@@ -293,6 +1258,7 @@ def login():
         user = users.get(username)
         
         if user and user.password == password:
+            regenerate_session()
             login_user(user, remember=True, duration=timedelta(hours=8))
             
             is_admin_user = username == 'superadmin'
@@ -346,7 +1312,8 @@ def keycloak_callback():
         
         user = User(id=sub, email=email, is_keycloak=True, 
                    doctorname=doctorname, hospital=hospital)
-        users[sub] = user
+        user_store.put(user)
+        regenerate_session()
         login_user(user, remember=True, duration=timedelta(hours=8))
         session['id_token'] = token.get('id_token')
         
@@ -413,11 +1380,11 @@ def generate_mfa_auth_url():
 
         state = str(uuid.uuid4())
 
-        session[f'mfa_state_{state}'] = {
+        save_mfa_state(state, {
             'action': action,
             'return_url': return_url,
             'timestamp': datetime.now().timestamp()
-        }
+        })
         
 
         auth_url = f"{KEYCLOAK_BASE_URL}/realms/{KEYCLOAK_REALM}/protocol/openid-connect/auth"
@@ -493,7 +1460,7 @@ def mfa_auth_callback():
                 </html>
             """)
         
-        state_data = session.get(f'mfa_state_{state}')
+        state_data = pop_mfa_state(state)
         if not state_data:
             logger.error(f"유효하지 않은 state: {state}")
             return render_template_string("""
@@ -546,8 +1513,6 @@ def mfa_auth_callback():
         access_token = tokens.get('access_token')
         
         # 성공 처리
-        session.pop(f'mfa_state_{state}', None)
-        
         return_url = state_data['return_url']
         action = state_data['action']
         
@@ -622,7 +1587,7 @@ def check_mfa_status():
             'user': result.get('preferred_username'),
             'auth_time': result.get('auth_time'),
             'acr': result.get('acr'),
-            'expires_in': 600 - (datetime.now().timestamp() - result.get('auth_time', 0))
+            'expires_in': MFA_MAX_AGE - (datetime.now().timestamp() - result.get('auth_time', 0))
         })
     else:
         return jsonify({'mfa_authenticated': False, 'error': result})
@@ -646,13 +1611,46 @@ def medical_record_upload():
             'hospital': user['hospital']
         }
         
-        response_data, status_code = make_hie_request('/api/medical-record', request_data)
-        return jsonify(response_data), status_code
+        return hie_proxy('/api/medical-record', request_data)
         
     except Exception as e:
         logger.error(f"Medical record upload error: {e}")
         return jsonify({'result': 'fail', 'msg': '진료기록 등록 중 오류가 발생했습니다'}), 500
 
+@app.route('/api/medical-record/bulk', methods=['POST'])
+@login_required_api
+@limiter.limit("5 per minute")
+def medical_record_bulk_upload():
+    try:
+        user = _get_user_context()
+        content_type = request.content_type or ''
+        if 'csv' not in content_type and 'ndjson' not in content_type:
+            return jsonify({'result': 'fail', 'msg': 'NDJSON 또는 CSV 형식만 지원합니다'}), 415
+        
+        # 업로드 본문은 버퍼링하지 않고 그대로 전달 (행 단위 검증/정제는 HIE 서버에서 수행)
+        response = hie_call(
+            'POST', "/api/medical-record/bulk",
+            params={
+                'user_email': user['email'],
+                'doctor_name': user['doctorname'],
+                'hospital': user['hospital']
+            },
+            data=request.stream,
+            headers=hie_forward_headers({"Content-Type": content_type}),
+            stream=True
+        )
+        return passthrough_response(response)
+        
+    except requests.exceptions.Timeout:
+        logger.error("HIE server timeout: /api/medical-record/bulk")
+        return jsonify({'result': 'fail', 'msg': 'HIE 서버 응답 시간 초과'}), 504
+    except requests.exceptions.ConnectionError:
+        logger.error("HIE server connection error: /api/medical-record/bulk")
+        return jsonify({'result': 'fail', 'msg': 'HIE 서버 연결 실패'}), 502
+    except Exception as e:
+        logger.error(f"Medical record bulk upload error: {e}")
+        return jsonify({'result': 'fail', 'msg': '진료기록 일괄 등록 중 오류가 발생했습니다'}), 500
+
 @app.route('/api/patient/unmask', methods=['POST'])
 @require_mfa  
 @limiter.limit("10 per minute")
@@ -676,71 +1674,134 @@ def patient_unmask_proxy():
         }
         
         logger.info(f"마스킹 해제 요청 (MFA 인증됨): user={username}, record_id={data.get('record_id')}")
-        response_data, status_code = make_hie_request('/api/patient/unmask', request_data)
+        response = hie_proxy('/api/patient/unmask', request_data)
         
-        if status_code == 200:
+        if response.status_code == 200:
             logger.info(f"마스킹 해제 성공: user={username}, record_id={data.get('record_id')}")
         
-        return jsonify(response_data), status_code
+        return response
         
     except Exception as e:
         logger.error(f"Patient unmask error: {e}")
         return jsonify({'result': 'fail', 'msg': '마스킹 해제 중 오류가 발생했습니다'}), 500
 
-@app.route('/api/patient/search', methods=['POST'])
-@login_required_api
-@limiter.limit("30 per minute")
-def patient_search_proxy():
+@app.route('/api/patient/unmask/batch', methods=['POST'])
+@require_mfa  
+@limiter.limit("10 per minute")
+def patient_unmask_batch_proxy():
     try:
+        mfa_user = request.mfa_user
+        username = mfa_user.get('preferred_username')
+        
         user = _get_user_context()
         data = sanitize_input(request.get_json() or {})
-        include_external = data.get('includeExternal', False)
-        
-        if not user['hospital']:
-            return jsonify({'result': 'fail', 'msg': '병원 정보가 없습니다'}), 400
-        
-       
-        if include_external:
-            auth_header = request.headers.get('Authorization', '')
-            if not auth_header.startswith('Bearer '):
-                return jsonify({
-                    'error': 'MFA required for external hospital search',
-                    'code': 'MFA_REQUIRED_EXTERNAL',
-                    'message': '타 병원 조회를 위해서는 추가 인증이 필요합니다.'
-                }), 401
-            
-            token = auth_header.split(' ', 1)[1]
-            is_valid, result = verify_mfa_token(token)
-            
-            if not is_valid:
-                return jsonify({
-                    'error': f'MFA verification failed: {result}',
-                    'code': 'MFA_VERIFICATION_FAILED',
-                    'message': 'MFA 인증에 실패했습니다.'
-                }), 403
-            
-            mfa_user = result
-            username = mfa_user.get('preferred_username')
-            logger.info(f"전체 병원 조회 (MFA 인증됨): user={username}")
-            
-            
-            data['mfa_verified'] = True
-            data['mfa_user'] = username
         
         request_data = {
             **data,
             'user_email': user['email'],
             'doctor_name': user['doctorname'],
-            'hospital': user['hospital']
+            'hospital': user['hospital'],
+            'mfa_verified': True,
+            'mfa_user': username
         }
         
-        response_data, status_code = make_hie_request('/api/patient/search', request_data, timeout=15)
+        response_data, status_code = make_hie_request('/api/patient/unmask/batch', request_data)
+        
+        if status_code == 200:
+            logger.info(f"일괄 마스킹 해제 성공: user={username}, records={len(response_data.get('unmasked', {}))}")
+        
         return jsonify(response_data), status_code
         
+    except Exception as e:
+        logger.error(f"Patient batch unmask error: {e}")
+        return jsonify({'result': 'fail', 'msg': '마스킹 해제 중 오류가 발생했습니다'}), 500
+
+def _build_patient_search_request() -> tuple:
+    user = _get_user_context()
+    data = sanitize_input(request.get_json() or {})
+    include_external = data.get('includeExternal', False)
+    
+    if not user['hospital']:
+        return None, (jsonify({'result': 'fail', 'msg': '병원 정보가 없습니다'}), 400)
+    
+   
+    if include_external:
+        auth_header = request.headers.get('Authorization', '')
+        if not auth_header.startswith('Bearer '):
+            return None, (jsonify({
+                'error': 'MFA required for external hospital search',
+                'code': 'MFA_REQUIRED_EXTERNAL',
+                'message': '타 병원 조회를 위해서는 추가 인증이 필요합니다.'
+            }), 401)
+        
+        token = auth_header.split(' ', 1)[1]
+        is_valid, result = verify_mfa_token(token)
+        
+        if not is_valid:
+            return None, (jsonify({
+                'error': f'MFA verification failed: {result}',
+                'code': 'MFA_VERIFICATION_FAILED',
+                'message': 'MFA 인증에 실패했습니다.'
+            }), 403)
+        
+        mfa_user = result
+        username = mfa_user.get('preferred_username')
+        logger.info(f"전체 병원 조회 (MFA 인증됨): user={username}")
+        
+        
+        data['mfa_verified'] = True
+        data['mfa_user'] = username
+    
+    request_data = {
+        **data,
+        'user_email': user['email'],
+        'doctor_name': user['doctorname'],
+        'hospital': user['hospital']
+    }
+    return request_data, None
+
+@app.route('/api/patient/search', methods=['POST'])
+@login_required_api
+@limiter.limit("30 per minute")
+def patient_search_proxy():
+    try:
+        request_data, error_response = _build_patient_search_request()
+        if error_response:
+            return error_response
+        
+        return hie_proxy('/api/patient/search', request_data)
+        
     except Exception as e:
         logger.error(f"Patient search error: {e}")
         return jsonify({'result': 'fail', 'msg': '환자 검색 중 오류가 발생했습니다'}), 500
 
+@app.route('/api/patient/search/stream', methods=['POST'])
+@login_required_api
+@limiter.limit("30 per minute")
+def patient_search_stream_proxy():
+    try:
+        request_data, error_response = _build_patient_search_request()
+        if error_response:
+            return error_response
+        
+        upstream = hie_call(
+            'POST', "/api/patient/search/stream",
+            json=request_data,
+            headers=hie_forward_headers(hie_json_headers()),
+            stream=True
+        )
+        return passthrough_response(upstream)
+        
+    except requests.exceptions.Timeout:
+        logger.error("HIE server timeout: /api/patient/search/stream")
+        return jsonify({'result': 'fail', 'msg': 'HIE 서버 응답 시간 초과'}), 504
+    except requests.exceptions.ConnectionError:
+        logger.error("HIE server connection error: /api/patient/search/stream")
+        return jsonify({'result': 'fail', 'msg': 'HIE 서버 연결 실패'}), 502
+    except Exception as e:
+        logger.error(f"Patient search stream error: {e}")
+        return jsonify({'result': 'fail', 'msg': '환자 검색 중 오류가 발생했습니다'}), 500
+
 @app.route('/api/admin/logs', methods=['GET'])
 @admin_required
 @limiter.limit("50 per minute")
@@ -748,13 +1809,13 @@ def get_admin_logs():
     try:
         page = request.args.get('page', '1')
         limit = request.args.get('limit', '20')
+        cursor = request.args.get('cursor')
         
-        response_data, status_code = make_hie_request(
-            '/api/admin/logs', 
-            {'page': page, 'limit': limit}, 
-            method='GET'
-        )
-        return jsonify(response_data), status_code
+        params = {'page': page, 'limit': limit}
+        if cursor is not None:
+            params['cursor'] = cursor
+        
+        return hie_proxy('/api/admin/logs', params, method='GET')
         
     except Exception as e:
         logger.error(f"Admin logs error: {e}")
@@ -767,14 +1828,43 @@ def search_admin_logs():
     try:
         data = sanitize_input(request.get_json() or {})
         
-        response_data, status_code = make_hie_request('/api/admin/logs/search', data)
-        return jsonify(response_data), status_code
+        return hie_proxy('/api/admin/logs/search', data)
         
     except Exception as e:
         logger.error(f"Admin logs search error: {e}")
         return jsonify({'result': 'fail', 'msg': '로그 검색 중 오류가 발생했습니다'}), 500
 
 
+@app.route('/api/admin/profile', methods=['GET', 'POST', 'DELETE'])
+@admin_required
+@limiter.limit("30 per minute")
+def admin_profile_proxy():
+    """HIE 서버 샘플링 프로파일러 시작/중지/결과 조회"""
+    try:
+        user = _get_user_context()
+        if request.method != 'GET':
+            logger.info(f"HIE 프로파일러 {request.method}: admin={user['email']}")
+        
+        upstream = hie_call(
+            request.method, "/api/admin/profile",
+            params=request.args,
+            json=sanitize_input(request.get_json(silent=True)) if request.method == 'POST' else None,
+            headers=hie_forward_headers(hie_json_headers()),
+            stream=True
+        )
+        # collapsed 출력은 텍스트이므로 파싱하지 않고 그대로 전달
+        return passthrough_response(upstream)
+        
+    except requests.exceptions.Timeout:
+        logger.error("HIE server timeout: /api/admin/profile")
+        return jsonify({'result': 'fail', 'msg': 'HIE 서버 응답 시간 초과'}), 504
+    except requests.exceptions.ConnectionError:
+        logger.error("HIE server connection error: /api/admin/profile")
+        return jsonify({'result': 'fail', 'msg': 'HIE 서버 연결 실패'}), 502
+    except Exception as e:
+        logger.error(f"Admin profile proxy error: {e}")
+        return jsonify({'result': 'fail', 'msg': '프로파일러 요청 중 오류가 발생했습니다'}), 500
+
 @app.route('/api/mfa/verify-token', methods=['POST'])
 def verify_mfa_token_api():
     """MFA 토큰 검증 API"""
@@ -793,7 +1883,7 @@ def verify_mfa_token_api():
                 'user': result.get('preferred_username'),
                 'acr': result.get('acr'),
                 'auth_time': result.get('auth_time'),
-                'expires_in': 600 - (datetime.now().timestamp() - result.get('auth_time', 0))
+                'expires_in': MFA_MAX_AGE - (datetime.now().timestamp() - result.get('auth_time', 0))
             })
         else:
             return jsonify({'valid': False, 'error': result})
@@ -841,10 +1931,9 @@ def clear_mfa_session():
         session.pop('mfa_token', None)
         session.pop('mfa_expires', None)
         
-        # 모든 MFA state 클리어
-        keys_to_remove = [key for key in session.keys() if key.startswith('mfa_state_')]
-        for key in keys_to_remove:
-            session.pop(key, None)
+        # 모든 MFA state 클리어 (binding 이 바뀌면 저장소의 미사용 state 는 콜백에서 거부됨)
+        session.pop('mfa_binding', None)
+        prune_mfa_states(0)
         
         logger.info(f"MFA 세션 클리어됨: user={current_user.id}")
         
@@ -901,7 +1990,7 @@ def health_check():
         # HIE 서버 연결 확인
         hie_status = "unknown"
         try:
-            response = requests.get(f"{HIE_SERVER_URL}/health", timeout=5)
+            response = hie_call('GET', '/health')
             hie_status = "connected" if response.status_code == 200 else "disconnected"
         except:
             hie_status = "error"
@@ -914,6 +2003,15 @@ def health_check():
                 "hie_server": hie_status
             },
             "mfa_enabled": True,
+            "app_log": {"queue_depth": log_listener.queue.qsize(), "dropped": log_queue_handler.dropped},
+            "upstream_pool": hie_client.pool_stats(),
+            "upstream_targets": hie_client.target_stats(),
+            "upstream_circuits": hie_client.breaker_stats(),
+            "jwks": jwks_cache.stats(),
+            "session_store": {"server_side": SESSION_SERVER_SIDE, **session_store.stats()},
+            "user_store": user_store.stats(),
+            "mfa_token_cache": {"size": len(verified_tokens), "hits": verified_tokens.hits,
+                                "misses": verified_tokens.misses},
             "version": "1.0.0"
         })
         
@@ -924,6 +2022,12 @@ def health_check():
             "error": str(e)
         }), 500
 
+@app.route('/metrics')
+@limiter.exempt
+def metrics_endpoint():
+    """Prometheus 메트릭"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/debug/jwks')
 def debug_jwks():
     """디버그용 JWKS 정보 (개발 환경에서만 사용)"""
@@ -932,7 +2036,8 @@ def debug_jwks():
             jwks = get_keycloak_public_keys()
             return jsonify({
                 "jwks": jwks,
-                "cache_time": _jwks_cache_time.isoformat() if _jwks_cache_time else None,
+                "cache_time": jwks_cache.loaded_at.isoformat() if jwks_cache.loaded_at else None,
+                "cache": jwks_cache.stats(),
                 "keys_count": len(jwks.get('keys', [])) if jwks else 0
             })
         except Exception as e:
@@ -944,7 +2049,7 @@ def debug_jwks():
 if __name__ == '__main__':
     logger.info("Starting HIE Web Server with MFA support...")
     logger.info(f"Keycloak URL: {KEYCLOAK_BASE_URL}")
-    logger.info(f"HIE Server URL: {HIE_SERVER_URL}")
+    logger.info(f"HIE Server URL: {', '.join(HIE_SERVER_URLS)}")
     logger.info(f"Frontend URL: {FRONTEND_MAIN_URL}")
     
     
@@ -956,10 +2061,12 @@ if __name__ == '__main__':
     
     required_vars = [
         'SECRET_KEY', 'KEYCLOAK_BASE_URL', 'KEYCLOAK_REALM', 
-        'KEYCLOAK_CLIENT_ID', 'KEYCLOAK_CLIENT_SECRET', 'HIE_SERVER_URL'
+        'KEYCLOAK_CLIENT_ID', 'KEYCLOAK_CLIENT_SECRET'
     ]
     
     missing_vars = [var for var in required_vars if not os.environ.get(var)]
+    if not HIE_SERVER_URLS:
+        missing_vars.append('HIE_SERVER_URL')
     if missing_vars:
         logger.error(f"필수 환경변수가 없습니다: {', '.join(missing_vars)}")
         exit(1)
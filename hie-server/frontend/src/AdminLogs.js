@@ -18,6 +18,7 @@ function AdminLogs() {
   const [user, setUser] = useState(null);
   const [currentPage, setCurrentPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
+  const [totalExact, setTotalExact] = useState(true);
   const [searchForm, setSearchForm] = useState({
     action: '',
     user_email: '',
@@ -57,6 +58,7 @@ function AdminLogs() {
       
       setLogs(data.logs || []);
       setTotalPages(Math.ceil(data.total / data.limit));
+      setTotalExact(data.total_exact !== false);
       setCurrentPage(page);
     } catch (err) {
       alert(err.message || '로그 조회 실패');
@@ -81,6 +83,7 @@ function AdminLogs() {
       
       setLogs(data.logs || []);
       setTotalPages(Math.ceil(data.total / data.limit));
+      setTotalExact(data.total_exact !== false);
       setCurrentPage(1);
     } catch (err) {
       alert(err.message || '로그 검색 실패');
@@ -218,7 +221,7 @@ function AdminLogs() {
         }}>
           <span>감사 로그 {logs.length > 0 && `(${logs.length}건)`}</span>
           <span style={{ fontSize: 12, color: '#666' }}>
-            페이지 {currentPage} / {totalPages}
+            페이지 {currentPage} / {totalExact ? '' : '약 '}{totalPages}
           </span>
         </div>
 
@@ -0,0 +1,275 @@
+"""HIE 서버와 웹 백엔드가 함께 쓰는 로깅/입력 정리 유틸리티"""
+import os
+import sys
+import re
+import json
+import time
+import queue
+import threading
+import bisect
+import logging
+import logging.handlers
+import gzip
+import glob
+import shutil
+from datetime import datetime
+from html import escape
+from typing import Dict, List, Optional, Any, Tuple
+import bleach
+
+logger = logging.getLogger(__name__)
+
+class RotatingLogFileHandler(logging.handlers.RotatingFileHandler):
+    """크기 또는 시간 기준으로 회전하고, 회전된 파일은 백그라운드에서 gzip 압축"""
+    
+    def __init__(self, filename: str, max_bytes: int, rotate_interval: float, backup_count: int, compress: bool = True):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+        self.rollover_at = time.time() + rotate_interval if rotate_interval > 0 else None
+    
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+    
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            # 번호 대신 시각으로 이름을 붙여 압축 중인 파일이 다시 rename되지 않도록 함
+            rotated = f"{self.baseFilename}.{datetime.now():%Y%m%d-%H%M%S-%f}"
+            os.replace(self.baseFilename, rotated)
+            if self.compress:
+                threading.Thread(target=self._compress, args=(rotated,), name="log-compress", daemon=True).start()
+            else:
+                self._prune()
+        
+        if self.rotate_interval > 0:
+            self.rollover_at = time.time() + self.rotate_interval
+        self.stream = self._open()
+    
+    def _compress(self, path: str):
+        try:
+            with open(path, 'rb') as src, gzip.open(f"{path}.gz.tmp", 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(f"{path}.gz.tmp", f"{path}.gz")
+            os.remove(path)
+        except OSError as e:
+            sys.stderr.write(f"로그 압축 실패 ({path}): {e}\n")
+        self._prune()
+    
+    def _prune(self):
+        if self.backupCount <= 0:
+            return
+        rotated = sorted(p for p in glob.glob(f"{glob.escape(self.baseFilename)}.*") if not p.endswith('.tmp'))
+        for path in rotated[:-self.backupCount]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+class JsonLogFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """로그 큐가 가득 차면 요청 스레드를 막지 않고 버림"""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def setup_app_logging(log_file: str, max_bytes: int, rotate_interval: float, backup_count: int,
+                      compress: bool, json_lines: bool, queue_size: int) -> Tuple[logging.handlers.QueueListener, DroppingQueueHandler]:
+    if json_lines:
+        formatter = JsonLogFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+    
+    handlers = [
+        logging.StreamHandler(),
+        RotatingLogFileHandler(log_file, max_bytes, rotate_interval, backup_count, compress)
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    # 요청 스레드는 큐에 넣기만 하고, 파일/콘솔 출력은 리스너 스레드가 담당
+    log_queue = queue.Queue(maxsize=queue_size)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    queue_handler = DroppingQueueHandler(log_queue)
+    root.addHandler(queue_handler)
+    root.setLevel(logging.INFO)
+    
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener, queue_handler
+
+# bleach.clean(escape(...))가 값을 바꾸는 문자 (HTML 특수문자, 제어문자, 서러게이트)
+_MARKUP_RE = re.compile('[\x00-\x08\x0b-\x1f"&\'<>\ud800-\udfff]')
+
+def sanitize_text(value: str) -> str:
+    """마크업 문자가 없는 문자열은 bleach 처리를 생략"""
+    value = value.strip()
+    if not _MARKUP_RE.search(value):
+        return value
+    return bleach.clean(escape(value))
+
+def sanitize_input(data: Any) -> Any:
+    if isinstance(data, str):
+        return sanitize_text(data)
+    elif isinstance(data, dict):
+        return {k: sanitize_input(v) for k, v in data.items()}
+    elif isinstance(data, list):
+        return [sanitize_input(item) for item in data]
+    return data
+
+class LatencyHistogram:
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, seconds: float):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+            self._count += 1
+    
+    def raw(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self._counts), self._sum, self._count
+    
+    def percentile(self, q: float) -> Optional[float]:
+        # 버킷 상한값 기준 근사치 - 마지막 버킷을 넘는 값은 마지막 상한값으로 표시
+        # (inf 는 JSON 으로 직렬화할 수 없음, 초과 건수는 snapshot 의 '+Inf' 버킷으로 확인)
+        counts, _, total = self.raw()
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for upper, count in zip(self.buckets, counts):
+            seen += count
+            if seen >= rank:
+                return upper
+        return self.buckets[-1]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        counts, total_sum, total = self.raw()
+        cumulative = 0
+        buckets = {}
+        for upper, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            buckets['+Inf' if upper == float('inf') else str(upper)] = cumulative
+        return {
+            'count': total,
+            'sum': round(total_sum, 6),
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'buckets': buckets
+        }
+
+class MetricsRegistry:
+    """Prometheus 텍스트 형식(/metrics)으로 노출하는 카운터/히스토그램/게이지 저장소"""
+    
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._histograms: Dict[str, Dict[tuple, LatencyHistogram]] = {}
+        self._gauges: Dict[str, Any] = {}
+    
+    def counter(self, name: str, help_text: str):
+        self._meta[name] = ('counter', help_text)
+        self._counters[name] = {}
+    
+    def histogram(self, name: str, help_text: str):
+        self._meta[name] = ('histogram', help_text)
+        self._histograms[name] = {}
+    
+    def gauge(self, name: str, help_text: str, fn):
+        # fn은 숫자 또는 {라벨 튜플: 값} 딕셔너리를 반환 (스크레이프 시점에만 호출)
+        self._meta[name] = ('gauge', help_text)
+        self._gauges[name] = fn
+    
+    def inc(self, name: str, labels: tuple = (), amount: float = 1):
+        series = self._counters[name]
+        with self._lock:
+            series[labels] = series.get(labels, 0) + amount
+    
+    def observe(self, name: str, labels: tuple, seconds: float):
+        series = self._histograms[name]
+        hist = series.get(labels)
+        if hist is None:
+            with self._lock:
+                hist = series.setdefault(labels, LatencyHistogram())
+        hist.observe(seconds)
+    
+    @staticmethod
+    def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+        pairs = labels + extra
+        if not pairs:
+            return ''
+        escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+        return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+    
+    def render(self) -> str:
+        lines = []
+        for name, (kind, help_text) in self._meta.items():
+            full_name = f"{self.prefix}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            
+            if kind == 'counter':
+                with self._lock:
+                    series = list(self._counters[name].items())
+                for labels, value in series:
+                    lines.append(f"{full_name}{self._format_labels(labels)} {value}")
+            elif kind == 'histogram':
+                with self._lock:
+                    series = list(self._histograms[name].items())
+                for labels, hist in series:
+                    counts, total_sum, total = hist.raw()
+                    cumulative = 0
+                    for upper, count in zip(hist.buckets + (float('inf'),), counts):
+                        cumulative += count
+                        le = '+Inf' if upper == float('inf') else repr(upper)
+                        lines.append(f"{full_name}_bucket{self._format_labels(labels, (('le', le),))} {cumulative}")
+                    lines.append(f"{full_name}_sum{self._format_labels(labels)} {total_sum}")
+                    lines.append(f"{full_name}_count{self._format_labels(labels)} {total}")
+            else:
+                try:
+                    value = self._gauges[name]()
+                except Exception as e:
+                    logger.warning(f"메트릭 수집 실패 ({full_name}): {e}")
+                    continue
+                items = value.items() if isinstance(value, dict) else [((), value)]
+                for labels, item in items:
+                    lines.append(f"{full_name}{self._format_labels(labels)} {item}")
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,172 @@
+"""medical_records / audit_logs 합성 데이터 생성기
+
+hie-server 디렉터리에서 HIE 서버와 같은 환경변수(.env)로 실행한다.
+
+    python -m loadtest.datagen --records 1000000 --audit-logs 2000000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+# 통계청 성씨 분포 상위 (비율 %)
+SURNAMES = [
+    ('김', 21.5), ('이', 14.7), ('박', 8.4), ('최', 4.7), ('정', 4.3), ('강', 2.4), ('조', 2.1),
+    ('윤', 2.1), ('장', 2.0), ('임', 1.7), ('한', 1.5), ('오', 1.5), ('서', 1.5), ('신', 1.4),
+    ('권', 1.4), ('황', 1.4), ('안', 1.3), ('송', 1.3), ('전', 1.1), ('홍', 1.1), ('유', 1.1),
+    ('고', 0.9), ('문', 0.9), ('양', 0.9), ('손', 0.9), ('배', 0.8), ('백', 0.8), ('허', 0.6),
+    ('남궁', 0.1), ('제갈', 0.05),
+]
+GIVEN_SYLLABLES = list('민서준지현우예도하윤수진영성재은혜동훈연정아주원태경승소희나유채')
+
+REGIONS = {
+    '서울특별시': ['강남구', '서초구', '송파구', '종로구', '마포구', '노원구', '관악구', '영등포구'],
+    '부산광역시': ['해운대구', '부산진구', '동래구', '사하구'],
+    '대구광역시': ['수성구', '달서구', '중구'],
+    '인천광역시': ['남동구', '연수구', '부평구'],
+    '경기도': ['수원시 영통구', '성남시 분당구', '고양시 일산동구', '용인시 수지구', '부천시'],
+    '광주광역시': ['북구', '서구'],
+    '대전광역시': ['유성구', '서구'],
+    '강원도': ['춘천시', '원주시'],
+    '제주특별자치도': ['제주시', '서귀포시'],
+}
+# 인구 비례 가중치
+REGION_WEIGHTS = [19, 7, 5, 6, 27, 3, 3, 3, 1]
+ROAD_NAMES = ['중앙로', '대학로', '테헤란로', '세종대로', '번영로', '시청로', '역삼로', '문화로', '공원로', '해안로']
+
+# 진단명 - KCD 코드 (외래 빈도가 높은 순으로 가중치)
+DIAGNOSES = [
+    ('감기', 'J00', 12), ('급성기관지염', 'J20.9', 9), ('고혈압', 'I10', 9), ('당뇨병', 'E11.9', 7),
+    ('요통', 'M54.5', 6), ('위염', 'K29.7', 6), ('알레르기비염', 'J30.4', 5), ('장염', 'K59.1', 4),
+    ('인플루엔자', 'J11.1', 4), ('두통', 'R51', 3), ('천식', 'J45.9', 3), ('관절염', 'M19.9', 3),
+    ('허리디스크', 'M51.2', 2), ('결막염', 'H10.9', 2), ('방광염', 'N30.9', 2), ('중이염', 'H66.9', 2),
+    ('불면증', 'G47.0', 2), ('우울증', 'F32.9', 2), ('아토피', 'L20.9', 2), ('폐렴', 'J18.9', 1),
+    ('골절', 'T14.2', 1), ('빈혈', 'D64.9', 1), ('편두통', 'G43.9', 1), ('인후염', 'J02.9', 1),
+]
+DEPARTMENTS = {
+    'J': '내과', 'I': '내과', 'E': '내과', 'K': '내과', 'D': '내과', 'R': '가정의학과',
+    'M': '정형외과', 'T': '정형외과', 'H': '안과', 'N': '비뇨의학과', 'G': '신경과',
+    'F': '정신건강의학과', 'L': '피부과',
+}
+DESCRIPTIONS = [
+    '증상 {days}일째, 약물 처방 후 경과 관찰', '외래 추적 관찰, 투약 유지',
+    '초진. 검사 결과 확인 후 재내원 예정', '증상 호전, 기존 처방 {days}일분 연장',
+]
+
+HOSPITALS = [
+    ('A병원', '서울시 종로구 대학로 1'), ('B병원', '서울시 강남구 강남대로 2'),
+    ('C병원', '부산광역시 해운대구 해운대로 3'), ('D병원', '대구광역시 수성구 달구벌대로 4'),
+    ('E병원', '경기도 성남시 분당구 판교로 5'), ('F병원', '인천광역시 연수구 컨벤시아대로 6'),
+    ('G병원', '광주광역시 북구 대천로 7'), ('H병원', '대전광역시 유성구 대학로 8'),
+]
+
+class SyntheticDataGenerator:
+    def __init__(self, seed: int = 42, hospital_skew: float = 1.2, hospitals: List[Tuple[str, str]] = None):
+        self.rng = random.Random(seed)
+        self._surnames, self._surname_weights = zip(*SURNAMES)
+        self._diag_weights = [w for _, _, w in DIAGNOSES]
+        self._patient_seq = 0
+        self.hospitals = hospitals or HOSPITALS
+        # 병원별 환자 수 편중 (Zipf)
+        self.hospital_weights = [1 / (rank ** hospital_skew) for rank in range(1, len(self.hospitals) + 1)]
+        self.doctors = {
+            name: [(f"dr{idx}@{name[0].lower()}hospital.kr", self.name()) for idx in range(1, 21)]
+            for name, _ in self.hospitals
+        }
+    
+    def name(self) -> str:
+        surname = self.rng.choices(self._surnames, self._surname_weights)[0]
+        return surname + ''.join(self.rng.choices(GIVEN_SYLLABLES, k=self.rng.choice((1, 2, 2, 2))))
+    
+    def address(self) -> str:
+        sido = self.rng.choices(list(REGIONS), REGION_WEIGHTS)[0]
+        return f"{sido} {self.rng.choice(REGIONS[sido])} {self.rng.choice(ROAD_NAMES)} {self.rng.randint(1, 300)}"
+    
+    def ssn(self) -> Tuple[str, str]:
+        birth = datetime(1940, 1, 1) + timedelta(days=self.rng.randint(0, 82 * 365))
+        gender = self.rng.choice(('M', 'F'))
+        code = (1 if gender == 'M' else 2) + (2 if birth.year >= 2000 else 0)
+        return f"{birth:%y%m%d}-{code}{self.rng.randint(0, 999999):06d}", gender
+    
+    def hospital(self) -> Tuple[str, str]:
+        return self.rng.choices(self.hospitals, self.hospital_weights)[0]
+    
+    def medical_record(self, hospital: Tuple[str, str] = None) -> Dict[str, Any]:
+        hospital_name, hospital_address = hospital or self.hospital()
+        doctor_email, doctor_name = self.rng.choice(self.doctors.get(hospital_name) or [('', self.name())])
+        diagnosis, code, _ = self.rng.choices(DIAGNOSES, self._diag_weights)[0]
+        ssn, gender = self.ssn()
+        visit_start = datetime.now() - timedelta(days=self.rng.randint(0, 3 * 365))
+        self._patient_seq += 1
+        return {
+            'patient_no': f"P{self._patient_seq:08d}",
+            'name': self.name(),
+            'gender': gender,
+            'ssn': ssn,
+            'address': self.address(),
+            'department': DEPARTMENTS.get(code[0], '내과'),
+            'disease_code': code,
+            'diagnosis': diagnosis,
+            'visit_start': f"{visit_start:%Y-%m-%d}",
+            'visit_end': f"{visit_start + timedelta(days=self.rng.choice((0, 0, 0, 1, 3))):%Y-%m-%d}",
+            'description': self.rng.choice(DESCRIPTIONS).format(days=self.rng.randint(1, 14)),
+            'note': '',
+            'user_email': doctor_email,
+            'doctor_name': doctor_name,
+            'hospital': hospital_name,
+            'hospital_address': hospital_address,
+            'issue_date': f"{datetime.now():%Y-%m-%d}",
+        }
+    
+    def audit_log(self, actions: Tuple[str, ...], days: int) -> Tuple[str, str, str, str, str, datetime]:
+        hospital_name, _ = self.hospital()
+        doctor_email, doctor_name = self.rng.choice(self.doctors[hospital_name])
+        action = self.rng.choice(actions)
+        if '조회' in action:
+            info = f"검색조건: 환자명:{self.name()}"
+        elif '마스킹해제' in action:
+            info = f"레코드ID: {self.rng.randint(1, 1000000)}, 해제필드: name, address"
+        else:
+            info = f"환자번호: P{self.rng.randint(1, 99999999):08d}"
+        created_at = datetime.now() - timedelta(seconds=self.rng.randint(0, days * 86400))
+        return action, doctor_email, doctor_name, hospital_name, info, created_at
+
+def _insert_batches(db_manager, label: str, total: int, batch_size: int, insert_rows, make_row):
+    """insert_rows(cur, rows) 로 batch_size 단위 입력 (배치마다 한 트랜잭션)"""
+    started = time.monotonic()
+    inserted = 0
+    while inserted < total:
+        rows = [make_row() for _ in range(min(batch_size, total - inserted))]
+        with db_manager.get_connection() as conn:
+            with conn.cursor() as cur:
+                insert_rows(cur, rows)
+            conn.commit()
+        inserted += len(rows)
+        elapsed = time.monotonic() - started
+        print(f"{label}: {inserted:,}/{total:,}건 ({inserted / elapsed:,.0f}건/초)", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="medical_records / audit_logs 합성 데이터 생성")
+    parser.add_argument('--records', type=int, default=100000, help="생성할 진료기록 수")
+    parser.add_argument('--audit-logs', type=int, default=200000, help="생성할 감사 로그 수")
+    parser.add_argument('--audit-days', type=int, default=365, help="감사 로그 created_at 분포 기간(일)")
+    parser.add_argument('--batch-size', type=int, default=2000)
+    parser.add_argument('--hospital-skew', type=float, default=1.2, help="병원별 편중 (Zipf 지수, 0이면 균등)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    # HIE 서버와 동일한 암호화/마스킹/blind index 규칙으로 입력하기 위해 앱 모듈을 그대로 사용
+    import app as hie
+    
+    generator = SyntheticDataGenerator(seed=args.seed, hospital_skew=args.hospital_skew)
+    if args.records:
+        _insert_batches(hie.db_manager, 'medical_records', args.records, args.batch_size, hie.insert_medical_records,
+                        lambda: hie._medical_record_params(generator.medical_record()))
+    if args.audit_logs:
+        _insert_batches(hie.db_manager, 'audit_logs', args.audit_logs, args.batch_size,
+                        lambda cur, rows: cur.executemany(hie.AuditLogWriter.INSERT_SQL, rows),
+                        lambda: generator.audit_log(hie.AUDIT_ACTIONS, args.audit_days))
+
+if __name__ == '__main__':
+    main()
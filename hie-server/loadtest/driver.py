@@ -0,0 +1,206 @@
+"""백엔드(backend/app.py) -> HIE 서버(app.py) 경로로 검색/입력/마스킹해제/감사로그 조회 혼합 부하를 발생
+
+    python -m loadtest.driver --backend-url http://127.0.0.1:5000 \
+        --keycloak-url http://127.0.0.1:18080 --realm hie \
+        --concurrency 20 --duration 60 --mix search=50,search_external=10,register=20,unmask=10,admin_logs=10
+
+부하 테스트 중에는 두 서버 모두 RATELIMIT_ENABLED=false 로 실행해야 429가 섞이지 않는다.
+"""
+import argparse
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import requests
+
+from loadtest.datagen import SyntheticDataGenerator, DIAGNOSES
+from loadtest.report import LatencyReport
+
+OPERATIONS = ('search', 'search_external', 'register', 'unmask', 'admin_logs', 'admin_log_search')
+MFA_OPERATIONS = ('search_external', 'unmask')
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"알 수 없는 작업: {name} (가능: {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+class MfaTokenSource:
+    """Keycloak(또는 대역)의 token 엔드포인트에서 MFA 토큰을 받아 만료 전까지 재사용"""
+    
+    def __init__(self, keycloak_url: str, realm: str, client_id: str, username: str):
+        self.url = f"{keycloak_url}/realms/{realm}/protocol/openid-connect/token"
+        self.form = {'grant_type': 'password', 'client_id': client_id, 'username': username}
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+    
+    def get(self) -> str:
+        with self._lock:
+            if time.time() >= self._expires_at - 30:
+                response = requests.post(self.url, data=self.form, timeout=10)
+                response.raise_for_status()
+                body = response.json()
+                self._token = body['access_token']
+                self._expires_at = time.time() + body.get('expires_in', 300)
+            return self._token
+
+class LoadDriver:
+    def __init__(self, args):
+        self.args = args
+        self.base = args.backend_url.rstrip('/')
+        self.report = LatencyReport()
+        self.mix = parse_mix(args.mix)
+        self.mfa = (MfaTokenSource(args.keycloak_url, args.realm, args.client_id, args.username)
+                    if args.keycloak_url else None)
+        if not self.mfa:
+            for name in MFA_OPERATIONS:
+                if self.mix.pop(name, None):
+                    print(f"--keycloak-url 미지정: {name} 작업 제외")
+        self.record_ids = deque(maxlen=10000)
+        self.cookies = None
+        self._stop_at = 0.0
+        self._remaining = args.requests
+        self._count_lock = threading.Lock()
+    
+    def login(self):
+        response = requests.post(f"{self.base}/api/login",
+                                 json={'username': self.args.username, 'password': self.args.password}, timeout=10)
+        response.raise_for_status()
+        # Flask 세션 쿠키는 서명된 값이므로 한 번 로그인한 쿠키를 모든 가상 사용자가 공유 (로그인 rate limit 회피)
+        self.cookies = response.cookies
+    
+    def _take_slot(self) -> bool:
+        if time.monotonic() >= self._stop_at:
+            return False
+        if self._remaining is None:
+            return True
+        with self._count_lock:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            return True
+    
+    def _call(self, session: requests.Session, label: str, method: str, path: str, **kwargs) -> Optional[requests.Response]:
+        started = time.perf_counter()
+        try:
+            response = session.request(method, f"{self.base}{path}", timeout=self.args.timeout, **kwargs)
+            # 스트리밍이 아니어도 본문 수신까지를 지연시간에 포함
+            _ = response.content
+            self.report.record(label, time.perf_counter() - started, response.status_code)
+            return response
+        except requests.RequestException as e:
+            self.report.record(label, time.perf_counter() - started, type(e).__name__)
+            return None
+    
+    def _collect_ids(self, response: Optional[requests.Response]):
+        if response is None or response.status_code != 200:
+            return
+        try:
+            for record in response.json().get('records', [])[:20]:
+                self.record_ids.append(record['id'])
+        except (ValueError, KeyError, TypeError):
+            pass
+    
+    def _mfa_headers(self) -> Dict[str, str]:
+        return {'Authorization': f"Bearer {self.mfa.get()}"}
+    
+    def run_operation(self, session: requests.Session, generator: SyntheticDataGenerator, rng: random.Random, name: str):
+        if name in ('search', 'search_external'):
+            criteria = rng.choice((
+                {'name': generator.name()},
+                {'birth6': generator.ssn()[0][:6]},
+                {'department': rng.choice(('내과', '정형외과', '가정의학과')), 'start_date': '2025-01-01'},
+            ))
+            if name == 'search_external':
+                response = self._call(session, 'POST /api/patient/search (external)', 'POST', '/api/patient/search',
+                                      json={**criteria, 'includeExternal': True}, headers=self._mfa_headers())
+            else:
+                response = self._call(session, 'POST /api/patient/search', 'POST', '/api/patient/search', json=criteria)
+            self._collect_ids(response)
+        
+        elif name == 'register':
+            record = generator.medical_record()
+            for key in ('user_email', 'doctor_name', 'hospital', 'hospital_address', 'issue_date'):
+                record.pop(key)
+            self._call(session, 'POST /api/medical-record', 'POST', '/api/medical-record', json=record)
+        
+        elif name == 'unmask':
+            if not self.record_ids:
+                # 해제할 레코드가 아직 없으면 전체병원 검색으로 ID를 먼저 확보
+                return self.run_operation(session, generator, rng, 'search_external')
+            self._call(session, 'POST /api/patient/unmask', 'POST', '/api/patient/unmask',
+                       json={'record_id': rng.choice(self.record_ids), 'fields': ['name', 'address']},
+                       headers=self._mfa_headers())
+        
+        elif name == 'admin_logs':
+            self._call(session, 'GET /api/admin/logs', 'GET', '/api/admin/logs',
+                       params={'page': rng.randint(1, 5), 'limit': 20})
+        
+        elif name == 'admin_log_search':
+            self._call(session, 'POST /api/admin/logs/search', 'POST', '/api/admin/logs/search',
+                       json={'action': rng.choice(('내병원조회시작', '진료입력완료', '개인정보마스킹해제')),
+                             'start_date': '2025-01-01'})
+    
+    def worker(self, index: int):
+        rng = random.Random(self.args.seed + index)
+        generator = SyntheticDataGenerator(seed=self.args.seed + index)
+        names, weights = zip(*self.mix.items())
+        interval = self.args.concurrency / self.args.rate if self.args.rate else 0
+        next_at = time.monotonic() + rng.random() * interval
+        
+        with requests.Session() as session:
+            session.cookies.update(self.cookies)
+            while self._take_slot():
+                if interval:
+                    delay = next_at - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    next_at += interval
+                self.run_operation(session, generator, rng, rng.choices(names, weights)[0])
+    
+    def run(self) -> float:
+        self.login()
+        started = time.monotonic()
+        self._stop_at = started + self.args.duration
+        threads = [threading.Thread(target=self.worker, args=(i,), daemon=True) for i in range(self.args.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.monotonic() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="HIE 백엔드 경유 부하 발생기")
+    parser.add_argument('--backend-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--username', default='superadmin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--keycloak-url', help="MFA 토큰 발급용 Keycloak(대역) 주소. 없으면 MFA 작업 제외")
+    parser.add_argument('--realm', default='hie')
+    parser.add_argument('--client-id', default='hie-backend')
+    parser.add_argument('--mix', default='search=50,search_external=10,register=20,unmask=10,admin_logs=5,admin_log_search=5',
+                        help="작업=가중치 목록")
+    parser.add_argument('--concurrency', type=int, default=10, help="가상 사용자 수")
+    parser.add_argument('--duration', type=float, default=60.0, help="최대 실행 시간(초)")
+    parser.add_argument('--requests', type=int, help="총 요청 수 (지정 시 먼저 도달하는 조건에서 종료)")
+    parser.add_argument('--rate', type=float, default=0, help="목표 총 처리량(rps), 0이면 최대 속도")
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json-out', help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+    
+    driver = LoadDriver(args)
+    elapsed = driver.run()
+    driver.report.print_table(elapsed)
+    if args.json_out:
+        driver.report.write_json(args.json_out, elapsed, meta={'mix': driver.mix, 'concurrency': args.concurrency,
+                                                               'rate': args.rate})
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""요청마다 실행되는 순수 Python 헬퍼 마이크로벤치마크 + 회귀 검사
+
+    python -m loadtest.microbench                      # 기준값과 비교, 임계값 초과 시 종료코드 1
+    python -m loadtest.microbench --update-baseline    # 현재 결과를 기준값으로 저장
+    python -m loadtest.microbench --filter mask --threshold 10
+
+머신 간 편차를 줄이기 위해 각 결과를 고정 보정 작업(calibration) 시간으로 나눈 상대값으로 비교한다.
+반복마다 구한 상대값의 중앙값을 쓰고, 임계값을 넘은 항목은 다시 측정해 재현될 때만 회귀로 본다.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# HIE 서버/백엔드 모듈은 import 시 설정을 검증하므로 DB/ESM 없이 실행할 수 있도록 자리값을 채운다
+for _key, _value in {
+    'ESM_SERVER_HOST': '127.0.0.1', 'DB_HOST': '127.0.0.1', 'DB_USER': 'bench', 'DB_PASS': 'bench',
+    'DB_NAME': 'bench', 'DB_AES_KEY': 'bench-aes-key', 'SECRET_KEY': 'bench',
+    'HIE_SERVER_URL': 'http://127.0.0.1:8000', 'KEYCLOAK_BASE_URL': 'http://127.0.0.1:18080',
+    'KEYCLOAK_REALM': 'hie', 'KEYCLOAK_CLIENT_ID': 'hie-backend', 'KEYCLOAK_CLIENT_SECRET': 'bench',
+}.items():
+    os.environ.setdefault(_key, _value)
+
+import app as hie
+from loadtest.datagen import SyntheticDataGenerator
+from loadtest.standins import KeycloakStandIn
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+DEFAULT_THRESHOLD = float(os.environ.get('BENCH_THRESHOLD', 20))
+
+def _load_backend():
+    path = os.path.join(os.path.dirname(os.path.abspath(hie.__file__)), 'backend', 'app.py')
+    spec = importlib.util.spec_from_file_location('hie_backend_app', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _calibration():
+    # 문자열/딕셔너리 위주의 고정 작업 - 벤치마크 대상과 비슷한 성격의 부하
+    table = {}
+    for i in range(200):
+        key = f"key-{i}"
+        table[key] = key.upper().replace('-', '_')
+    return sorted(table.values())
+
+class Workloads:
+    """실제 요청 크기에 맞춘 입력 데이터"""
+
+    def __init__(self, seed: int = 1234):
+        generator = SyntheticDataGenerator(seed=seed)
+        self.search_body = {
+            'user_email': 'doctor@abc.com', 'doctor_name': generator.name(), 'hospital': 'A병원',
+            'name': generator.name(), 'patient_id': 'P-2025-001234', 'birth6': '900101',
+            'ssn': '900101-1234567', 'start_date': '2025-01-01', 'end_date': '2025-12-31',
+            'department': '내과', 'doctor_name_search': generator.name(), 'includeExternal': True,
+        }
+        self.record_body = generator.medical_record()
+        self.record_body['description'] = ("환자는 3일 전부터 발열 및 기침 증상으로 내원함. "
+                                           "청진상 수포음 없음, 인후 발적 관찰됨. " * 8)
+        self.bulk_body = {'records': [generator.medical_record() for _ in range(200)],
+                          'user_email': 'doctor@abc.com', 'doctor_name': '김의사', 'hospital': 'A병원'}
+        self.markup_body = dict(self.record_body, description='<script>alert("x")</script> & 진료 메모 ' * 10)
+        self.names = [generator.name() for _ in range(100)]
+        self.addresses = [generator.address() for _ in range(100)]
+        self.user_info = hie.UserInfo.from_dict(self.search_body)
+        self.audit_created_at = datetime(2025, 6, 1, 9, 30, 0)
+
+def build_benchmarks(workloads: Workloads, backend) -> Dict[str, Callable[[], Any]]:
+    w = workloads
+    mask_name = hie.MaskingService.mask_name
+    mask_address = hie.MaskingService.mask_address
+
+    def audit_query():
+        builder = hie.AuditLogQueryBuilder()
+        builder.add_action('조회')
+        builder.add_text('user_email', 'abc.com', 'contains')
+        builder.add_text('hospital', 'A병원', 'exact')
+        builder.add_date_range('2025-01-01', '2025-06-30')
+        return builder.where_clause, builder.params
+
+    def user_context():
+        with backend.app.test_request_context():
+            backend.login_user(backend.users['superadmin'])
+            for _ in range(100):
+                backend._get_user_context()
+    
+    # 네트워크 없이 검증하도록 대역 키로 JWKS 캐시를 채움
+    keycloak = KeycloakStandIn('127.0.0.1', 0, backend.KEYCLOAK_REALM, backend.KEYCLOAK_CLIENT_ID, token_ttl=3600)
+    keycloak.issuer = backend.KEYCLOAK_ISSUER
+    backend.jwks_cache.load(keycloak.jwks)
+    mfa_token = keycloak.issue_token('bench.doctor', hospital='A병원')
+    
+    def verify_uncached():
+        backend.verified_tokens.clear()
+        return backend.verify_mfa_token(mfa_token)
+
+    return {
+        'sanitize_input.search_body': lambda: hie.sanitize_input(w.search_body),
+        'sanitize_input.medical_record': lambda: hie.sanitize_input(w.record_body),
+        'sanitize_input.medical_record_markup': lambda: hie.sanitize_input(w.markup_body),
+        'sanitize_input.bulk_200': lambda: hie.sanitize_input(w.bulk_body),
+        'backend.sanitize_input.medical_record': lambda: backend.sanitize_input(w.record_body),
+        'mask_name.x100': lambda: [mask_name(n) for n in w.names],
+        'mask_address.x100': lambda: [mask_address(a) for a in w.addresses],
+        'patient_search_query.from_dict': lambda: hie.PatientSearchQuery.from_dict(w.search_body, w.user_info),
+        'audit_log_query_builder': audit_query,
+        'user_info.from_dict': lambda: hie.UserInfo.from_dict(w.search_body),
+        'format_audit_message': lambda: hie.format_audit_message(
+            '전체병원조회완료', w.user_info, '검색조건: 환자명:홍길동, 진료과:내과, 결과:25건', w.audit_created_at),
+        'backend._get_user_context.x100': user_context,
+        'backend.verify_mfa_token.cached': lambda: backend.verify_mfa_token(mfa_token),
+        'backend.verify_mfa_token.uncached': verify_uncached,
+    }
+
+def _timer(func: Callable[[], Any], min_time: float):
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    return timer, number
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float) -> Tuple[float, float, float]:
+    """호출 1회당 최소 시간(us), 보정 작업 최소 시간(us), 반복별 상대값의 중앙값
+
+    보정 작업과 대상을 번갈아 측정해 CPU 클럭/부하 변동이 양쪽에 같이 반영되도록 하고,
+    튀는 반복 하나가 결과를 좌우하지 않도록 반복마다 비율을 구해 중앙값을 쓴다.
+    """
+    bench, bench_number = _timer(func, min_time)
+    calibration, calibration_number = _timer(_calibration, min_time)
+    bench_best = calibration_best = float('inf')
+    ratios = []
+    for _ in range(repeat):
+        calibration_time = calibration.timeit(calibration_number) / calibration_number
+        bench_time = bench.timeit(bench_number) / bench_number
+        calibration_best = min(calibration_best, calibration_time)
+        bench_best = min(bench_best, bench_time)
+        ratios.append(bench_time / calibration_time)
+    return bench_best * 1e6, calibration_best * 1e6, statistics.median(ratios)
+
+def run(benchmarks: Dict[str, Callable[[], Any]], names: List[str], repeat: int, min_time: float) -> Dict[str, Any]:
+    results = {}
+    calibrations = []
+    for name in names:
+        func = benchmarks[name]
+        func()
+        us, calibration_us, relative = measure(func, repeat, min_time)
+        calibrations.append(calibration_us)
+        results[name] = {'us': round(us, 3), 'relative': round(relative, 4)}
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'calibration_us': round(min(calibrations), 3) if calibrations else None,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'benchmarks': results,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> Dict[str, float]:
+    regressions = {}
+    print(f"{'benchmark':<42}{'us':>12}{'base us':>12}{'change':>10}")
+    print('-' * 76)
+    for name, result in current['benchmarks'].items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if not base:
+            print(f"{name:<42}{result['us']:>12.2f}{'-':>12}{'new':>10}")
+            continue
+        change = (result['relative'] / base['relative'] - 1) * 100
+        flag = ''
+        if change > threshold:
+            regressions[name] = change
+            flag = '  REGRESSION'
+        print(f"{name:<42}{result['us']:>12.2f}{base['us']:>12.2f}{change:>+9.1f}%{flag}")
+    if baseline.get('python') != current['python']:
+        print(f"주의: 기준값 Python {baseline.get('python')} / 현재 {current['python']}")
+    return regressions
+
+def _save_json(path: str, data: Dict[str, Any]):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+def main():
+    parser = argparse.ArgumentParser(description="HIE 헬퍼 마이크로벤치마크")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help="현재 결과를 기준값으로 저장")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="허용 회귀율(%%)")
+    parser.add_argument('--filter', help="이름에 해당 문자열이 포함된 벤치마크만 실행")
+    parser.add_argument('--repeat', type=int, default=9)
+    parser.add_argument('--min-time', type=float, default=0.05, help="반복 1회당 최소 측정 시간(초)")
+    parser.add_argument('--confirm', type=int, default=2, help="회귀로 보인 항목의 재측정 횟수")
+    parser.add_argument('--json-out', help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    benchmarks = build_benchmarks(Workloads(), _load_backend())
+    names = [name for name in benchmarks if not args.filter or args.filter in name]
+    current = run(benchmarks, names, args.repeat, args.min_time)
+
+    if args.update_baseline:
+        if args.json_out:
+            _save_json(args.json_out, current)
+        baseline = {}
+        if args.filter and os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update({k: v for k, v in current.items() if k != 'benchmarks'})
+        baseline.setdefault('benchmarks', {}).update(current['benchmarks'])
+        _save_json(args.baseline, baseline)
+        print(f"기준값 저장: {args.baseline} ({len(current['benchmarks'])}건)")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"기준값 파일 없음: {args.baseline} (--update-baseline 으로 생성)")
+        return 1
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    regressions = compare(current, baseline, args.threshold)
+    for attempt in range(1, args.confirm + 1):
+        if not regressions:
+            break
+        # 작은 항목은 한 번의 측정에도 흔들리므로 회귀로 보인 항목만 다시 재서 더 나은 값을 채택
+        print(f"\n재측정 {attempt}/{args.confirm}: {', '.join(regressions)}")
+        retry = run(benchmarks, list(regressions), args.repeat, args.min_time)
+        for name, result in retry['benchmarks'].items():
+            if result['relative'] < current['benchmarks'][name]['relative']:
+                current['benchmarks'][name] = result
+        regressions = compare(dict(current, benchmarks={name: current['benchmarks'][name] for name in regressions}),
+                              baseline, args.threshold)
+
+    if args.json_out:
+        _save_json(args.json_out, current)
+    if regressions:
+        print("\n성능 회귀:")
+        for name, change in regressions.items():
+            print(f"  {name}: +{change:.1f}% (임계값 {args.threshold:.0f}%)")
+        return 1
+    print(f"\n회귀 없음 (임계값 {args.threshold:.0f}%)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
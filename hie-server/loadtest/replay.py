@@ -0,0 +1,446 @@
+"""hie_server.log(회전/압축본 포함)에서 실제 요청 흐름을 추출해 HIE 서버에 재생
+
+    # 1) 로그 -> 정규화된 trace(JSON Lines)
+    python -m loadtest.replay build hie_server.log --rotated -o trace.jsonl
+
+    # 2) trace 재생: 원래 속도(1), N배속(예: 5), 최대 속도(max)
+    python -m loadtest.replay run trace.jsonl --target-url http://127.0.0.1:8000 --speed 5 --json-out replay.json
+
+감사 로그(hie_esm_logger)는 사용자와 검색조건/레코드ID 등 요청 본문을, werkzeug 접근 로그는
+경로/상태코드/응답시각을 담고 있으므로 두 줄을 짝지어 하나의 요청으로 만든다.
+재생 시 사용자별 요청 순서와 간격은 그대로 유지하고, 사용자 간에는 동시에 실행된다.
+"""
+import argparse
+import glob
+import gzip
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from loadtest.datagen import SyntheticDataGenerator
+from loadtest.report import LatencyReport
+
+TEXT_LINE_RE = re.compile(r'^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) \[(\w+)\] ([\w.\-]+): (.*)$')
+ANSI_RE = re.compile(r'\x1b\[[0-9;]*m')
+ACCESS_RE = re.compile(r'^(\S+) - - \[[^\]]+\] "(\w+) (\S+) HTTP/[\d.]+" (\d{3}) ')
+AUDIT_RE = re.compile(r'^\[(?P<action>[^\]]+)\] 입력자: (?P<email>.*?), 이름: (?P<doctor>.*?), 소속: (?P<hospital>.*?), '
+                      r'입력시각: \d{4}-\d\d-\d\d \d\d:\d\d:\d\d(?:, (?P<info>.*))?$')
+
+SEARCH_CRITERIA = {
+    '환자명': 'name', '환자번호': 'patient_id', '생년월일': 'birth6', '시작일': 'start_date',
+    '종료일': 'end_date', '진료과': 'department', '담당의': 'doctor_name_search',
+}
+AUDITED_PATHS = {
+    '/api/patient/search': 'search',
+    '/api/patient/search/stream': 'search',
+    '/api/medical-record': 'register',
+    '/api/medical-record/bulk': 'bulk',
+    '/api/patient/unmask': 'unmask',
+    '/api/patient/unmask/batch': 'unmask_batch',
+}
+DEFAULT_PATHS = {
+    'search': '/api/patient/search',
+    'register': '/api/medical-record',
+    'unmask': '/api/patient/unmask',
+    'unmask_batch': '/api/patient/unmask/batch',
+}
+# 본문이 로그에 남지 않지만 쿼리스트링/빈 본문으로 재현 가능한 요청
+ACCESS_ONLY = {('GET', '/api/admin/logs'), ('POST', '/api/admin/logs/search'), ('GET', '/health')}
+DEFAULT_UNMASK_FIELDS = ['name', 'address']
+
+# ===== 로그 읽기 =====
+
+def expand_log_paths(paths: List[str], rotated: bool) -> List[str]:
+    files = []
+    for path in paths:
+        matches = sorted(glob.glob(path)) or [path]
+        for match in matches:
+            if os.path.isdir(match):
+                files.extend(sorted(glob.glob(os.path.join(match, 'hie_server.log*'))))
+                continue
+            files.append(match)
+            if rotated:
+                # RotatingLogFileHandler 회전본: <파일>.<YYYYmmdd-HHMMSS-ffffff>[.gz]
+                files.extend(p for p in sorted(glob.glob(f"{glob.escape(match)}.*")) if not p.endswith('.tmp'))
+    return list(dict.fromkeys(files))
+
+def _open_log(path: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, encoding='utf-8', errors='replace')
+
+def iter_log_records(path: str) -> Iterator[Tuple[datetime, str, str]]:
+    """(시각, 로거명, 메시지) - 텍스트 형식과 LOG_JSON 형식 모두 지원"""
+    with _open_log(path) as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line.startswith('{'):
+                try:
+                    entry = json.loads(line)
+                    yield (datetime.strptime(entry['time'], '%Y-%m-%d %H:%M:%S,%f'),
+                           entry['logger'], entry['message'])
+                except (ValueError, KeyError, TypeError):
+                    pass
+                continue
+            match = TEXT_LINE_RE.match(line)
+            if match:
+                yield datetime.strptime(match.group(1), '%Y-%m-%d %H:%M:%S,%f'), match.group(3), match.group(4)
+
+# ===== trace 생성 =====
+
+def _parse_pairs(info: str) -> Dict[str, str]:
+    pairs = {}
+    for part in info.split(', '):
+        key, sep, value = part.partition(':')
+        if sep:
+            pairs[key.strip()] = value.strip()
+    return pairs
+
+def _user_body(audit: Dict[str, str]) -> Dict[str, str]:
+    return {'user_email': audit['email'], 'doctor_name': audit['doctor'], 'hospital': audit['hospital']}
+
+class TraceBuilder:
+    def __init__(self, match_window: float = 2.0, max_duration: float = 60.0, seed: int = 42):
+        self.match_window = match_window
+        self.max_duration = max_duration
+        self.generator = SyntheticDataGenerator(seed=seed)
+        self.ops: List[Dict[str, Any]] = []
+        self.access: List[Tuple[datetime, str, str, str, int]] = []
+        self.bulk_chunks: Dict[str, List[Tuple[datetime, int]]] = defaultdict(list)
+        self.register_started: Dict[str, deque] = defaultdict(deque)
+        self.skipped = defaultdict(int)
+
+    def add(self, ts: datetime, logger_name: str, message: str):
+        if logger_name == 'werkzeug':
+            match = ACCESS_RE.match(ANSI_RE.sub('', message))
+            if match:
+                client, method, target, status = match.groups()
+                self.access.append((ts, client, method, target, int(status)))
+        elif logger_name == 'hie_esm_logger':
+            match = AUDIT_RE.match(message)
+            if match:
+                self._add_audit(ts, match.groupdict())
+
+    def _add_audit(self, ts: datetime, audit: Dict[str, str]):
+        action = audit['action']
+        info = audit['info'] or ''
+        op = None
+
+        if action in ('내병원조회시작', '전체병원조회시작'):
+            criteria = {}
+            if info.startswith('검색조건: '):
+                for label, value in _parse_pairs(info[len('검색조건: '):]).items():
+                    if label in SEARCH_CRITERIA:
+                        criteria[SEARCH_CRITERIA[label]] = value
+            body = dict(_user_body(audit), **criteria, includeExternal=action.startswith('전체'))
+            op = {'op': 'search', 'method': 'POST', 'body': body}
+
+        elif action == '진료입력시작' or (action == '진료입력실패' and not self._register_open(audit['email'], ts)):
+            # 시작 이벤트 없이 실패만 남는 경우(이전 버전 로그)도 요청 1건으로 취급
+            fields = _parse_pairs(info)
+            if action == '진료입력시작':
+                self.register_started[audit['email']].append(ts)
+            record = self.generator.medical_record()
+            for key in ('user_email', 'doctor_name', 'hospital', 'hospital_address', 'issue_date'):
+                record.pop(key)
+            record.update({k: v for k, v in (('patient_no', fields.get('환자번호')), ('name', fields.get('환자명')),
+                                            ('diagnosis', fields.get('진단명')), ('disease_code', fields.get('진단코드')))
+                           if v and v != 'N/A'})
+            op = {'op': 'register', 'method': 'POST', 'body': dict(record, **_user_body(audit))}
+
+        elif action in ('개인정보마스킹해제', '개인정보마스킹해제실패'):
+            record_id = re.search(r'레코드ID: (\d+)', info)
+            fields = re.search(r'해제필드: (.+)$', info)
+            if not record_id:
+                self.skipped[action] += 1
+                return
+            op = {'op': 'unmask', 'method': 'POST', 'body': dict(
+                _user_body(audit), record_id=int(record_id.group(1)),
+                fields=fields.group(1).split(', ') if fields else DEFAULT_UNMASK_FIELDS)}
+
+        elif action in ('개인정보일괄마스킹해제', '개인정보일괄마스킹해제실패'):
+            ids = re.search(r'레코드ID: (.*?)(?:, 해제필드|, DB오류|, 오류|$)', info)
+            fields = re.search(r'해제필드: (.+)$', info)
+            record_ids = [int(i) for i in re.findall(r'\d+', ids.group(1))] if ids else []
+            if not record_ids:
+                self.skipped[action] += 1
+                return
+            op = {'op': 'unmask_batch', 'method': 'POST', 'body': dict(
+                _user_body(audit), record_ids=record_ids,
+                fields=fields.group(1).split(', ') if fields else DEFAULT_UNMASK_FIELDS)}
+
+        elif action == '진료입력완료':
+            self._register_open(audit['email'], ts)
+            return
+
+        elif action == '진료일괄입력':
+            rows = re.search(r'행: \d+-(\d+)', info)
+            if rows:
+                self.bulk_chunks[audit['email']].append((ts, int(rows.group(1))))
+            return
+
+        if op:
+            op.update(at=ts, user=audit['email'], path=DEFAULT_PATHS[op['op']], query='', status=None, orig_ms=None)
+            self.ops.append(op)
+
+    def _register_open(self, email: str, ts: datetime) -> bool:
+        started = self.register_started[email]
+        while started and (ts - started[0]).total_seconds() > self.max_duration:
+            started.popleft()
+        if started:
+            started.popleft()
+            return True
+        return False
+
+    def _match_access(self):
+        # 접근 로그는 응답 후, 감사 로그는 비동기로 기록되므로 순서가 뒤바뀔 수 있어 시간 창 안에서 짝지음
+        pending: Dict[str, deque] = defaultdict(deque)
+        for op in sorted(self.ops, key=lambda o: o['at']):
+            pending[op['op']].append(op)
+
+        for ts, client, method, target, status in sorted(self.access, key=lambda a: a[0]):
+            parts = urlsplit(target)
+            path = parts.path
+            kind = AUDITED_PATHS.get(path)
+
+            if kind == 'bulk':
+                self._add_bulk(ts, client, path, parts.query, status)
+                continue
+            if kind is None:
+                if (method, path) in ACCESS_ONLY:
+                    self.ops.append({'op': path.strip('/').replace('/', '_'), 'method': method, 'path': path,
+                                     'query': parts.query, 'body': {} if method == 'POST' else None,
+                                     'at': ts, 'user': client, 'status': status, 'orig_ms': None})
+                else:
+                    self.skipped[f"{method} {path}"] += 1
+                continue
+
+            # 감사 로그가 최대 match_window 늦게, 접근 로그가 최대 max_duration(요청 처리 시간) 늦게 남을 수 있음
+            queue = pending[kind]
+            while queue and (ts - queue[0]['at']).total_seconds() > self.max_duration:
+                queue.popleft()
+            if queue and (queue[0]['at'] - ts).total_seconds() <= self.match_window:
+                op = queue.popleft()
+                op.update(path=path, status=status)
+                if ts >= op['at'] and kind in ('search', 'register'):
+                    op['orig_ms'] = round((ts - op['at']).total_seconds() * 1000, 3)
+            else:
+                # 검증 실패(400) 등 감사 로그 없이 끝난 요청은 본문을 알 수 없어 제외
+                self.skipped[f"{method} {path} (감사로그 없음)"] += 1
+
+    def _add_bulk(self, ts: datetime, client: str, path: str, query: str, status: int):
+        user = parse_qs(query).get('user_email', [client])[0]
+        chunks = self.bulk_chunks.get(user, [])
+        rows = 0
+        while chunks and (chunks[0][0] - ts).total_seconds() <= self.match_window:
+            rows = max(rows, chunks.pop(0)[1])
+        self.ops.append({'op': 'bulk', 'method': 'POST', 'path': path, 'query': query, 'body': None,
+                         'rows': rows, 'at': ts, 'user': user, 'status': status, 'orig_ms': None})
+
+    def build(self) -> List[Dict[str, Any]]:
+        self._match_access()
+        ops = sorted(self.ops, key=lambda o: o['at'])
+        if not ops:
+            return []
+        origin = ops[0]['at']
+        for op in ops:
+            op['t'] = round((op['at'] - origin).total_seconds(), 3)
+            op['at'] = op['at'].isoformat(timespec='milliseconds')
+        return ops
+
+def build_trace(args) -> int:
+    files = expand_log_paths(args.logs, args.rotated)
+    start = datetime.fromisoformat(args.start) if args.start else None
+    end = datetime.fromisoformat(args.end) if args.end else None
+    builder = TraceBuilder(match_window=args.match_window, max_duration=args.max_duration, seed=args.seed)
+
+    records = []
+    for path in files:
+        count = 0
+        for ts, logger_name, message in iter_log_records(path):
+            if (start and ts < start) or (end and ts >= end):
+                continue
+            records.append((ts, logger_name, message))
+            count += 1
+        print(f"{path}: {count:,}줄", file=sys.stderr)
+
+    # 여러 파일이 섞여도 시간순으로 처리 (회전 경계에서 감사/접근 로그가 나뉠 수 있음)
+    for ts, logger_name, message in sorted(records, key=lambda r: r[0]):
+        builder.add(ts, logger_name, message)
+    trace = builder.build()
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        for op in trace:
+            f.write(json.dumps(op, ensure_ascii=False) + '\n')
+
+    by_op = defaultdict(int)
+    for op in trace:
+        by_op[op['op']] += 1
+    duration = trace[-1]['t'] if trace else 0
+    print(f"trace: {len(trace):,}건, 사용자 {len({op['user'] for op in trace})}명, "
+          f"기간 {duration:,.1f}초 -> {args.output}", file=sys.stderr)
+    for name, count in sorted(by_op.items()):
+        print(f"  {name}: {count:,}", file=sys.stderr)
+    for name, count in sorted(builder.skipped.items()):
+        print(f"  제외 {name}: {count:,}", file=sys.stderr)
+    return 0
+
+# ===== 재생 =====
+
+class Replayer:
+    def __init__(self, trace: List[Dict[str, Any]], target_url: str, speed: Optional[float],
+                 max_lanes: int, timeout: float, upstream_token: Optional[str], seed: int):
+        self.trace = trace
+        self.base = target_url.rstrip('/')
+        self.speed = speed
+        self.timeout = timeout
+        self.headers = {'X-HIE-Upstream-Token': upstream_token} if upstream_token else {}
+        self.seed = seed
+        self.report = LatencyReport()
+        self.original = LatencyReport()
+        self.lag = LatencyReport()
+
+        # 사용자별 순서를 지키기 위해 같은 사용자의 요청은 항상 같은 lane(스레드)에서 순차 실행
+        users = list(dict.fromkeys(op['user'] for op in trace))
+        lane_count = min(len(users), max_lanes) or 1
+        lane_of = {user: index % lane_count for index, user in enumerate(users)}
+        self.lanes: List[List[Dict[str, Any]]] = [[] for _ in range(lane_count)]
+        for op in trace:
+            self.lanes[lane_of[op['user']]].append(op)
+            if op.get('orig_ms') is not None:
+                self.original.record(self._label(op), op['orig_ms'] / 1000, op.get('status'))
+
+    @staticmethod
+    def _label(op: Dict[str, Any]) -> str:
+        return f"{op['method']} {op['path']}"
+
+    def _send(self, session: requests.Session, generator: SyntheticDataGenerator, op: Dict[str, Any]):
+        url = f"{self.base}{op['path']}"
+        if op.get('query'):
+            url = f"{url}?{op['query']}"
+        kwargs: Dict[str, Any] = {'headers': dict(self.headers), 'timeout': self.timeout}
+        if op['op'] == 'bulk':
+            rows = []
+            for _ in range(max(op.get('rows') or 1, 1)):
+                record = generator.medical_record()
+                for key in ('user_email', 'doctor_name', 'hospital', 'hospital_address', 'issue_date'):
+                    record.pop(key)
+                rows.append(json.dumps(record, ensure_ascii=False))
+            kwargs['data'] = ('\n'.join(rows) + '\n').encode('utf-8')
+            kwargs['headers']['Content-Type'] = 'application/x-ndjson'
+        elif op.get('body') is not None:
+            kwargs['json'] = op['body']
+
+        started = time.perf_counter()
+        try:
+            response = session.request(op['method'], url, **kwargs)
+            _ = response.content
+            self.report.record(self._label(op), time.perf_counter() - started, response.status_code)
+        except requests.RequestException as e:
+            self.report.record(self._label(op), time.perf_counter() - started, type(e).__name__)
+
+    def _run_lane(self, index: int, ops: List[Dict[str, Any]], started: float):
+        generator = SyntheticDataGenerator(seed=self.seed + index)
+        with requests.Session() as session:
+            for op in ops:
+                if self.speed:
+                    scheduled = started + op['t'] / self.speed
+                    delay = scheduled - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        # 이전 요청이 늦어져 예정 시각을 넘긴 경우 - 재생 충실도 확인용
+                        self.lag.record('schedule lag', -delay, 'late')
+                self._send(session, generator, op)
+
+    def run(self) -> float:
+        started = time.monotonic()
+        threads = [threading.Thread(target=self._run_lane, args=(i, ops, started), daemon=True)
+                   for i, ops in enumerate(self.lanes) if ops]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.monotonic() - started
+
+def run_trace(args) -> int:
+    with open(args.trace, encoding='utf-8') as f:
+        trace = [json.loads(line) for line in f if line.strip()]
+    if args.only:
+        wanted = set(args.only.split(','))
+        trace = [op for op in trace if op['op'] in wanted]
+    if not trace:
+        print("재생할 요청이 없습니다", file=sys.stderr)
+        return 1
+
+    speed = None if args.speed == 'max' else float(args.speed)
+    replayer = Replayer(trace, args.target_url, speed, args.max_lanes, args.timeout,
+                        args.upstream_token, args.seed)
+    span = trace[-1]['t'] - trace[0]['t']
+    print(f"재생: {len(trace):,}건, lane {len(replayer.lanes)}개, 원본 {span:,.1f}초, "
+          f"속도 {'최대' if speed is None else f'{speed:g}x'}", file=sys.stderr)
+    elapsed = replayer.run()
+
+    if replayer.original.summary(span or 1):
+        print("\n[원본 로그] 감사 시작~접근 로그 간격")
+        replayer.original.print_table(span or 1)
+    print("\n[재생]")
+    replayer.report.print_table(elapsed)
+    lag = replayer.lag.summary(elapsed)
+    if lag:
+        print(f"\n예정 시각 지연: {lag[0]['count']}건, p95 {lag[0]['p95_ms']}ms, 최대 {lag[0]['max_ms']}ms "
+              f"(지연이 크면 --max-lanes 를 늘리거나 배속을 낮춰야 원본 패턴이 유지됨)")
+    if args.json_out:
+        replayer.report.write_json(args.json_out, elapsed, meta={
+            'trace': args.trace, 'requests': len(trace), 'speed': args.speed, 'lanes': len(replayer.lanes),
+            'original': replayer.original.summary(span or 1), 'schedule_lag': lag,
+        })
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="hie_server.log 기반 실제 트래픽 재생")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build = sub.add_parser('build', help="로그 -> trace(JSON Lines)")
+    build.add_argument('logs', nargs='+', help="로그 파일/디렉터리/glob (.gz 지원)")
+    build.add_argument('-o', '--output', default='trace.jsonl')
+    build.add_argument('--rotated', action='store_true', help="지정 파일의 회전본(<파일>.*)도 포함")
+    build.add_argument('--start', help="이 시각 이후만 (ISO 형식)")
+    build.add_argument('--end', help="이 시각 이전만 (ISO 형식)")
+    build.add_argument('--match-window', type=float, default=2.0, help="감사 로그가 접근 로그보다 늦게 남는 허용 간격(초)")
+    build.add_argument('--max-duration', type=float, default=60.0, help="요청 처리 시간 상한(초) - 감사/접근 로그 짝짓기용")
+    build.add_argument('--seed', type=int, default=42, help="진료 입력 본문 중 로그에 없는 필드 생성용")
+    build.set_defaults(func=build_trace)
+
+    run = sub.add_parser('run', help="trace 재생")
+    run.add_argument('trace')
+    run.add_argument('--target-url', default='http://127.0.0.1:8000', help="HIE 서버 주소")
+    run.add_argument('--speed', default='1', help="배속 (1, 5, 0.5 ...) 또는 max")
+    run.add_argument('--max-lanes', type=int, default=256, help="최대 동시 사용자 lane 수")
+    run.add_argument('--only', help="재생할 작업만 (예: search,unmask)")
+    run.add_argument('--timeout', type=float, default=30.0)
+    run.add_argument('--upstream-token', default=os.environ.get('HIE_UPSTREAM_TOKEN'))
+    run.add_argument('--seed', type=int, default=7)
+    run.add_argument('--json-out')
+    run.set_defaults(func=run_trace)
+
+    args = parser.parse_args()
+    if getattr(args, 'speed', None) not in (None, 'max'):
+        try:
+            if float(args.speed) <= 0:
+                raise ValueError
+        except ValueError:
+            parser.error("--speed 는 양수 또는 max 여야 합니다")
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""엔드포인트별 처리량 / 지연시간(p50/p95/p99) 집계"""
+import json
+import math
+import sys
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    # nearest-rank
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+class LatencyReport:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, List[float]] = defaultdict(list)
+        self._statuses: Dict[str, Counter] = defaultdict(Counter)
+    
+    def record(self, endpoint: str, seconds: float, status: Any):
+        with self._lock:
+            self._latencies[endpoint].append(seconds)
+            self._statuses[endpoint][str(status)] += 1
+    
+    def summary(self, elapsed: float) -> List[Dict[str, Any]]:
+        with self._lock:
+            endpoints = {name: (sorted(values), Counter(self._statuses[name]))
+                         for name, values in self._latencies.items()}
+        
+        rows = []
+        for name, (values, statuses) in sorted(endpoints.items()):
+            errors = sum(count for status, count in statuses.items()
+                         if not status.isdigit() or int(status) >= 500)
+            rows.append({
+                'endpoint': name,
+                'count': len(values),
+                'rps': round(len(values) / elapsed, 2) if elapsed > 0 else 0,
+                'errors': errors,
+                'rate_limited': statuses.get('429', 0),
+                'p50_ms': round(percentile(values, 0.50) * 1000, 2),
+                'p95_ms': round(percentile(values, 0.95) * 1000, 2),
+                'p99_ms': round(percentile(values, 0.99) * 1000, 2),
+                'max_ms': round(values[-1] * 1000, 2),
+                'statuses': dict(statuses),
+            })
+        return rows
+    
+    def print_table(self, elapsed: float, out=sys.stdout):
+        rows = self.summary(elapsed)
+        header = f"{'endpoint':<40} {'count':>8} {'rps':>8} {'err':>6} {'429':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"
+        print(header, file=out)
+        print('-' * len(header), file=out)
+        for row in rows:
+            print(f"{row['endpoint']:<40} {row['count']:>8} {row['rps']:>8} {row['errors']:>6} {row['rate_limited']:>6} "
+                  f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} {row['max_ms']:>9}", file=out)
+        total = sum(row['count'] for row in rows)
+        print(f"총 {total}건 / {elapsed:.1f}초 = {total / elapsed if elapsed else 0:.1f} rps (지연시간 단위 ms)", file=out)
+    
+    def write_json(self, path: str, elapsed: float, meta: Dict[str, Any] = None):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'elapsed': elapsed, 'meta': meta or {}, 'endpoints': self.summary(elapsed)},
+                      f, ensure_ascii=False, indent=2)
@@ -0,0 +1,209 @@
+"""부하 테스트용 로컬 대역 서버: ESM syslog 수신기(UDP/TCP)와 Keycloak JWKS/토큰 엔드포인트
+
+    python -m loadtest.standins --esm-port 5514 --keycloak-port 18080 --realm hie
+
+HIE 서버는 ESM_SERVER_HOST=127.0.0.1 ESM_SERVER_PORT=5514 (ESM_PROTOCOL=udp|tcp),
+백엔드는 KEYCLOAK_BASE_URL=http://127.0.0.1:18080 KEYCLOAK_REALM=hie 로 실행한다.
+"""
+import argparse
+import hashlib
+import json
+import socketserver
+import threading
+import time
+import urllib.parse
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+class EsmReceiver:
+    """UDP 데이터그램과 TCP octet-counting(RFC 6587) 프레임을 받아 건수만 집계"""
+    
+    def __init__(self, host: str, port: int, keep_last: int = 0):
+        self.address = (host, port)
+        self.keep_last = keep_last
+        self.messages = []
+        self._lock = threading.Lock()
+        self.stats = {'udp': 0, 'tcp': 0, 'tcp_connections': 0, 'bytes': 0}
+        self._servers = []
+    
+    def _record(self, transport: str, payload: bytes):
+        with self._lock:
+            self.stats[transport] += 1
+            self.stats['bytes'] += len(payload)
+            if self.keep_last:
+                self.messages.append(payload.rstrip(b'\x00').decode('utf-8', 'replace'))
+                del self.messages[:-self.keep_last]
+    
+    def start(self):
+        receiver = self
+        
+        class UdpHandler(socketserver.BaseRequestHandler):
+            def handle(self):
+                receiver._record('udp', self.request[0])
+        
+        class TcpHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                with receiver._lock:
+                    receiver.stats['tcp_connections'] += 1
+                while True:
+                    # "<길이> <메시지>" 프레임 파싱
+                    length = b''
+                    while not length.endswith(b' '):
+                        ch = self.rfile.read(1)
+                        if not ch:
+                            return
+                        length += ch
+                    payload = self.rfile.read(int(length))
+                    if not payload:
+                        return
+                    receiver._record('tcp', payload)
+        
+        socketserver.ThreadingUDPServer.allow_reuse_address = True
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._servers = [
+            socketserver.ThreadingUDPServer(self.address, UdpHandler),
+            socketserver.ThreadingTCPServer(self.address, TcpHandler),
+        ]
+        for server in self._servers:
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+class KeycloakStandIn:
+    """RS256 키 하나로 JWKS/토큰/OpenID 설정을 제공하는 Keycloak 대역"""
+    
+    def __init__(self, host: str, port: int, realm: str, client_id: str, token_ttl: int = 300):
+        self.address = (host, port)
+        self.realm = realm
+        self.client_id = client_id
+        self.token_ttl = token_ttl
+        self.issuer = f"http://{host}:{port}/realms/{realm}"
+        self._private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        public_jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(self._private_key.public_key()))
+        self.kid = hashlib.sha256(public_jwk['n'].encode()).hexdigest()[:16]
+        self.jwks = {'keys': [{**public_jwk, 'kid': self.kid, 'use': 'sig', 'alg': 'RS256'}]}
+        self.stats = {'certs': 0, 'token': 0, 'openid_configuration': 0}
+        self._server: Optional[ThreadingHTTPServer] = None
+    
+    def issue_token(self, username: str, email: str = None, hospital: str = None, acr: str = 'mfa') -> str:
+        now = int(time.time())
+        claims = {
+            'iss': self.issuer,
+            'aud': self.client_id,
+            'azp': self.client_id,
+            'sub': str(uuid.uuid5(uuid.NAMESPACE_DNS, username)),
+            'iat': now,
+            'auth_time': now,
+            'exp': now + self.token_ttl,
+            'jti': str(uuid.uuid4()),
+            'typ': 'Bearer',
+            'acr': acr,
+            'preferred_username': username,
+            'email': email or f"{username}@loadtest.local",
+        }
+        if hospital:
+            claims['hospital'] = hospital
+        return jwt.encode(claims, self._private_key, algorithm='RS256', headers={'kid': self.kid})
+    
+    def openid_configuration(self) -> Dict[str, Any]:
+        base = f"{self.issuer}/protocol/openid-connect"
+        return {
+            'issuer': self.issuer,
+            'authorization_endpoint': f"{base}/auth",
+            'token_endpoint': f"{base}/token",
+            'userinfo_endpoint': f"{base}/userinfo",
+            'end_session_endpoint': f"{base}/logout",
+            'jwks_uri': f"{base}/certs",
+            'id_token_signing_alg_values_supported': ['RS256'],
+        }
+    
+    def start(self):
+        standin = self
+        prefix = f"/realms/{self.realm}"
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def _json(self, body: Dict[str, Any], status: int = 200):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def do_GET(self):
+                path = urllib.parse.urlparse(self.path).path
+                if path == f"{prefix}/protocol/openid-connect/certs":
+                    standin.stats['certs'] += 1
+                    return self._json(standin.jwks)
+                if path == f"{prefix}/.well-known/openid-configuration":
+                    standin.stats['openid_configuration'] += 1
+                    return self._json(standin.openid_configuration())
+                return self._json({'error': 'not_found'}, 404)
+            
+            def do_POST(self):
+                path = urllib.parse.urlparse(self.path).path
+                if path != f"{prefix}/protocol/openid-connect/token":
+                    return self._json({'error': 'not_found'}, 404)
+                
+                length = int(self.headers.get('Content-Length') or 0)
+                form = urllib.parse.parse_qs(self.rfile.read(length).decode())
+                username = (form.get('username') or form.get('client_id') or ['loadtest'])[0]
+                standin.stats['token'] += 1
+                token = standin.issue_token(username, hospital=(form.get('hospital') or [None])[0])
+                return self._json({
+                    'access_token': token,
+                    'id_token': token,
+                    'token_type': 'Bearer',
+                    'expires_in': standin.token_ttl,
+                })
+        
+        self._server = ThreadingHTTPServer(self.address, Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+    
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="ESM syslog / Keycloak 대역 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--esm-port', type=int, default=5514)
+    parser.add_argument('--keycloak-port', type=int, default=18080)
+    parser.add_argument('--realm', default='hie')
+    parser.add_argument('--client-id', default='hie-backend')
+    parser.add_argument('--token-ttl', type=int, default=300)
+    parser.add_argument('--report-interval', type=float, default=10.0)
+    args = parser.parse_args()
+    
+    esm = EsmReceiver(args.host, args.esm_port)
+    keycloak = KeycloakStandIn(args.host, args.keycloak_port, args.realm, args.client_id, args.token_ttl)
+    esm.start()
+    keycloak.start()
+    print(f"ESM 수신기: udp/tcp {args.host}:{args.esm_port}")
+    print(f"Keycloak 대역: {keycloak.issuer} (kid={keycloak.kid})")
+    
+    try:
+        while True:
+            time.sleep(args.report_interval)
+            print(f"ESM {esm.stats} / Keycloak {keycloak.stats}", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        esm.stop()
+        keycloak.stop()
+
+if __name__ == '__main__':
+    main()
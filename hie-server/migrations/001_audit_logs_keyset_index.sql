@@ -0,0 +1,3 @@
+-- /api/admin/logs, /api/admin/logs/search 의 커서(keyset) 페이지네이션용 인덱스
+-- ORDER BY created_at DESC, id DESC 와 (created_at, id) seek 조건을 인덱스 범위 스캔으로 처리
+CREATE INDEX idx_audit_logs_created_id ON audit_logs (created_at, id);
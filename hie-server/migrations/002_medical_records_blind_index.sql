@@ -0,0 +1,10 @@
+-- 생년월일(birth6)/주민번호 검색용 HMAC blind index 컬럼
+-- 적용 순서:
+--   1. 이 마이그레이션 적용
+--   2. DB_BLIND_INDEX_KEY 설정 후 `flask --app app backfill-blind-index` 실행
+--   3. HIE 서버 재시작 후 backfill 한 번 더 실행 (재시작 전에 등록된 레코드 처리)
+ALTER TABLE medical_records
+    ADD COLUMN ssn_birth6_bidx BINARY(32) NULL,
+    ADD COLUMN ssn_bidx BINARY(32) NULL,
+    ADD INDEX idx_medical_records_birth6_bidx (ssn_birth6_bidx, hospital),
+    ADD INDEX idx_medical_records_ssn_bidx (ssn_bidx);
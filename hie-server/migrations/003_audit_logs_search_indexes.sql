@@ -0,0 +1,9 @@
+-- /api/admin/logs/search 조건별 인덱스
+-- 등호/IN/prefix 조건 + (created_at, id) 정렬을 함께 처리하는 복합 인덱스
+CREATE INDEX idx_audit_logs_action_created ON audit_logs (action, created_at, id);
+CREATE INDEX idx_audit_logs_email_created ON audit_logs (user_email, created_at, id);
+CREATE INDEX idx_audit_logs_hospital_created ON audit_logs (hospital, created_at, id);
+
+-- contains 검색용 ngram FULLTEXT 인덱스 (MATCH 컬럼 목록과 인덱스가 일치해야 하므로 컬럼별로 생성)
+CREATE FULLTEXT INDEX ft_audit_logs_email ON audit_logs (user_email) WITH PARSER ngram;
+CREATE FULLTEXT INDEX ft_audit_logs_hospital ON audit_logs (hospital) WITH PARSER ngram;
@@ -0,0 +1,9 @@
+-- 검색 응답용 마스킹 컬럼 (저장 시점에 계산)
+-- 적용 후 `flask --app app backfill-masked-columns` 로 기존 행을 채움
+-- name_masked 가 NULL 인 행은 backfill 전 행으로 간주되어 조회 시 애플리케이션에서 마스킹됨
+ALTER TABLE medical_records
+    ADD COLUMN name_masked VARCHAR(255) NULL,
+    ADD COLUMN address_masked VARCHAR(255) NULL,
+    ADD COLUMN ssn_masked VARCHAR(20) NULL,
+    ADD COLUMN diagnosis_masked VARCHAR(20) NULL,
+    ADD COLUMN description_masked VARCHAR(20) NULL;